@@ -7,7 +7,10 @@ try:
 except PackageNotFoundError:
     __version__ = "0.0.0"
 
+from .batch import solveMany
 from .cube import Cube
+from .cube_batch import CubeBatch
 from .main import main
+from .sequences import compileSequence
 
-__all__ = ["Cube", "main", "__version__"]
+__all__ = ["Cube", "CubeBatch", "compileSequence", "main", "solveMany", "__version__"]
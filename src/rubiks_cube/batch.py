@@ -0,0 +1,154 @@
+import itertools
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator
+
+from .coords import CubieCube
+from .cube import Cube
+from .table_cache import getCacheDir, setCacheDir
+from .two_phase import getSolver
+
+SOLVE_METHODS = ("beginner", "two_phase")
+
+# chunks kept in flight per worker, so workers never wait for the next chunk to be sent
+CHUNKS_PER_WORKER = 4
+
+
+def solveState(state: str, method: str = "beginner", maxLength: int = 22, timeout: float = 1.0) -> dict:
+    """Solves a single cube with Cube.solve, timing each stage of the solve (see Cube.collectSpans).
+
+    Args:
+        state (str): A string of length 54 representing the cube's state.
+        method (str, optional): The solving method, either "beginner" or "two_phase". Defaults to "beginner".
+        maxLength (int, optional): two_phase only - see Cube.solve. Defaults to 22.
+        timeout (float, optional): two_phase only - see Cube.solve. Defaults to 1.0.
+
+    Returns:
+        dict: The result, with the state, the moves made, the optimised moves, the time taken by each stage
+              (a single "solution_cache" stage if the solution was cached) and in total (in seconds), and an
+              error message if the cube could not be solved (None otherwise).
+    """
+    result = {"state": state, "moves": None, "optimised_moves": None, "timings": {}, "total_time": 0.0, "error": None}
+
+    # an unsolvable cube would never finish the beginner method, so it is rejected up front
+    try:
+        if not CubieCube.fromString(state).isValid():
+            raise ValueError("The cube is not solvable.")
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+
+    cube = Cube(state)
+    with cube.collectSpans() as spans:
+        cube.solve(method=method, maxLength=maxLength, timeout=timeout)
+    result["timings"] = {span.stage: span.wallTime for span in spans}
+
+    result["moves"] = cube.movesMade
+    result["optimised_moves"] = cube.optimisedMoves
+    result["total_time"] = sum(result["timings"].values())
+    return result
+
+
+def _initWorker(method: str, cacheDir: str) -> None:
+    """Runs once in each worker process, loading everything the solver needs before the first task."""
+    setCacheDir(cacheDir)
+    if method == "two_phase":
+        getSolver()
+
+
+def _solveChunk(chunk: list[tuple[int, str]], method: str, maxLength: int, timeout: float) -> list[dict]:
+    """Solves a chunk of (index, state) pairs in a worker process."""
+    results = []
+    for index, state in chunk:
+        result = solveState(state, method, maxLength, timeout)
+        result["index"] = index
+        results.append(result)
+    return results
+
+
+def _chunks(states: Iterable[str], chunkSize: int) -> Iterator[list[tuple[int, str]]]:
+    """Splits states into lists of at most chunkSize (index, state) pairs."""
+    indexed = enumerate(states)
+    while True:
+        chunk = list(itertools.islice(indexed, chunkSize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solveMany(
+    states: Iterable[str],
+    workers: int = None,
+    chunkSize: int = 16,
+    ordered: bool = True,
+    method: str = "beginner",
+    maxLength: int = 22,
+    timeout: float = 1.0,
+) -> Iterator[dict]:
+    """Solves many cubes in parallel using a pool of worker processes. Results are streamed back
+    as they are ready, and states are read from the iterable only as fast as they are solved.
+
+    Args:
+        states (Iterable[str]): The states to solve, as strings of length 54.
+        workers (int, optional): The number of worker processes. If 1, the cubes are solved in this process.
+                                 Defaults to the number of CPUs.
+        chunkSize (int, optional): The number of cubes sent to a worker at a time. Defaults to 16.
+        ordered (bool, optional): If True, results are returned in the same order as the states. Otherwise
+                                  they are returned as soon as they are solved. Defaults to True.
+        method (str, optional): The solving method, either "beginner" or "two_phase". Defaults to "beginner".
+        maxLength (int, optional): two_phase only - see Cube.solve. Defaults to 22.
+        timeout (float, optional): two_phase only - see Cube.solve. Defaults to 1.0.
+
+    Raises:
+        ValueError: If the method is unknown, or workers or chunkSize are less than 1.
+
+    Yields:
+        dict: The result for each state (see solveState), with its position in states under "index".
+    """
+    if method not in SOLVE_METHODS:
+        logging.critical(f"Unknown solving method: {method}")
+        raise ValueError(f"Unknown solving method: {method}")
+
+    workers = workers if workers is not None else os.cpu_count() or 1
+    if workers < 1 or chunkSize < 1:
+        raise ValueError("workers and chunkSize must be at least 1.")
+
+    chunks = _chunks(states, chunkSize)
+    if workers == 1:
+        for chunk in chunks:
+            yield from _solveChunk(chunk, method, maxLength, timeout)
+        return
+
+    executor = ProcessPoolExecutor(workers, initializer=_initWorker, initargs=(method, str(getCacheDir())))
+    try:
+        pending: dict[Future, int] = {}
+        finished: dict[int, list[dict]] = {}
+        submitted = 0
+        nextChunk = 0
+
+        while True:
+            # finished chunks waiting for an earlier one count towards the limit, so memory stays bounded
+            while len(pending) + len(finished) < workers * CHUNKS_PER_WORKER:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending[executor.submit(_solveChunk, chunk, method, maxLength, timeout)] = submitted
+                submitted += 1
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunkNumber = pending.pop(future)
+                if ordered:
+                    finished[chunkNumber] = future.result()
+                else:
+                    yield from future.result()
+
+            while nextChunk in finished:
+                yield from finished.pop(nextChunk)
+                nextChunk += 1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,215 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+import numpy as np
+
+from .cube import BEGINNER_STAGES, Cube
+
+# solves are split into tasks of this many, each with its own seed, so the scrambles a
+# benchmark uses depend only on its seed and number of solves, not on the number of workers
+SOLVES_PER_TASK = 100
+
+PERCENTILES = (50, 90, 99)
+
+# the permutation the calibration workload applies, like the gathers moves are applied with
+CALIBRATION_GATHER = itemgetter(*random.Random(0).sample(range(54), 54))
+
+
+def calibrationWorkload() -> None:
+    """A fixed workload of the operations solving spends its time on, applying permutations to states and
+    looking them up in a dict, which doesn't depend on the solver's code. How fast a shared machine runs
+    changes by tens of percent over a few seconds, so timing this next to a benchmark's solves gives a
+    measure of the machine's speed while they ran.
+    """
+    state = bytes(range(54))
+    seen = {}
+    for _ in range(6000):
+        state = bytes(CALIBRATION_GATHER(state))
+        seen[state[:8]] = seen.get(state[:8], 0) + 1
+        if state[0] == state[9]:
+            seen.clear()
+
+
+def _timeCalibration() -> int:
+    """Times the calibration workload in CPU time, in nanoseconds."""
+    startTime = time.process_time_ns()
+    calibrationWorkload()
+    return time.process_time_ns() - startTime
+
+
+def _runTask(seed: int, taskIndex: int, numSolves: int, method: str, calibrate: bool) -> dict[str, np.ndarray]:
+    """Runs one task's solves in a worker through Cube.solve, recording the CPU time each stage took in
+    nanoseconds (see Cube.collectSpans).
+
+    Args:
+        seed (int): The benchmark's seed.
+        taskIndex (int): The index of the task, combined with the seed to seed the task's scrambles.
+        numSolves (int): The number of solves to run.
+        method (str): The solving method.
+        calibrate (bool): Whether to time the calibration workload before and after the solves.
+
+    Returns:
+        dict[str, np.ndarray]: The stage times (keyed by stage), total times, move counts, optimised move counts
+                               and whether each solve failed to solve the cube, and if calibrating, the mean
+                               time of the calibration workload before and after the solves.
+    """
+    rng = random.Random(f"{seed}:{taskIndex}")
+    stages = BEGINNER_STAGES if method == "beginner" else (method,)
+    times = {stage: np.zeros(numSolves, dtype=np.int64) for stage in stages}
+    moves = np.zeros(numSolves, dtype=np.int32)
+    optimisedMoves = np.zeros(numSolves, dtype=np.int32)
+    failed = np.zeros(numSolves, dtype=bool)
+
+    before = _timeCalibration() if calibrate else 0
+
+    cube = Cube()
+    with cube.collectSpans() as spans:
+        for solve in range(numSolves):
+            cube.randomise(rng)
+            spans.clear()
+            # the cache is skipped, so every solve runs and is timed through the solver's stages
+            cube.solve(method=method, useCache=False)
+            for span in spans:
+                times[span.stage][solve] = round(span.cpuTime * 1e9)
+
+            moves[solve] = len(cube.movesMade)
+            optimisedMoves[solve] = len(cube.optimisedMoves)
+            failed[solve] = not cube.isSolved
+
+    times["total"] = sum(times[stage] for stage in stages)
+    times["moves"] = moves
+    times["optimised_moves"] = optimisedMoves
+    times["failed"] = failed
+    if calibrate:
+        times["calibration"] = np.array([(before + _timeCalibration()) // 2], dtype=np.int64)
+    return times
+
+
+def summariseTimes(times: np.ndarray) -> dict[str, float]:
+    """Summarises a distribution of times.
+
+    Args:
+        times (np.ndarray): The times in nanoseconds.
+
+    Returns:
+        dict[str, float]: The mean, p50, p90, p99 and max, in seconds.
+    """
+    if len(times) == 0:
+        return {"mean": 0.0, "max": 0.0, **{f"p{p}": 0.0 for p in PERCENTILES}}
+
+    seconds = times / 1e9
+    summary = {"mean": float(seconds.mean())}
+    for percentile, value in zip(PERCENTILES, np.percentile(seconds, PERCENTILES)):
+        summary[f"p{percentile}"] = float(value)
+    summary["max"] = float(seconds.max())
+    return summary
+
+
+def summariseMoves(moves: np.ndarray) -> dict:
+    """Summarises a distribution of move counts.
+
+    Args:
+        moves (np.ndarray): The number of moves in each solve.
+
+    Returns:
+        dict: The mean, min and max, and a histogram mapping each move count to the number of solves.
+    """
+    if len(moves) == 0:
+        return {"mean": 0.0, "min": 0, "max": 0, "histogram": {}}
+
+    counts, frequencies = np.unique(moves, return_counts=True)
+    return {
+        "mean": float(moves.mean()),
+        "min": int(moves.min()),
+        "max": int(moves.max()),
+        "histogram": {int(count): int(frequency) for count, frequency in zip(counts, frequencies)},
+    }
+
+
+def runBenchmark(
+    numSolves: int = 1000, workers: int = None, seed: int = 0, method: str = "beginner", calibrate: bool = False
+) -> dict:
+    """Scrambles and solves cubes across a pool of worker processes, collecting the CPU time each stage of
+    every solve took and the number of moves it used. CPU times only count the time a solve was running,
+    so unlike the wall time they aren't slowed down by other processes on a busy machine.
+
+    Args:
+        numSolves (int, optional): The number of solves. Defaults to 1000.
+        workers (int, optional): The number of worker processes. If 1, solves run in this process.
+                                 Defaults to the number of CPUs.
+        seed (int, optional): The seed the scrambles are generated from. Defaults to 0.
+        method (str, optional): The solving method, either "beginner" or "two_phase". Defaults to "beginner".
+        calibrate (bool, optional): Whether each task also times the calibration workload (see
+                                    calibrationWorkload) next to its solves. Defaults to False.
+
+    Returns:
+        dict: The number of solves, workers and tasks (of SOLVES_PER_TASK solves each), the wall time and
+              throughput (solves per second), the CPU throughput (solves per CPU second of solving),
+              summaries of the CPU time taken by each stage and in total, summaries and histograms of the
+              move counts, the number of solves which failed, and the raw per solve arrays under "raw"
+              (times in nanoseconds), in task order. If calibrating, "raw" also has each task's calibration
+              time under "calibration".
+    """
+    workers = workers if workers is not None else os.cpu_count() or 1
+    tasks = [
+        (seed, taskIndex, min(SOLVES_PER_TASK, numSolves - start), method, calibrate)
+        for taskIndex, start in enumerate(range(0, numSolves, SOLVES_PER_TASK))
+    ]
+
+    startTime = time.perf_counter()
+    if workers == 1:
+        taskResults = [_runTask(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            taskResults = list(executor.map(_runTask, *zip(*tasks)))
+    wallTime = time.perf_counter() - startTime
+
+    stages = BEGINNER_STAGES if method == "beginner" else (method,)
+    raw = {}
+    keys = (*stages, "total", "moves", "optimised_moves", "failed") + (("calibration",) if calibrate else ())
+    for key in keys:
+        raw[key] = np.concatenate([result[key] for result in taskResults]) if taskResults else np.zeros(0)
+    cpuTime = raw["total"].sum() / 1e9
+
+    return {
+        "method": method,
+        "solves": numSolves,
+        "workers": workers,
+        "seed": seed,
+        "tasks": len(tasks),
+        "wall_time": wallTime,
+        "throughput": numSolves / wallTime if wallTime > 0 else 0.0,
+        "cpu_throughput": numSolves / cpuTime if cpuTime > 0 else 0.0,
+        "stages": {stage: summariseTimes(raw[stage]) for stage in stages},
+        "total": summariseTimes(raw["total"]),
+        "moves": summariseMoves(raw["moves"]),
+        "optimised_moves": summariseMoves(raw["optimised_moves"]),
+        "failures": int(raw["failed"].sum()),
+        "raw": raw,
+    }
+
+
+def printBenchmark(results: dict) -> None:
+    """Prints the results of runBenchmark to the console.
+
+    Args:
+        results (dict): The benchmark results.
+    """
+    print("\n-----------------------------")
+    print(f"Solves: {results['solves']} ({results['method']}, {results['workers']} workers, seed {results['seed']})")
+    print(f"Wall Time: {round(results['wall_time'], 3)} seconds")
+    print(f"Throughput: {round(results['throughput'], 1)} solves/second")
+    print(f"CPU Throughput: {round(results['cpu_throughput'], 1)} solves/CPU second")
+    print(f"Avg number of Rotations: {round(results['moves']['mean'], 3)}")
+    print(f"Avg number of optimised rotations: {round(results['optimised_moves']['mean'], 3)}")
+    print(f"Failed solves: {results['failures']}")
+    print("-----------------------------")
+
+    header = f"{'Stage CPU time (ms)':<22}" + "".join(f"{column:>9}" for column in ("mean", "p50", "p90", "p99", "max"))
+    print(header)
+    for name, summary in (*results["stages"].items(), ("total", results["total"])):
+        print(f"{name:<22}" + "".join(f"{value * 1000:>9.3f}" for value in summary.values()))
+    print("-----------------------------")
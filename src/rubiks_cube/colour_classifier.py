@@ -0,0 +1,159 @@
+import logging
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+# the spaces colours can be compared in. RGB is what the scanner has always used. In CIELAB distances
+# roughly match how different colours look, and hue, saturation and value are compared as points in
+# the HSV cone, so dark or grey colours are close whatever their hue
+COLOUR_SPACES = ("rgb", "lab", "hsv")
+DEFAULT_COLOUR_SPACE = "rgb"
+
+# bins per channel of the lookup table, 32 giving 32768 entries
+DEFAULT_LUT_BINS = 32
+
+
+def convertColours(colours: np.ndarray, space: str) -> np.ndarray:
+    """Converts RGB colours into coordinates in a colour space, in which colours are compared by their
+    Euclidean distance. Each coordinate spans roughly 0 to 100 (or -100 to 100).
+
+    Args:
+        colours (np.ndarray): The RGB colours (0 to 255), in an array of any shape ending in 3.
+        space (str): The colour space, one of COLOUR_SPACES.
+
+    Returns:
+        np.ndarray: The float32 coordinates, the same shape as the colours.
+    """
+    colours = np.asarray(colours, dtype=np.float32)
+    if space == "rgb":
+        return colours
+
+    # float images are converted with channels from 0 to 1
+    pixels = np.clip(colours.reshape(-1, 1, 3) / 255, 0, 1)
+    if space == "lab":
+        return cv2.cvtColor(pixels, cv2.COLOR_RGB2LAB).reshape(colours.shape)
+
+    # hue in degrees and saturation and value from 0 to 1
+    hsv = cv2.cvtColor(pixels, cv2.COLOR_RGB2HSV).reshape(-1, 3)
+    hue = np.radians(hsv[:, 0])
+    chroma = hsv[:, 1] * hsv[:, 2]
+    cone = np.stack([chroma * np.cos(hue), chroma * np.sin(hue), hsv[:, 2]], axis=1) * 100
+    return cone.reshape(colours.shape)
+
+
+class ColourClassifier:
+    """Classifies colours as the nearest colour of a palette, many at once. A lookup table of the
+    class of every colour (quantised to lutBins levels per channel) is built up front, so whole
+    images can be classified a pixel at a time with one table lookup each.
+    """
+
+    def __init__(
+        self,
+        palette: list[tuple[str, np.ndarray]] | dict[str, np.ndarray],
+        space: str = DEFAULT_COLOUR_SPACE,
+        lutBins: int | None = DEFAULT_LUT_BINS,
+    ) -> None:
+        """Initialises a ColourClassifier.
+
+        Args:
+            palette (list[tuple[str, np.ndarray]] | dict[str, np.ndarray]): The name and RGB value of each
+                colour, e.g. SCAN_COLOURS or CubeCalibrator.getAverages().
+            space (str, optional): The colour space colours are compared in, one of COLOUR_SPACES.
+                                   Defaults to DEFAULT_COLOUR_SPACE.
+            lutBins (int | None, optional): The levels per channel of the lookup table, a power of two up
+                                            to 256, or None for no table. Defaults to DEFAULT_LUT_BINS.
+
+        Raises:
+            ValueError: If the palette is empty, the space is unknown or lutBins is not a power of two up to 256.
+        """
+        if isinstance(palette, dict):
+            palette = list(palette.items())
+        if not palette:
+            logging.critical("A colour classifier needs at least one colour.")
+            raise ValueError("A colour classifier needs at least one colour.")
+        if space not in COLOUR_SPACES:
+            logging.critical(f"Unknown colour space {space}.")
+            raise ValueError(f"Unknown colour space {space}, expected one of {', '.join(COLOUR_SPACES)}.")
+        if lutBins is not None and not (0 < lutBins <= 256 and 256 % lutBins == 0):
+            logging.critical(f"Invalid number of lookup table bins {lutBins}.")
+            raise ValueError(f"The lookup table needs a power of two bins up to 256, not {lutBins}.")
+
+        self.names = tuple(name for name, _ in palette)
+        self.space = space
+        self.centres = convertColours(np.array([rgb for _, rgb in palette], dtype=np.float32), space)
+        self.lutBins = lutBins
+        self.lut: np.ndarray | None = None
+        if lutBins is not None:
+            # every bin is classified by the colour at its middle
+            step = 256 // lutBins
+            levels = np.arange(lutBins, dtype=np.float32) * step + (step - 1) / 2
+            grid = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1)
+            self.lut = self.classify(grid).astype(np.uint8)
+
+    def classify(self, colours: np.ndarray) -> np.ndarray:
+        """Finds the nearest palette colour to each colour.
+
+        Args:
+            colours (np.ndarray): The RGB colours, in an array of any shape ending in 3.
+
+        Returns:
+            np.ndarray: The index into names of each colour's class, the shape of the colours without the last axis.
+        """
+        points = convertColours(colours, self.space)
+        distances = ((points[..., None, :] - self.centres) ** 2).sum(axis=-1)
+        return distances.argmin(axis=-1)
+
+    def classifyNames(self, colours: np.ndarray) -> list[str]:
+        """Finds the name of the nearest palette colour to each of a list of colours.
+
+        Args:
+            colours (np.ndarray): The (N, 3) RGB colours.
+
+        Returns:
+            list[str]: The name of each colour's class.
+        """
+        return [self.names[index] for index in self.classify(np.asarray(colours).reshape(-1, 3))]
+
+    def classifyImage(self, image: np.ndarray) -> np.ndarray:
+        """Classifies every pixel of an image, with the lookup table if there is one.
+
+        Args:
+            image (np.ndarray): The (H, W, 3) BGR uint8 image.
+
+        Returns:
+            np.ndarray: The (H, W) index into names of each pixel's class.
+        """
+        if self.lut is None:
+            return self.classify(image[..., ::-1])
+
+        step = 256 // self.lutBins
+        quantised = image // step if step > 1 else image
+        return self.lut[quantised[..., 2], quantised[..., 1], quantised[..., 0]]
+
+
+@lru_cache(maxsize=16)
+def _cachedClassifier(palette: tuple[tuple[str, tuple[float, ...]], ...], space: str) -> ColourClassifier:
+    """Builds a classifier for a palette in hashable form (see getClassifier)."""
+    return ColourClassifier([(name, np.array(rgb)) for name, rgb in palette], space)
+
+
+def getClassifier(
+    palette: list[tuple[str, np.ndarray]] | dict[str, np.ndarray] | ColourClassifier, space: str = DEFAULT_COLOUR_SPACE
+) -> ColourClassifier:
+    """Returns a classifier for a palette. Classifiers are cached, so the lookup table of a palette is
+    only built once however many frames it classifies.
+
+    Args:
+        palette (list[tuple[str, np.ndarray]] | dict[str, np.ndarray] | ColourClassifier): The palette, or
+            a classifier, which is returned as it is (with its own space).
+        space (str, optional): The colour space, one of COLOUR_SPACES. Defaults to DEFAULT_COLOUR_SPACE.
+
+    Returns:
+        ColourClassifier: The classifier.
+    """
+    if isinstance(palette, ColourClassifier):
+        return palette
+    if isinstance(palette, dict):
+        palette = list(palette.items())
+    return _cachedClassifier(tuple((name, tuple(float(value) for value in rgb)) for name, rgb in palette), space)
@@ -0,0 +1,534 @@
+from itertools import combinations, permutations
+from math import factorial
+
+import numpy as np
+
+from .constants import SOLVED_MASK
+from .cube_state import SOLVED_STATE, applyMove, decodeState
+from .table_cache import getTable, registerTable
+
+# corner and edge positions, in the usual Kociemba ordering
+URF, UFL, ULB, UBR, DFR, DLF, DBL, DRB = range(8)
+UR, UF, UL, UB, DR, DF, DL, DB, FR, FL, BL, BR = range(12)
+
+# the string indices of the facelets of each corner and edge position. Corners are
+# listed clockwise starting from the U/D facelet, and edges start from the U/D
+# facelet (or the F/B facelet for the middle layer edges)
+CORNER_FACELETS = [
+    (8, 27, 20),
+    (6, 18, 11),
+    (0, 9, 38),
+    (2, 36, 29),
+    (47, 26, 33),
+    (45, 17, 24),
+    (51, 44, 15),
+    (53, 35, 42),
+]
+EDGE_FACELETS = [
+    (5, 28),
+    (7, 19),
+    (3, 10),
+    (1, 37),
+    (50, 34),
+    (46, 25),
+    (48, 16),
+    (52, 43),
+    (23, 30),
+    (21, 14),
+    (41, 12),
+    (39, 32),
+]
+
+CORNER_COLOURS = [tuple(SOLVED_MASK[i] for i in facelets) for facelets in CORNER_FACELETS]
+EDGE_COLOURS = [tuple(SOLVED_MASK[i] for i in facelets) for facelets in EDGE_FACELETS]
+UD_COLOURS = {SOLVED_MASK[4], SOLVED_MASK[49]}
+
+# the 18 face turns, grouped by face so that faces i and i + 3 are opposite
+FACE_ORDER = ["U", "R", "F", "D", "L", "B"]
+MOVES = [face + suffix for face in FACE_ORDER for suffix in ("", "2", "'")]
+MOVE_INDEX = {move: index for index, move in enumerate(MOVES)}
+NUM_MOVES = len(MOVES)
+
+NUM_TWISTS = 3**7
+NUM_FLIPS = 2**11
+NUM_SLICES = 495
+NUM_CORNER_PERMS = factorial(8)
+NUM_EDGE_PERMS = factorial(12)
+
+SLICE_COMBINATIONS = list(combinations(range(12), 4))
+SLICE_COMBINATION_INDEX = {combination: index for index, combination in enumerate(SLICE_COMBINATIONS)}
+SOLVED_SLICE = SLICE_COMBINATION_INDEX[(FR, FL, BL, BR)]
+
+
+def permutationRank(perm: list[int]) -> int:
+    """Returns the lexicographic rank of a permutation of range(n).
+
+    Args:
+        perm (list[int]): The permutation to rank.
+
+    Returns:
+        int: The rank, between 0 and n! - 1.
+    """
+    n = len(perm)
+    rank = 0
+    for i in range(n):
+        smaller = 0
+        for j in range(i + 1, n):
+            if perm[j] < perm[i]:
+                smaller += 1
+        rank = rank * (n - i) + smaller
+    return rank
+
+
+def permutationFromRank(rank: int, n: int) -> list[int]:
+    """Returns the permutation of range(n) with the given lexicographic rank.
+
+    Args:
+        rank (int): The rank of the permutation.
+        n (int): The number of elements.
+
+    Returns:
+        list[int]: The permutation.
+    """
+    digits = []
+    for base in range(1, n + 1):
+        digits.append(rank % base)
+        rank //= base
+
+    remaining = list(range(n))
+    return [remaining.pop(digit) for digit in reversed(digits)]
+
+
+class CubieCube:
+    def __init__(self, cp: list[int] = None, co: list[int] = None, ep: list[int] = None, eo: list[int] = None) -> None:
+        """Initialises a cube at the cubie level. The cube is described by which corner/edge
+        is in each position, and how it is twisted/flipped there.
+
+        Args:
+            cp (list[int], optional): The corner in each of the 8 corner positions. Defaults to solved.
+            co (list[int], optional): The twist (0-2) of the corner in each position. Defaults to solved.
+            ep (list[int], optional): The edge in each of the 12 edge positions. Defaults to solved.
+            eo (list[int], optional): The flip (0-1) of the edge in each position. Defaults to solved.
+        """
+        self.cp = list(range(8)) if cp is None else list(cp)
+        self.co = [0] * 8 if co is None else list(co)
+        self.ep = list(range(12)) if ep is None else list(ep)
+        self.eo = [0] * 12 if eo is None else list(eo)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CubieCube):
+            return NotImplemented
+        return self.cp == other.cp and self.co == other.co and self.ep == other.ep and self.eo == other.eo
+
+    def __hash__(self) -> int:
+        return self.pack()
+
+    def __repr__(self) -> str:
+        return f"CubieCube(cp={self.cp}, co={self.co}, ep={self.ep}, eo={self.eo})"
+
+    @classmethod
+    def fromString(cls, state: str) -> "CubieCube":
+        """Builds a cubie cube from the 54 character string representation of a cube.
+
+        Args:
+            state (str): A string of length 54 representing the cube's state.
+
+        Raises:
+            ValueError: If the string does not describe a valid arrangement of pieces.
+
+        Returns:
+            CubieCube: The cube at the cubie level.
+        """
+        if len(state) != 54:
+            raise ValueError("A cube state must contain 54 squares.")
+
+        cube = cls()
+        for position, facelets in enumerate(CORNER_FACELETS):
+            colours = [state[i] for i in facelets]
+            twist = next((i for i in range(3) if colours[i] in UD_COLOURS), None)
+            if twist is None:
+                raise ValueError(f"Corner {colours} has no U or D colour.")
+
+            colours = tuple(colours[twist:] + colours[:twist])
+            if colours not in CORNER_COLOURS:
+                raise ValueError(f"Corner {colours} does not exist.")
+            cube.cp[position] = CORNER_COLOURS.index(colours)
+            cube.co[position] = twist
+
+        for position, facelets in enumerate(EDGE_FACELETS):
+            colours = tuple(state[i] for i in facelets)
+            if colours in EDGE_COLOURS:
+                cube.ep[position] = EDGE_COLOURS.index(colours)
+                cube.eo[position] = 0
+            elif colours[::-1] in EDGE_COLOURS:
+                cube.ep[position] = EDGE_COLOURS.index(colours[::-1])
+                cube.eo[position] = 1
+            else:
+                raise ValueError(f"Edge {colours} does not exist.")
+
+        if len(set(cube.cp)) != 8 or len(set(cube.ep)) != 12:
+            raise ValueError("Each corner and edge must appear exactly once.")
+
+        return cube
+
+    @classmethod
+    def fromCube(cls, cube: object) -> "CubieCube":
+        """Builds a cubie cube from a Cube object.
+
+        Args:
+            cube (Cube): The cube to convert.
+
+        Returns:
+            CubieCube: The cube at the cubie level.
+        """
+        return cls.fromString(str(cube))
+
+    def toString(self) -> str:
+        """Returns the 54 character string representation of the cube.
+
+        Returns:
+            str: A string of length 54 representing the cube's state.
+        """
+        state = list(SOLVED_MASK)
+        for position, facelets in enumerate(CORNER_FACELETS):
+            colours = CORNER_COLOURS[self.cp[position]]
+            for i in range(3):
+                state[facelets[(i + self.co[position]) % 3]] = colours[i]
+
+        for position, facelets in enumerate(EDGE_FACELETS):
+            colours = EDGE_COLOURS[self.ep[position]]
+            for i in range(2):
+                state[facelets[(i + self.eo[position]) % 2]] = colours[i]
+
+        return "".join(state)
+
+    def copy(self) -> "CubieCube":
+        """Returns a copy of the cube, which doesn't share its lists.
+
+        Returns:
+            CubieCube: The copy.
+        """
+        return CubieCube(self.cp, self.co, self.ep, self.eo)
+
+    def multiply(self, other: "CubieCube") -> "CubieCube":
+        """Returns the cube obtained by applying the other cube's permutation after this one.
+
+        Args:
+            other (CubieCube): The cube to apply, usually one of the move cubes.
+
+        Returns:
+            CubieCube: The product of the two cubes.
+        """
+        cp = [self.cp[other.cp[i]] for i in range(8)]
+        co = [(self.co[other.cp[i]] + other.co[i]) % 3 for i in range(8)]
+        ep = [self.ep[other.ep[i]] for i in range(12)]
+        eo = [(self.eo[other.ep[i]] + other.eo[i]) % 2 for i in range(12)]
+        return CubieCube(cp, co, ep, eo)
+
+    def applyMove(self, move: int | str) -> "CubieCube":
+        """Returns the cube after applying one of the 18 face turns.
+
+        Args:
+            move (int | str): The index of the move in MOVES, or its name (e.g. "R2").
+
+        Returns:
+            CubieCube: The cube after the move.
+        """
+        if isinstance(move, str):
+            move = MOVE_INDEX[move]
+        return self.multiply(MOVE_CUBES[move])
+
+    def getTwist(self) -> int:
+        """Returns the twist coordinate, the twists of the corners in positions URF to DBL read as a base 3
+        number, with URF's as the most significant digit. The DRB corner's twist isn't included, as the
+        twists of a valid cube always add up to a multiple of 3.
+
+        Returns:
+            int: The twist coordinate, between 0 and NUM_TWISTS - 1 (2186). 0 when every corner is untwisted.
+        """
+        twist = 0
+        for i in range(7):
+            twist = twist * 3 + self.co[i]
+        return twist
+
+    def setTwist(self, twist: int) -> None:
+        """Sets the corner twists from a twist coordinate (see getTwist). The DRB corner is twisted so
+        that the twists add up to a multiple of 3. The corner permutation isn't changed.
+
+        Args:
+            twist (int): The twist coordinate, between 0 and NUM_TWISTS - 1 (2186).
+        """
+        total = 0
+        for i in range(6, -1, -1):
+            self.co[i] = twist % 3
+            total += self.co[i]
+            twist //= 3
+        self.co[7] = -total % 3
+
+    def getFlip(self) -> int:
+        """Returns the flip coordinate, the flips of the edges in positions UR to BL read as a base 2
+        number, with UR's as the most significant digit. The BR edge's flip isn't included, as a valid
+        cube always has an even number of flipped edges.
+
+        Returns:
+            int: The flip coordinate, between 0 and NUM_FLIPS - 1 (2047). 0 when no edge is flipped.
+        """
+        flip = 0
+        for i in range(11):
+            flip = flip * 2 + self.eo[i]
+        return flip
+
+    def setFlip(self, flip: int) -> None:
+        """Sets the edge flips from a flip coordinate (see getFlip). The BR edge is flipped so that an
+        even number of edges are flipped. The edge permutation isn't changed.
+
+        Args:
+            flip (int): The flip coordinate, between 0 and NUM_FLIPS - 1 (2047).
+        """
+        total = 0
+        for i in range(10, -1, -1):
+            self.eo[i] = flip % 2
+            total += self.eo[i]
+            flip //= 2
+        self.eo[11] = total % 2
+
+    def getSlice(self) -> int:
+        """Returns the slice coordinate, which of the 4 positions hold the middle layer (FR, FL, BL, BR)
+        edges, ignoring their order. It is the index of the positions, in increasing order, in
+        SLICE_COMBINATIONS, which lists every combination of 4 of the 12 positions in lexicographic order.
+
+        Returns:
+            int: The slice coordinate, between 0 and NUM_SLICES - 1 (494). SOLVED_SLICE (494) when the
+                 middle layer edges are in the middle layer.
+        """
+        return SLICE_COMBINATION_INDEX[tuple(i for i in range(12) if self.ep[i] >= FR)]
+
+    def getCornerPerm(self) -> int:
+        """Returns the corner permutation coordinate, the lexicographic rank of cp (see permutationRank).
+
+        Returns:
+            int: The corner permutation coordinate, between 0 and NUM_CORNER_PERMS - 1 (40319). 0 when
+                 every corner is in its own position.
+        """
+        return permutationRank(self.cp)
+
+    def setCornerPerm(self, rank: int) -> None:
+        """Sets the corner permutation from a corner permutation coordinate (see getCornerPerm). The
+        corner twists aren't changed.
+
+        Args:
+            rank (int): The corner permutation coordinate, between 0 and NUM_CORNER_PERMS - 1 (40319).
+        """
+        self.cp = permutationFromRank(rank, 8)
+
+    def getEdgePerm(self) -> int:
+        """Returns the edge permutation coordinate, the lexicographic rank of ep (see permutationRank).
+
+        Returns:
+            int: The edge permutation coordinate, between 0 and NUM_EDGE_PERMS - 1 (479001599). 0 when
+                 every edge is in its own position.
+        """
+        return permutationRank(self.ep)
+
+    def setEdgePerm(self, rank: int) -> None:
+        """Sets the edge permutation from an edge permutation coordinate (see getEdgePerm). The edge
+        flips aren't changed.
+
+        Args:
+            rank (int): The edge permutation coordinate, between 0 and NUM_EDGE_PERMS - 1 (479001599).
+        """
+        self.ep = permutationFromRank(rank, 12)
+
+    def getCoordinates(self) -> tuple[int, int, int, int]:
+        """Returns the cube as (corner permutation, edge permutation, twist, flip) coordinates."""
+        return self.getCornerPerm(), self.getEdgePerm(), self.getTwist(), self.getFlip()
+
+    def pack(self) -> int:
+        """Packs the whole cube into a single integer, unique for every valid cube.
+
+        Returns:
+            int: The packed coordinates.
+        """
+        cornerPerm, edgePerm, twist, flip = self.getCoordinates()
+        return ((cornerPerm * NUM_EDGE_PERMS + edgePerm) * NUM_TWISTS + twist) * NUM_FLIPS + flip
+
+    @classmethod
+    def unpack(cls, packed: int) -> "CubieCube":
+        """Rebuilds a cube from an integer created by pack.
+
+        Args:
+            packed (int): The packed coordinates.
+
+        Returns:
+            CubieCube: The unpacked cube.
+        """
+        cube = cls()
+        packed, flip = divmod(packed, NUM_FLIPS)
+        packed, twist = divmod(packed, NUM_TWISTS)
+        cornerPerm, edgePerm = divmod(packed, NUM_EDGE_PERMS)
+        cube.setCornerPerm(cornerPerm)
+        cube.setEdgePerm(edgePerm)
+        cube.setTwist(twist)
+        cube.setFlip(flip)
+        return cube
+
+    def isValid(self) -> bool:
+        """Checks that the cube can be reached from a solved cube using face turns.
+
+        Returns:
+            bool: True if the cube is solvable, False otherwise.
+        """
+        if sorted(self.cp) != list(range(8)) or sorted(self.ep) != list(range(12)):
+            return False
+        if sum(self.co) % 3 != 0 or sum(self.eo) % 2 != 0:
+            return False
+        return permutationParity(self.cp) == permutationParity(self.ep)
+
+
+def permutationParity(perm: list[int]) -> int:
+    """Returns the parity (0 for even, 1 for odd) of a permutation.
+
+    Args:
+        perm (list[int]): The permutation.
+
+    Returns:
+        int: The parity of the permutation.
+    """
+    parity = 0
+    for i in range(len(perm)):
+        for j in range(i + 1, len(perm)):
+            if perm[i] > perm[j]:
+                parity ^= 1
+    return parity
+
+
+def _buildMoveCube(move: str) -> CubieCube:
+    """Derives the cubie level effect of a move from its facelet permutation."""
+    state = SOLVED_STATE
+    face, suffix = move[0], move[1:]
+    turns = [face + "'"] if suffix == "'" else [face] * (2 if suffix == "2" else 1)
+    for turn in turns:
+        state = applyMove(state, turn)
+    return CubieCube.fromString(decodeState(state))
+
+
+MOVE_CUBES = [_buildMoveCube(move) for move in MOVES]
+
+
+def stateToCoordinates(state: str) -> tuple[int, int, int, int]:
+    """Converts a cube string into (corner permutation, edge permutation, twist, flip) coordinates.
+
+    Args:
+        state (str): A string of length 54 representing the cube's state.
+
+    Returns:
+        tuple[int, int, int, int]: The coordinates of the cube.
+    """
+    return CubieCube.fromString(state).getCoordinates()
+
+
+def packState(state: str) -> int:
+    """Converts a cube string into a single integer, which is cheaper to hash and store than the string.
+
+    Args:
+        state (str): A string of length 54 representing the cube's state.
+
+    Returns:
+        int: The packed coordinates.
+    """
+    return CubieCube.fromString(state).pack()
+
+
+# move tables are built for all coordinates at once with numpy, since building them
+# one coordinate at a time through CubieCube takes several seconds for the larger tables
+def _rankPermutations(perms: np.ndarray) -> np.ndarray:
+    """Vectorised version of permutationRank over the rows of an array."""
+    n = perms.shape[1]
+    ranks = np.zeros(perms.shape[0], dtype=np.int64)
+    for i in range(n):
+        smaller = (perms[:, i + 1 :] < perms[:, i : i + 1]).sum(axis=1)
+        ranks = ranks * (n - i) + smaller
+    return ranks
+
+
+def _buildTwistMoveTable() -> np.ndarray:
+    twists = np.arange(NUM_TWISTS)
+    co = np.zeros((NUM_TWISTS, 8), dtype=np.int64)
+    for i in range(6, -1, -1):
+        co[:, i] = twists % 3
+        twists = twists // 3
+    co[:, 7] = -co[:, :7].sum(axis=1) % 3
+
+    table = np.zeros((NUM_TWISTS, NUM_MOVES), dtype=np.uint16)
+    powers = 3 ** np.arange(6, -1, -1)
+    for move, moveCube in enumerate(MOVE_CUBES):
+        newCo = (co[:, moveCube.cp] + moveCube.co) % 3
+        table[:, move] = newCo[:, :7] @ powers
+    return table
+
+
+def _buildFlipMoveTable() -> np.ndarray:
+    flips = np.arange(NUM_FLIPS)
+    eo = np.zeros((NUM_FLIPS, 12), dtype=np.int64)
+    for i in range(10, -1, -1):
+        eo[:, i] = flips % 2
+        flips = flips // 2
+    eo[:, 11] = eo[:, :11].sum(axis=1) % 2
+
+    table = np.zeros((NUM_FLIPS, NUM_MOVES), dtype=np.uint16)
+    powers = 2 ** np.arange(10, -1, -1)
+    for move, moveCube in enumerate(MOVE_CUBES):
+        newEo = (eo[:, moveCube.ep] + moveCube.eo) % 2
+        table[:, move] = newEo[:, :11] @ powers
+    return table
+
+
+def _buildSliceMoveTable() -> np.ndarray:
+    occupied = np.zeros((NUM_SLICES, 12), dtype=bool)
+    for index, combination in enumerate(SLICE_COMBINATIONS):
+        occupied[index, list(combination)] = True
+
+    table = np.zeros((NUM_SLICES, NUM_MOVES), dtype=np.uint16)
+    for move, moveCube in enumerate(MOVE_CUBES):
+        newOccupied = occupied[:, moveCube.ep]
+        for index in range(NUM_SLICES):
+            table[index, move] = SLICE_COMBINATION_INDEX[tuple(np.flatnonzero(newOccupied[index]))]
+    return table
+
+
+def _buildCornerPermMoveTable() -> np.ndarray:
+    perms = np.array(list(permutations(range(8))), dtype=np.int8)
+    table = np.zeros((NUM_CORNER_PERMS, NUM_MOVES), dtype=np.uint16)
+    for move, moveCube in enumerate(MOVE_CUBES):
+        table[:, move] = _rankPermutations(perms[:, moveCube.cp])
+    return table
+
+
+MOVE_TABLE_BUILDERS = {
+    "twist": _buildTwistMoveTable,
+    "flip": _buildFlipMoveTable,
+    "slice": _buildSliceMoveTable,
+    "corner_perm": _buildCornerPermMoveTable,
+}
+
+
+# bump the version of a table whenever the way it is built changes, so cached copies are rebuilt
+MOVE_TABLE_VERSION = 1
+
+for _coordinate, _builder in MOVE_TABLE_BUILDERS.items():
+    registerTable(f"{_coordinate}_move", MOVE_TABLE_VERSION, _builder)
+
+
+def getMoveTable(coordinate: str) -> np.ndarray:
+    """Returns the move table for a coordinate. Row i holds the coordinate reached by applying
+    each of the 18 moves (in the order of MOVES) to a cube whose coordinate is i.
+
+    Args:
+        coordinate (str): One of "twist", "flip", "slice" or "corner_perm".
+
+    Returns:
+        np.ndarray: The move table, with shape (number of coordinate values, 18).
+    """
+    if coordinate not in MOVE_TABLE_BUILDERS:
+        raise ValueError(f"Unknown coordinate: {coordinate}")
+    return getTable(f"{coordinate}_move")
@@ -2,9 +2,84 @@ import copy
 import logging
 import random
 import time
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator
 
 from .constants import *
-from .cube_utils import checkMask, combineMasks, optimiseMoves, printAnalysis, rotate
+from .cube_state import (
+    MOVE_GATHERS,
+    SOLVED_STATE,
+    applyPermutation,
+    composeMoves,
+    decodeState,
+    encodeState,
+    facesToState,
+    stateToFaces,
+)
+from .cube_utils import countMoves, optimiseMoves, printAnalysis
+from .instrumentation import COUNTERS, StageObserver, StageSpan
+from .masks import (
+    COMPILED_F2L_CORNERS_INSERTION_MASKS,
+    COMPILED_F2L_CORNERS_SOLVED_MASKS,
+    COMPILED_F2L_MIDDLE_INSERTION_MASKS,
+    COMPILED_F2L_MIDDLE_SOLVED_MASKS,
+    COMPILED_SOLVED_MASK,
+    COMPILED_WHITE_CROSS_INSERTION_MASKS,
+    COMPILED_WHITE_CROSS_RECURSION_MASKS,
+    COMPILED_WHITE_CROSS_SOLVED_MASKS,
+    COMPILED_YELLOW_CROSS_SOLVED_MASK,
+    COMPILED_YELLOW_EDGES_SOLVED_MASK,
+    COMPILED_YELLOW_L_MASKS,
+    COMPILED_YELLOW_LINE_MASKS,
+    EMPTY_MASK,
+    CompiledMask,
+    compileMask,
+)
+from .pathfinding import findPath, getTranspositionTable
+from .sequences import SEQUENCE_MOVES, compileSequence, relativeCodes, sequenceMoves
+from .solution_cache import getSolutionCache
+from .two_phase import getSolver
+
+# the gather and movesMade label of each move code
+CODE_GATHERS = tuple(MOVE_GATHERS[move] for move, _ in SEQUENCE_MOVES)
+CODE_LABELS = tuple(label for _, label in SEQUENCE_MOVES)
+
+# the methods the beginner method solves the cube with, in order
+BEGINNER_STAGES = (
+    "solveCross",
+    "solveF2LCorners",
+    "solveF2LMiddlePieces",
+    "solveYellowCross",
+    "alignYellowEdges",
+    "solveYellowCorners",
+    "final",
+)
+
+
+@lru_cache(maxsize=1024)
+def _compileFaceSequence(face: str, sequence: str) -> tuple[itemgetter, tuple[str, ...]]:
+    """Compiles a sequence seen from one of the side faces (see Cube.convertSequenceFromFace) into the
+    gather applying all of it at once and the labels of its moves. The solver only ever applies a few
+    fixed algorithms from each face, so each is compiled once.
+
+    Args:
+        face (str): The colour of the face the sequence is seen from.
+        sequence (str): A string representing the sequence of moves.
+
+    Returns:
+        tuple[itemgetter, tuple[str, ...]]: The gather for the whole sequence and the label of each move.
+    """
+    faceMapping = RELATIVE_FACE_MAPPING.get(face, {})
+    codes = compileSequence("".join(faceMapping.get(letter, letter) for letter in sequence))
+    return itemgetter(*composeMoves(sequenceMoves(codes))), tuple(CODE_LABELS[code] for code in codes)
+
+
+def _unique(items: Iterable) -> list:
+    """Removes duplicates from the masks a solver stage is tracking, keeping the first of each in order.
+    Sets would drop the duplicates too, but then the masks would be tried in hash order."""
+    return list(dict.fromkeys(items))
 
 
 class Cube:
@@ -16,19 +91,22 @@ class Cube:
                                       If None, the cube is initialised in a solved state.
                                       Defaults to None.
         """
-        self.faces: list[list[str]] = [[[colour] * 3 for _ in range(3)] for colour in COLOURS]
+        self.state: bytes = SOLVED_STATE
+        # the string of the state it was last built from. Moves replace the state rather than
+        # changing it, so the string is only rebuilt when the state object is a different one
+        self.__strState: bytes = None
+        self.__str: str = None
         self.initialiseFaces(startStr)
         self.calculateFaces("R", "W")
 
         self.movesMade = []
+        self.observers: list[StageObserver] = []
 
     def __str__(self) -> str:
-        outputString = ""
-        for face in range(6):
-            for row in self.faces[face]:
-                for square in row:
-                    outputString += square
-        return outputString
+        if self.__strState is not self.state:
+            self.__str = decodeState(self.state)
+            self.__strState = self.state
+        return self.__str
 
     def __repr__(self) -> str:
         return f"Cube('{str(self)}')"
@@ -36,12 +114,28 @@ class Cube:
     def __getitem__(self, index: int) -> list[list[str]]:
         return self.faces[index]
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Cube):
+            return NotImplemented
+        return self.state == other.state
+
     def __hash__(self) -> int:
-        return hash(str(self))
+        # bytes cache their hash, so this is only computed once per state
+        return hash(self.state)
+
+    @property
+    def faces(self) -> list[list[list[str]]]:
+        """A nested list view (face -> row -> square) of the cube's state. Modifying the
+        returned lists does not change the cube, assign to faces instead."""
+        return stateToFaces(self.state)
+
+    @faces.setter
+    def faces(self, faces: list[list[list[str]]]) -> None:
+        self.state = facesToState(faces)
 
     @property
     def isSolved(self) -> bool:
-        return str(self) == SOLVED_MASK
+        return self.state == SOLVED_STATE
 
     @property
     def optimisedMoves(self) -> list[str]:
@@ -54,17 +148,7 @@ class Cube:
             faceStr (str): A string of length 54 representing the cube's faces.
         """
         if faceStr:
-            self.faces = []
-            counter = 0
-            for _ in range(0, 6):
-                face = []
-                for ii in range(3):
-                    face.append([])
-                    for _ in range(3):
-                        face[ii].append(faceStr[counter])
-                        counter += 1
-
-                self.faces.append(face)
+            self.state = encodeState(faceStr)
 
     def calculateFaces(self, front: str, top: str) -> None:
         """Calculates faces relative to a chosen front face and a chosen top face.
@@ -106,6 +190,7 @@ class Cube:
             "U": self.top,
             "D": self.bottom,
         }
+        self.relativeCodes = relativeCodes(self.relativeMoveMap)
 
     def getPlottingList(self) -> list[str]:
         """Returns a list of colours in the correct order to be plotted.
@@ -114,8 +199,9 @@ class Cube:
             list[str]: A list of colours in the order required for plotting.
         """
         outputList = []
+        faces = self.faces
         for face in [(0, -1, 1), (5, 1, 1), (2, 1, 1), (4, 1, -1), (1, 1, -1), (3, 1, 1)]:
-            for row in self.faces[face[0]][:: face[1]]:
+            for row in faces[face[0]][:: face[1]]:
                 for square in row[:: face[2]]:
                     outputList.append(PLOTTING_COLOUR_MAP[square])
         return outputList
@@ -158,20 +244,22 @@ class Cube:
 
         print()
 
-    def randomise(self) -> list[str]:
-        """Randomises the cube to a valid state by performing a series of random moves.
+    def randomise(self, rng: random.Random = None) -> list[str]:
+        """Randomises the cube to a valid state by performing a series of random moves, each a quarter
+        turn either way or a half turn.
+
+        Args:
+            rng (random.Random, optional): The random number generator to use. Defaults to None, which uses
+                                           the random module's shared generator.
 
         Returns:
             list[str]: The sequence of moves used to randomise the cube.
         """
+        rng = rng if rng is not None else random
         turns = ["R", "L", "U", "D", "F", "B"]
         sequence = []
         for _ in range(50):
-            move = turns[random.randint(0, 5)]
-
-            if random.random() > 0.5:
-                move += "i"
-
+            move = turns[rng.randint(0, 5)] + rng.choice(("", "i", "2"))
             sequence.append(move)
 
         self.executeSequence("".join(sequence))
@@ -188,7 +276,10 @@ class Cube:
         invertedSequence = ""
         for i in range(len(sequence) - 1, -1, -1):
             turn = sequence[i]
-            if len(turn) == 2:
+            if turn.endswith("2"):
+                # a half turn is its own inverse
+                invertedSequence += turn
+            elif len(turn) == 2:
                 invertedSequence += turn[0]
             else:
                 invertedSequence += turn + "i"
@@ -201,21 +292,7 @@ class Cube:
         Args:
             direction (bool, optional): The direction to rotate the face. Defaults to CLOCKWISE.
         """
-        self.__rotateFace(0, direction)
-        if direction == CLOCKWISE:
-            self.faces[4][0], self.faces[1][0], self.faces[2][0], self.faces[3][0] = (
-                self.faces[1][0],
-                self.faces[2][0],
-                self.faces[3][0],
-                self.faces[4][0],
-            )
-        else:
-            self.faces[1][0], self.faces[2][0], self.faces[3][0], self.faces[4][0] = (
-                self.faces[4][0],
-                self.faces[1][0],
-                self.faces[2][0],
-                self.faces[3][0],
-            )
+        self.__rotateFace("U", direction)
 
     def rotateD(self, direction: bool = CLOCKWISE) -> None:
         """Performs a rotation of the down face.
@@ -223,21 +300,7 @@ class Cube:
         Args:
             direction (bool, optional): The direction to rotate the face. Defaults to CLOCKWISE.
         """
-        self.__rotateFace(5, direction)
-        if direction == CLOCKWISE:
-            self.faces[1][2], self.faces[2][2], self.faces[3][2], self.faces[4][2] = (
-                self.faces[4][2],
-                self.faces[1][2],
-                self.faces[2][2],
-                self.faces[3][2],
-            )
-        else:
-            self.faces[4][2], self.faces[1][2], self.faces[2][2], self.faces[3][2] = (
-                self.faces[1][2],
-                self.faces[2][2],
-                self.faces[3][2],
-                self.faces[4][2],
-            )
+        self.__rotateFace("D", direction)
 
     def rotateF(self, direction: bool = CLOCKWISE) -> None:
         """Performs a rotation of the front face.
@@ -245,34 +308,7 @@ class Cube:
         Args:
             direction (bool, optional): The direction to rotate the face. Defaults to CLOCKWISE.
         """
-        self.__rotateFace(2, direction)
-        if direction == CLOCKWISE:
-            for i in range(3):
-                (
-                    self.faces[1][2 - i][2],
-                    self.faces[0][2][i],
-                    self.faces[3][i][0],
-                    self.faces[5][0][2 - i],
-                ) = (
-                    self.faces[5][0][2 - i],
-                    self.faces[1][2 - i][2],
-                    self.faces[0][2][i],
-                    self.faces[3][i][0],
-                )
-
-        else:
-            for i in range(3):
-                (
-                    self.faces[1][2 - i][2],
-                    self.faces[0][2][i],
-                    self.faces[3][i][0],
-                    self.faces[5][0][2 - i],
-                ) = (
-                    self.faces[0][2][i],
-                    self.faces[3][i][0],
-                    self.faces[5][0][2 - i],
-                    self.faces[1][2 - i][2],
-                )
+        self.__rotateFace("F", direction)
 
     def rotateB(self, direction: bool = CLOCKWISE) -> None:
         """Performs a rotation of the back face.
@@ -280,34 +316,7 @@ class Cube:
         Args:
             direction (bool, optional): The direction to rotate the face. Defaults to CLOCKWISE.
         """
-        self.__rotateFace(4, direction)
-        if direction == CLOCKWISE:
-            for i in range(3):
-                (
-                    self.faces[1][2 - i][0],
-                    self.faces[0][0][i],
-                    self.faces[3][i][2],
-                    self.faces[5][2][2 - i],
-                ) = (
-                    self.faces[0][0][i],
-                    self.faces[3][i][2],
-                    self.faces[5][2][2 - i],
-                    self.faces[1][2 - i][0],
-                )
-
-        else:
-            for i in range(3):
-                (
-                    self.faces[1][2 - i][0],
-                    self.faces[0][0][i],
-                    self.faces[3][i][2],
-                    self.faces[5][2][2 - i],
-                ) = (
-                    self.faces[5][2][2 - i],
-                    self.faces[1][2 - i][0],
-                    self.faces[0][0][i],
-                    self.faces[3][i][2],
-                )
+        self.__rotateFace("B", direction)
 
     def rotateR(self, direction: bool = CLOCKWISE) -> None:
         """Performs a rotation of the right face.
@@ -315,34 +324,7 @@ class Cube:
         Args:
             direction (bool, optional): The direction to rotate the face. Defaults to CLOCKWISE.
         """
-        self.__rotateFace(3, direction)
-        if direction == CLOCKWISE:
-            for i in range(3):
-                (
-                    self.faces[2][2 - i][2],
-                    self.faces[0][2 - i][2],
-                    self.faces[4][i][0],
-                    self.faces[5][2 - i][2],
-                ) = (
-                    self.faces[5][2 - i][2],
-                    self.faces[2][2 - i][2],
-                    self.faces[0][2 - i][2],
-                    self.faces[4][i][0],
-                )
-
-        else:
-            for i in range(3):
-                (
-                    self.faces[2][2 - i][2],
-                    self.faces[0][2 - i][2],
-                    self.faces[4][i][0],
-                    self.faces[5][2 - i][2],
-                ) = (
-                    self.faces[0][2 - i][2],
-                    self.faces[4][i][0],
-                    self.faces[5][2 - i][2],
-                    self.faces[2][2 - i][2],
-                )
+        self.__rotateFace("R", direction)
 
     def rotateL(self, direction: bool = CLOCKWISE) -> None:
         """Performs a rotation of the left face.
@@ -350,134 +332,49 @@ class Cube:
         Args:
             direction (bool, optional): The direction to rotate the face. Defaults to CLOCKWISE.
         """
-        self.__rotateFace(1, direction)
-        if direction == CLOCKWISE:
-            for i in range(3):
-                (
-                    self.faces[2][2 - i][0],
-                    self.faces[0][2 - i][0],
-                    self.faces[4][i][2],
-                    self.faces[5][2 - i][0],
-                ) = (
-                    self.faces[0][2 - i][0],
-                    self.faces[4][i][2],
-                    self.faces[5][2 - i][0],
-                    self.faces[2][2 - i][0],
-                )
+        self.__rotateFace("L", direction)
 
-        else:
-            for i in range(3):
-                (
-                    self.faces[2][2 - i][0],
-                    self.faces[0][2 - i][0],
-                    self.faces[4][i][2],
-                    self.faces[5][2 - i][0],
-                ) = (
-                    self.faces[5][2 - i][0],
-                    self.faces[2][2 - i][0],
-                    self.faces[0][2 - i][0],
-                    self.faces[4][i][2],
-                )
-
-    def __rotateFace(self, face: int = 2, direction: bool = CLOCKWISE) -> None:
-        """Rotates the specified face of the cube 90 degrees clockwise or anti-clockwise.
+    def __rotateFace(self, face: str = "F", direction: bool = CLOCKWISE) -> None:
+        """Rotates the specified face of the cube 90 degrees clockwise or anti-clockwise by
+        applying the precomputed permutation for that move to the cube's state.
 
         Args:
-            face (int, optional): The face to rotate. Defaults to 2 (the front face).
+            face (str, optional): The face to rotate in face notation (U, D, F, B, R, L). Defaults to "F".
             direction (bool, optional): The direction to rotate the face. Defaults to CLOCKWISE.
         """
-        squares = []
+        move = face if direction == CLOCKWISE else face + "'"
+        self.state = applyPermutation(self.state, MOVE_GATHERS[move])
 
-        if direction == CLOCKWISE:
-            order = CLOCKWISE_TURNS
-        else:
-            order = ANTI_CLOCKWISE_TURNS
-
-        for square in SPIRAL_ORDER:
-            column = square % 3
-            row = square // 3
-
-            squares.append(self.faces[face][row][column])
-
-        for squareIndex in range(len(order)):
-            square = order[squareIndex]
-            column = square % 3
-            row = square // 3
-
-            self.faces[face][row][column] = squares[(squareIndex)]
-
-    def executeSequence(self, sequence: str, useColours: bool = False) -> None:
+    def executeSequence(self, sequence: str | tuple[int, ...], useColours: bool = False) -> None:
         """Executes a sequence of moves on the Rubik's Cube.
 
         Args:
-            sequence (str): A string representing the sequence of moves to execute.
+            sequence (str | tuple[int, ...]): A string representing the sequence of moves to execute, or a
+                                              sequence already compiled with compileSequence.
             useColours (bool, optional): If True, uses colour notation (R, G, W, Y, B, O) instead of
-                                         face notation (R, L, U, D, F, B). Defaults to False.
-        """
-        seq = sequence.replace(" ", "")
-
-        if not useColours:
-            letterToFunc = {
-                "R": self.rotateR,
-                "L": self.rotateL,
-                "U": self.rotateU,
-                "D": self.rotateD,
-                "F": self.rotateF,
-                "B": self.rotateB,
-            }
-        else:
-            letterToFunc = {
-                "B": self.rotateR,
-                "G": self.rotateL,
-                "W": self.rotateU,
-                "Y": self.rotateD,
-                "R": self.rotateF,
-                "O": self.rotateB,
-            }
-
-        i = 0
-        while i < len(seq):
-            ch = seq[i]
-            if ch not in letterToFunc:
-                i += 1
-                continue
-
-            func = letterToFunc[ch]
-            direction = CLOCKWISE
-            repeats = 1
-            j = i + 1
-
-            if j < len(seq) and seq[j] in ("'", "i"):
-                direction = ANTICLOCKWISE
-                j += 1
-
-            elif j < len(seq) and seq[j].isdigit():
-                numStr = ""
-                while j < len(seq) and seq[j].isdigit():
-                    numStr += seq[j]
-                    j += 1
-                try:
-                    repeats = max(1, int(numStr))
-                except ValueError:
-                    repeats = 1
-
-            moveLabel = ch + ("i" if direction == -1 else "")
-            for _ in range(repeats):
-                func(direction)
-                self.movesMade.append(moveLabel)
-
-            i = j
-
-    def checkMask(self, mask: str) -> bool:
+                                         face notation (R, L, U, D, F, B). Ignored for compiled sequences.
+                                         Defaults to False.
+        """
+        codes = sequence if isinstance(sequence, tuple) else compileSequence(sequence, useColours)
+        state = self.state
+        for code in codes:
+            state = applyPermutation(state, CODE_GATHERS[code])
+        self.state = state
+        self.movesMade.extend([CODE_LABELS[code] for code in codes])
+
+    def checkMask(self, mask: str | CompiledMask) -> bool:
         """Checks if the cube matches a mask pattern.
 
         Args:
-            mask (str): A string of length 54 representing the mask pattern.
+            mask (str | CompiledMask): A string of length 54 representing the mask pattern, or a compiled mask.
 
         Returns:
             bool: True if the cube matches the mask, False otherwise.
         """
-        return checkMask(mask, str(self))
+        if not isinstance(mask, CompiledMask):
+            mask = compileMask(mask)
+        COUNTERS.maskChecks += 1
+        return mask.matches(self.state)
 
     def getOppositeFace(self, colour: str) -> str:
         """Returns the opposite face relative to the given face colour
@@ -527,64 +424,161 @@ class Cube:
         """
         return self.relativeMoveMap.get(move[0], move[0]) + move[1:]
 
-    def executeSequenceRelative(self, sequence: str) -> None:
+    def executeSequenceRelative(self, sequence: str | tuple[int, ...]) -> None:
         """Executes a sequence of moves relative to the current front and top faces.
 
         Args:
-            sequence (str): A string representing the sequence of moves to execute.
+            sequence (str | tuple[int, ...]): A string representing the sequence of moves to execute, or a
+                                              sequence already compiled with compileSequence.
         """
-        out = ""
-
-        for letter in sequence:
-            out += self.relativeMoveMap.get(letter, letter)
-
-        self.executeSequence(out, True)
+        codes = sequence if isinstance(sequence, tuple) else compileSequence(sequence)
+        self.executeSequence(tuple(self.relativeCodes[code] for code in codes))
 
     def convertSequenceFromFace(self, face: str, sequence: str) -> None:
         """Converts a sequence of moves from the perspective of a given face.
 
         Note - this assumes the white face is currently at the top and the function
-        is being called on the Red, Blue, Green or Orange faces.
+        is being called on the Red, Blue, Green or Orange faces. Red is the front face,
+        so sequences from it are executed unchanged.
+
+        Each (face, sequence) pair is compiled once into a single permutation, so executing it
+        costs the same however long the sequence is. The moves are still added to movesMade.
 
         Args:
             face (str): The colour of the face to convert from.
             sequence (str): A string representing the sequence of moves to convert.
         """
-        out = ""
-        for letter in sequence:
-            out += RELATIVE_FACE_MAPPING.get(face, {}).get(letter, letter)
+        gather, labels = _compileFaceSequence(face, sequence)
+        self.state = applyPermutation(self.state, gather)
+        self.movesMade.extend(labels)
+
+    def solve(self, method: str = "beginner", maxLength: int = 22, timeout: float = 1.0, useCache: bool = True) -> None:
+        """Solves the cube. The beginner method solves the cube stage by stage, using a
+        combination of pathfinding and predefined sequences to achieve the solution. The
+        two_phase method uses Kociemba's two phase algorithm, which finds much shorter solutions.
+
+        If a solution cache is set (see solution_cache.setSolutionCache), it is checked first, and
+        solutions found are added to it.
 
-        self.executeSequence(out)
+        Args:
+            method (str, optional): The solving method, either "beginner" or "two_phase". Defaults to "beginner".
+            maxLength (int, optional): two_phase only - stop searching once a solution of at most this many
+                                       moves is found. Defaults to 22.
+            timeout (float, optional): two_phase only - the time in seconds after which the shortest solution
+                                       found so far is used. Defaults to 1.0.
+            useCache (bool, optional): Whether to use the solution cache, if one is set. Defaults to True.
+        """
+        if method not in ("beginner", "two_phase"):
+            logging.critical(f"Unknown solving method: {method}")
+            raise ValueError(f"Unknown solving method: {method}")
+
+        cache = getSolutionCache() if useCache else None
+        if cache is not None:
+            methodKey = cache.methodKey(method, maxLength if method == "two_phase" else None)
+            moves = cache.lookup(self.state, methodKey)
+            if moves is not None:
+                self.movesMade = []
+                if self.observers:
+                    self.__runStage("solution_cache", lambda: self.executeSequence("".join(moves)))
+                else:
+                    self.executeSequence("".join(moves))
+                return
+            startState = self.state
 
-    def solve(self) -> None:
-        """Solves the cube stage by stage, using a combination of pathfinding and
-        predefined sequences to achieve the solution."""
         self.movesMade = []
-        self.solveCross()
-        self.solveF2LCorners()
-        self.solveF2LMiddlePieces()
-        self.solveYellowCross()
-        self.alignYellowEdges()
-        self.solveYellowCorners()
-        self.final()
+        if method == "two_phase":
+            if self.observers:
+                self.__runStage("two_phase", lambda: self.__solveTwoPhase(maxLength, timeout))
+            else:
+                self.__solveTwoPhase(maxLength, timeout)
+        elif self.observers:
+            for stage in BEGINNER_STAGES:
+                self.__runStage(stage, getattr(self, stage))
+        else:
+            for stage in BEGINNER_STAGES:
+                getattr(self, stage)()
+
+        if cache is not None:
+            cache.store(startState, methodKey, self.movesMade)
+
+    def __solveTwoPhase(self, maxLength: int, timeout: float) -> None:
+        """Solves the cube with the two phase algorithm, counting the nodes it searched."""
+        solver = getSolver()
+        self.executeSequence("".join(solver.solve(str(self), maxLength, timeout)))
+        COUNTERS.nodesExpanded += solver.nodes
+
+    def __runStage(self, stage: str, run: Callable[[], None]) -> None:
+        """Runs one stage of a solve, then passes the time it took and the work it did to the observers."""
+        movesBefore = len(self.movesMade)
+        nodesBefore = COUNTERS.nodesExpanded
+        checksBefore = COUNTERS.maskChecks
+        startTime = time.perf_counter()
+        startCpuTime = time.thread_time()
+        run()
+        span = StageSpan(
+            stage,
+            time.perf_counter() - startTime,
+            time.thread_time() - startCpuTime,
+            len(self.movesMade) - movesBefore,
+            COUNTERS.nodesExpanded - nodesBefore,
+            COUNTERS.maskChecks - checksBefore,
+        )
+        for observer in self.observers:
+            observer(span)
+
+    def addObserver(self, observer: StageObserver) -> None:
+        """Adds a function which is called with a StageSpan after each stage of every solve. With no
+        observers, solve does no extra work.
+
+        Args:
+            observer (StageObserver): The function to call.
+        """
+        self.observers.append(observer)
+
+    def removeObserver(self, observer: StageObserver) -> None:
+        """Removes an observer added with addObserver.
+
+        Args:
+            observer (StageObserver): The function to remove.
+        """
+        self.observers.remove(observer)
+
+    @contextmanager
+    def collectSpans(self) -> Iterator[list[StageSpan]]:
+        """Collects a StageSpan for each stage of the solves made inside the with block, e.g.
+
+            with cube.collectSpans() as spans:
+                cube.solve()
+
+        Yields:
+            list[StageSpan]: The list the spans are appended to.
+        """
+        spans = []
+        observer = spans.append
+        self.addObserver(observer)
+        try:
+            yield spans
+        finally:
+            self.removeObserver(observer)
 
     def solveCross(self) -> None:
         """Solves the white cross on the top of the cube."""
 
         # the different masks needed to solve the white cross
-        solvedMasks = copy.deepcopy(WHITE_CROSS_SOLVED_MASKS)
-        recurseMasks = copy.deepcopy(WHITE_CROSS_RECURSION_MASKS)
-        insertionMasks = copy.deepcopy(WHITE_CROSS_INSERTION_MASKS)
+        solvedMasks = list(COMPILED_WHITE_CROSS_SOLVED_MASKS)
+        recurseMasks = list(COMPILED_WHITE_CROSS_RECURSION_MASKS)
+        insertionMasks = list(COMPILED_WHITE_CROSS_INSERTION_MASKS)
 
         numCorrect = 0
-        removed = "." * 54
+        removed = EMPTY_MASK
         while numCorrect != 4:
             toRemove = []
             # checking for any pieces that can be inserted directly
             for face, mask, pattern in insertionMasks:
                 if self.checkMask(mask):
                     toRemove.append((face, mask, pattern))
-                    recurseMasks.discard(mask)
+                    if mask in recurseMasks:
+                        recurseMasks.remove(mask)
                     self.convertSequenceFromFace(face, pattern)
 
             for item in toRemove:
@@ -604,13 +598,13 @@ class Cube:
 
             for item in toRemove:
                 solvedMasks.remove(item)
-                removed = combineMasks(removed, item[1])
+                removed = removed.combine(item[1])
 
             if len(toRemove) > 0:
-                recurseMasks = set(map(lambda x: combineMasks(x, removed), recurseMasks))
-                insertionMasks = set(map(lambda x: (x[0], combineMasks(x[1], removed), x[2]), insertionMasks))
+                recurseMasks = _unique(map(lambda x: x.combine(removed), recurseMasks))
+                insertionMasks = _unique(map(lambda x: (x[0], x[1].combine(removed), x[2]), insertionMasks))
 
-            recurseMasks = set(filter(lambda x: not self.checkMask(x), recurseMasks))
+            recurseMasks = list(filter(lambda x: not self.checkMask(x), recurseMasks))
 
             # if no pieces were inserted or found, use pathfinding to get a piece into position
 
@@ -627,8 +621,8 @@ class Cube:
     def solveF2LCorners(self) -> None:
         """Solves all white corner pieces as part of the F2L (First 2 Layers) solution."""
 
-        insertionMasks = copy.deepcopy(F2L_CORNERS_INSERTION_MASKS)
-        solvedMasks = copy.deepcopy(F2L_CORNERS_SOLVED_MASKS)
+        insertionMasks = list(COMPILED_F2L_CORNERS_INSERTION_MASKS)
+        solvedMasks = list(COMPILED_F2L_CORNERS_SOLVED_MASKS)
 
         # searches until all 4 corners are correctly placed
         insertedCorners = 0
@@ -638,7 +632,7 @@ class Cube:
                 if self.checkMask(mask[1]):
                     toRemove.append(mask)
                     filtered = filter(lambda x: x[0][0] != mask[0], insertionMasks)
-                    insertionMasks = set(map(lambda a: (a[0], combineMasks(a[1], mask[1])), filtered))
+                    insertionMasks = _unique(map(lambda a: (a[0], a[1].combine(mask[1])), filtered))
                     insertedCorners += 1
 
             for masks in toRemove:
@@ -685,8 +679,8 @@ class Cube:
     def solveF2LMiddlePieces(self) -> None:
         """Inserts the middle layer edge pieces correctly as part of the F2L (First 2 Layers) solution."""
 
-        solvedMasks = copy.deepcopy(F2L_MIDDLE_SOLVED_MASKS)
-        insertionMasks = copy.deepcopy(F2L_MIDDLE_INSERTION_MASKS)
+        solvedMasks = list(COMPILED_F2L_MIDDLE_SOLVED_MASKS)
+        insertionMasks = list(COMPILED_F2L_MIDDLE_INSERTION_MASKS)
 
         correctPieces = 0
         while correctPieces != 4:
@@ -695,7 +689,7 @@ class Cube:
                 if self.checkMask(mask[1]):
                     toRemove.append(mask)
                     filtered = filter(lambda x: sorted(x[0]) != sorted(mask[0]), insertionMasks)
-                    insertionMasks = list(map(lambda a: (a[0], combineMasks(a[1], mask[1])), filtered))
+                    insertionMasks = list(map(lambda a: (a[0], a[1].combine(mask[1])), filtered))
                     correctPieces += 1
 
             for masks in toRemove:
@@ -731,33 +725,34 @@ class Cube:
 
         alg = YELLOW_CROSS_INSERTION_ALGORITHM
 
-        while not self.checkMask(YELLOW_CROSS_SOLVED_MASK):
+        while not self.checkMask(COMPILED_YELLOW_CROSS_SOLVED_MASK):
             executed = False
-            for face, mask in YELLOW_L_MASKS:
+            for face, mask in COMPILED_YELLOW_L_MASKS:
                 if self.checkMask(mask):
                     self.convertSequenceFromFace(face, alg)
                     executed = True
                     break
 
-            for face, mask in YELLOW_LINE_MASKS:
+            for face, mask in COMPILED_YELLOW_LINE_MASKS:
                 if self.checkMask(mask):
                     self.convertSequenceFromFace(face, alg)
                     executed = True
                     break
 
             if not executed:
-                self.executeSequence(alg)
+                self.convertSequenceFromFace("R", alg)
 
     def alignYellowEdges(self) -> None:
         """Aligns the yellow edges so the corners can be inserted."""
-        while not self.checkMask(YELLOW_EDGES_SOLVED_MASK):
+        while not self.checkMask(COMPILED_YELLOW_EDGES_SOLVED_MASK):
             numMatches = 0
             notMatchingFaces = []
+            faces = self.faces
             for face in range(1, 5):
-                if self.faces[face][1][1] == self.faces[face][2][1]:
+                if faces[face][1][1] == faces[face][2][1]:
                     numMatches += 1
                 else:
-                    notMatchingFaces.append(self.faces[face][1][1])
+                    notMatchingFaces.append(faces[face][1][1])
 
             if numMatches == 4:
                 return
@@ -783,28 +778,29 @@ class Cube:
             list[str]: A list of face colours that have valid corners.
         """
         validCorners = []
+        faces = self.faces
         if (
-            self.faces[2][2][2] in {"R", "Y", "B"}
-            and self.faces[3][2][0] in {"R", "Y", "B"}
-            and self.faces[5][0][2] in {"R", "Y", "B"}
+            faces[2][2][2] in {"R", "Y", "B"}
+            and faces[3][2][0] in {"R", "Y", "B"}
+            and faces[5][0][2] in {"R", "Y", "B"}
         ):
             validCorners.append("B")
         if (
-            self.faces[3][2][2] in {"O", "Y", "B"}
-            and self.faces[4][2][0] in {"O", "Y", "B"}
-            and self.faces[5][2][2] in {"O", "Y", "B"}
+            faces[3][2][2] in {"O", "Y", "B"}
+            and faces[4][2][0] in {"O", "Y", "B"}
+            and faces[5][2][2] in {"O", "Y", "B"}
         ):
             validCorners.append("O")
         if (
-            self.faces[4][2][2] in {"O", "Y", "G"}
-            and self.faces[1][2][0] in {"O", "Y", "G"}
-            and self.faces[5][2][0] in {"O", "Y", "G"}
+            faces[4][2][2] in {"O", "Y", "G"}
+            and faces[1][2][0] in {"O", "Y", "G"}
+            and faces[5][2][0] in {"O", "Y", "G"}
         ):
             validCorners.append("G")
         if (
-            self.faces[1][2][2] in {"R", "Y", "G"}
-            and self.faces[2][2][0] in {"R", "Y", "G"}
-            and self.faces[5][0][0] in {"R", "Y", "G"}
+            faces[1][2][2] in {"R", "Y", "G"}
+            and faces[2][2][0] in {"R", "Y", "G"}
+            and faces[5][0][0] in {"R", "Y", "G"}
         ):
             validCorners.append("R")
 
@@ -819,7 +815,7 @@ class Cube:
                 return
 
             elif len(validCorners) == 0:
-                self.executeSequence(YELLOW_CORNERS_INSERTION_ALGORITHM)
+                self.convertSequenceFromFace("R", YELLOW_CORNERS_INSERTION_ALGORITHM)
 
             else:
                 for _ in range(3):
@@ -829,10 +825,10 @@ class Cube:
 
     def final(self) -> None:
         """Finalizes the solution by orienting the last layer."""
-        while not self.checkMask(SOLVED_MASK):
+        while not self.checkMask(COMPILED_SOLVED_MASK):
             if self.faces[5][0][0] != "Y":
                 while self.faces[5][0][0] != "Y":
-                    self.executeSequence(FINAL_STEP_ALGORITHM)
+                    self.convertSequenceFromFace("R", FINAL_STEP_ALGORITHM)
             self.executeSequence("D")
 
     def __insertPiece(self, code: str) -> None:
@@ -849,51 +845,17 @@ class Cube:
         else:
             self.convertSequenceFromFace(face, RIGHT_FACE_INSERTION_ALGORITHM)
 
-    def __startPathfinding(self, masks: list[str], depth: int = 6) -> list[str] | None:
-        """Calls a function to perform DFS until a solution is found or the maximum depth is reached.
+    def __startPathfinding(self, masks: list[CompiledMask], depth: int = 6) -> list[str] | None:
+        """Searches for the shortest sequence of moves that takes the cube to a state matching one of the masks.
 
         Args:
-            masks (list[str]): A list of masks to search for.
+            masks (list[CompiledMask]): A list of masks to search for.
             depth (int, optional): The maximum depth to search. Defaults to 6.
 
         Returns:
             list[str] | None: A list of moves to reach one of the masks, or None if no solution was found.
         """
-        if not any(map(lambda x: self.checkMask(x), masks)):
-            result = self.__pathfind(masks, depth, str(self))
-            if result is not None:
-                return result
-            else:
-                return None
-
-        return []
-
-    def __pathfind(self, masks: list[str], depth: int, state: str) -> list[str] | None:
-        """Performs DFS until a solution is found or the maximum depth is reached. Has some optimisations.
-
-        Args:
-            masks (list[str]): A list of masks to search for.
-            depth (int): The maximum depth to search.
-            state (str): The current state of the cube as a string.
-
-        Returns:
-            list[str] | None: A list of moves to reach one of the masks, or None if no solution was found.
-        """
-        for mask in masks:
-            if checkMask(mask, state):
-                return []
-
-        if depth == 0:
-            return None
-
-        for move in range(12):
-            newstate = rotate(state, POSSIBLE_ROTATIONS[move])
-            result = self.__pathfind(masks, depth - 1, newstate)
-
-            if result is not None:
-                return [POSSIBLE_ROTATIONS[move]] + result
-
-        return None
+        return findPath(self.state, list(masks), depth, getTranspositionTable())
 
     def showMask(self, mask: str) -> None:
         """Takes a mask and displays it in the terminal in a clear and easy to read way.
@@ -915,7 +877,9 @@ class Cube:
         self.displayCube(faces)
 
     def analyseSolves(self, numSolves: int = 100, displayAllTimes: bool = True, displayStats: bool = True) -> dict:
-        """Repeatedly randomises and solves the cube, tracking various statistics about the solves.
+        """Repeatedly randomises and solves the cube, tracking various statistics about the solves. The
+        optimised solutions are counted in the half, quarter and slice turn metrics (see countMoves).
+        The solution cache is not used, so every solve is timed through the solver's stages.
 
         Args:
             numSolves (int, optional): The number of solves to perform. Defaults to 100.
@@ -926,81 +890,55 @@ class Cube:
         Returns:
             dict: A dictionary containing various statistics about the solves.
         """
+        # the key each stage's times are reported under, e.g. avg_cross_time
+        stageNames = {
+            "solveCross": "cross",
+            "solveF2LCorners": "corners",
+            "solveF2LMiddlePieces": "middles",
+            "solveYellowCross": "yellow_cross",
+            "alignYellowEdges": "yellow_edges",
+            "solveYellowCorners": "yellow_corners",
+            "final": "final",
+        }
+        totalStageTimes = dict.fromkeys(BEGINNER_STAGES, 0.0)
+        maxStageTimes = dict.fromkeys(BEGINNER_STAGES, 0.0)
         totalTime = 0
         totalMoves = 0
-        totalCrossTime = 0
-        maxCrossTime = 0
-        totalCornersTime = 0
-        maxCornersTime = 0
-        totalMiddlesTime = 0
-        maxMiddlesTime = 0
-        totalYellowCrossTime = 0
-        maxYellowCrossTime = 0
-        totalYellowEdgesTime = 0
-        maxYellowEdgesTime = 0
-        maxFinalTime = 0
-        totalFinalTime = 0
         totalMovesOptimised = 0
-        for _ in range(numSolves):
-            self.randomise()
-            self.movesMade = []
-            startTime = time.time()
-            self.solveCross()
-            totalCrossTime += time.time() - startTime
-            crossTime = time.time()
-            maxCrossTime = max(maxCrossTime, crossTime - startTime)
-            self.solveF2LCorners()
-            totalCornersTime += time.time() - crossTime
-            cornersTime = time.time()
-            maxCornersTime = max(maxCornersTime, cornersTime - crossTime)
-            self.solveF2LMiddlePieces()
-            totalMiddlesTime += time.time() - cornersTime
-            middlesTime = time.time()
-            maxMiddlesTime = max(maxMiddlesTime, middlesTime - cornersTime)
-            self.solveYellowCross()
-            totalYellowCrossTime += time.time() - middlesTime
-            yellowCrossTime = time.time()
-            maxYellowCrossTime = max(maxYellowCrossTime, yellowCrossTime - middlesTime)
-            self.alignYellowEdges()
-            totalYellowCrossTime += time.time() - yellowCrossTime
-            yellowEdgesTime = time.time()
-            maxYellowEdgesTime = max(maxYellowEdgesTime, yellowEdgesTime - yellowCrossTime)
-            self.solveYellowCorners()
-            totalYellowEdgesTime += time.time() - yellowEdgesTime
-            yellowEdgesTime = time.time()
-            maxYellowEdgesTime = max(maxYellowEdgesTime, yellowEdgesTime - yellowEdgesTime)
-            self.final()
-            totalFinalTime += time.time() - yellowEdgesTime
-            yellowFaceTime = time.time()
-            maxFinalTime = max(maxFinalTime, yellowFaceTime - yellowEdgesTime)
-
-            totalTime += yellowFaceTime - startTime
-            optimisedMoves = self.optimisedMoves
-            if displayAllTimes:
-                print(f"Time Taken : {round(yellowFaceTime - startTime,2)} seconds")
-                print(f"Number of Rotations: {len(optimisedMoves)}")
-
-            totalMoves += len(self.movesMade)
-            totalMovesOptimised += len(optimisedMoves)
+        totalMetrics = {"htm": 0, "qtm": 0, "stm": 0}
+        with self.collectSpans() as spans:
+            for _ in range(numSolves):
+                self.randomise()
+                spans.clear()
+                self.solve(useCache=False)
+                for span in spans:
+                    totalStageTimes[span.stage] += span.wallTime
+                    maxStageTimes[span.stage] = max(maxStageTimes[span.stage], span.wallTime)
+
+                solveTime = sum(span.wallTime for span in spans)
+                totalTime += solveTime
+                optimisedMoves = self.optimisedMoves
+                if displayAllTimes:
+                    print(f"Time Taken : {round(solveTime, 2)} seconds")
+                    print(f"Number of Rotations: {len(optimisedMoves)}")
+
+                totalMoves += len(self.movesMade)
+                totalMovesOptimised += len(optimisedMoves)
+                for metric, count in countMoves(optimisedMoves).items():
+                    totalMetrics[metric] += count
 
         results = {
             "avg_time": round(totalTime / numSolves, 5),
             "avg_moves": round(totalMoves / numSolves, 5),
             "avg_moves_optimised": round(totalMovesOptimised / numSolves, 5),
             "avg_moves_saved": round((totalMoves - totalMovesOptimised) / numSolves, 2),
-            "avg_cross_time": round(totalCrossTime / numSolves, 5),
-            "avg_corners_time": round(totalCornersTime / numSolves, 5),
-            "avg_middles_time": round(totalMiddlesTime / numSolves, 5),
-            "avg_yellow_cross_time": round(totalYellowCrossTime / numSolves, 5),
-            "avg_yellow_edges_time": round(totalYellowEdgesTime / numSolves, 5),
-            "avg_final_time": round(totalFinalTime / numSolves, 5),
-            "max_cross_time": round(maxCrossTime, 5),
-            "max_corners_time": round(maxCornersTime, 5),
-            "max_middles_time": round(maxMiddlesTime, 5),
-            "max_yellow_cross_time": round(maxYellowCrossTime, 5),
-            "max_yellow_edges_time": round(maxYellowEdgesTime, 5),
-            "max_final_time": round(maxFinalTime, 5),
         }
+        for metric, count in totalMetrics.items():
+            results[f"avg_moves_{metric}"] = round(count / numSolves, 5)
+        for stage, name in stageNames.items():
+            results[f"avg_{name}_time"] = round(totalStageTimes[stage] / numSolves, 5)
+        for stage, name in stageNames.items():
+            results[f"max_{name}_time"] = round(maxStageTimes[stage], 5)
 
         if displayStats:
             printAnalysis(results)
@@ -0,0 +1,241 @@
+import logging
+from typing import Iterable
+
+import numpy as np
+
+from .constants import POSSIBLE_ROTATIONS, SOLVED_MASK, STRING_ROTATION_MAPPINGS
+from .cube import Cube
+from .masks import CompiledMask, compileMask
+from .sequences import compileSequence, sequenceMoves
+
+# the permutation of every move as rows of one array, in POSSIBLE_ROTATIONS order, so
+# per cube moves can be gathered with a single fancy index
+MOVE_ARRAY = np.array([STRING_ROTATION_MAPPINGS[move] for move in POSSIBLE_ROTATIONS], dtype=np.intp)
+MOVE_INDICES = {move: index for index, move in enumerate(POSSIBLE_ROTATIONS)}
+IDENTITY = np.arange(54, dtype=np.intp)
+
+SOLVED_ROW = np.frombuffer(SOLVED_MASK.encode("ascii"), dtype=np.uint8)
+
+
+def sequencePermutation(sequence: str | tuple[int, ...]) -> np.ndarray:
+    """Composes a sequence of moves into one permutation, so applying it is a single gather.
+
+    Args:
+        sequence (str | tuple[int, ...]): The sequence in face notation, or compiled with compileSequence.
+
+    Returns:
+        np.ndarray: The permutation, where new[i] = old[permutation[i]].
+    """
+    codes = sequence if isinstance(sequence, tuple) else compileSequence(sequence)
+    permutation = IDENTITY
+    for move in sequenceMoves(codes):
+        # applying first then second is old[first][second], i.e. old[first[second]]
+        permutation = permutation[MOVE_ARRAY[MOVE_INDICES[move]]]
+    return permutation
+
+
+class CubeBatch:
+    """Many cube states held as the rows of an (N, 54) uint8 array of colour letters, in the same
+    order as the string representation. Moves and sequences are applied to every cube at once
+    with a single gather.
+    """
+
+    def __init__(self, states: np.ndarray) -> None:
+        """Initialises a CubeBatch object. Use solved, fromStrings or fromCubes to create one.
+
+        Args:
+            states (np.ndarray): An (N, 54) array of ascii colour letters.
+
+        Raises:
+            ValueError: If states is not an (N, 54) array.
+        """
+        states = np.asarray(states, dtype=np.uint8)
+        if states.ndim != 2 or states.shape[1] != 54:
+            logging.critical(f"Cube states must be an (N, 54) array, not {states.shape}")
+            raise ValueError(f"Cube states must be an (N, 54) array, not {states.shape}")
+        self.states = states
+
+    @classmethod
+    def solved(cls, size: int) -> "CubeBatch":
+        """Creates a batch of solved cubes.
+
+        Args:
+            size (int): The number of cubes.
+
+        Returns:
+            CubeBatch: The batch.
+        """
+        return cls(np.tile(SOLVED_ROW, (size, 1)))
+
+    @classmethod
+    def fromStrings(cls, states: Iterable[str]) -> "CubeBatch":
+        """Creates a batch from string representations of cubes.
+
+        Args:
+            states (Iterable[str]): Strings of length 54 representing each cube's state.
+
+        Returns:
+            CubeBatch: The batch.
+        """
+        data = "".join(states).encode("ascii")
+        return cls(np.frombuffer(data, dtype=np.uint8).reshape(-1, 54).copy())
+
+    @classmethod
+    def fromCubes(cls, cubes: Iterable[Cube]) -> "CubeBatch":
+        """Creates a batch from Cube objects.
+
+        Args:
+            cubes (Iterable[Cube]): The cubes.
+
+        Returns:
+            CubeBatch: The batch.
+        """
+        data = b"".join(cube.state for cube in cubes)
+        return cls(np.frombuffer(data, dtype=np.uint8).reshape(-1, 54).copy())
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def __getitem__(self, index: int) -> str:
+        return self.states[index].tobytes().decode("ascii")
+
+    def __repr__(self) -> str:
+        return f"CubeBatch(size={len(self)})"
+
+    def toStrings(self) -> list[str]:
+        """Returns the string representation of every cube.
+
+        Returns:
+            list[str]: Strings of length 54 representing each cube's state.
+        """
+        data = self.states.tobytes().decode("ascii")
+        return [data[start : start + 54] for start in range(0, len(data), 54)]
+
+    def toCubes(self) -> list[Cube]:
+        """Returns a Cube object for every cube.
+
+        Returns:
+            list[Cube]: The cubes.
+        """
+        return [Cube(state) for state in self.toStrings()]
+
+    def copy(self) -> "CubeBatch":
+        """Returns a copy of the batch.
+
+        Returns:
+            CubeBatch: The copy.
+        """
+        return CubeBatch(self.states.copy())
+
+    def applyMove(self, move: str) -> None:
+        """Applies a move to every cube.
+
+        Args:
+            move (str): The move in face notation, e.g. "R" or "R'".
+        """
+        self.applySequence(move)
+
+    def applySequence(self, sequence: str | tuple[int, ...]) -> None:
+        """Applies a sequence of moves to every cube, as a single gather however long the sequence is.
+
+        Args:
+            sequence (str | tuple[int, ...]): The sequence, e.g. "RUR'U'", or compiled with compileSequence.
+        """
+        self.states = self.states[:, sequencePermutation(sequence)]
+
+    def applyMoveIndices(self, moves: np.ndarray) -> None:
+        """Applies a different move to each cube.
+
+        Args:
+            moves (np.ndarray): The index into POSSIBLE_ROTATIONS of the move to apply to each cube.
+        """
+        # gathering each move's cubes together avoids building an (N, 54) index array
+        moves = np.asarray(moves)
+        states = np.empty_like(self.states)
+        for index, permutation in enumerate(MOVE_ARRAY):
+            rows = np.flatnonzero(moves == index)
+            states[rows] = self.states[rows][:, permutation]
+        self.states = states
+
+    def randomise(self, numMoves: int = 50, rng: np.random.Generator = None) -> np.ndarray:
+        """Scrambles every cube with its own sequence of random moves.
+
+        Args:
+            numMoves (int, optional): The number of moves in each scramble. Defaults to 50.
+            rng (np.random.Generator, optional): The random number generator to use. Defaults to None,
+                                                 which creates an unseeded one.
+
+        Returns:
+            np.ndarray: An (N, numMoves) array of the index into POSSIBLE_ROTATIONS of each move made.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        moves = rng.integers(0, len(POSSIBLE_ROTATIONS), size=(len(self), numMoves))
+        for column in moves.T:
+            self.applyMoveIndices(column)
+        return moves
+
+    @property
+    def isSolved(self) -> np.ndarray:
+        """An (N,) bool array, True where every face of the cube is a single colour."""
+        faces = self.states.reshape(-1, 6, 9)
+        return (faces == faces[:, :, 4:5]).all(axis=(1, 2))
+
+    def checkMask(self, mask: str | CompiledMask) -> np.ndarray:
+        """Checks every cube against a mask pattern.
+
+        Args:
+            mask (str | CompiledMask): A string of length 54 representing the mask pattern, or a compiled mask.
+
+        Raises:
+            ValueError: If the mask is not a string of length 54 or a compiled mask.
+
+        Returns:
+            np.ndarray: An (N,) bool array, True where the cube matches the mask.
+        """
+        if not isinstance(mask, CompiledMask):
+            if not isinstance(mask, str) or len(mask) != 54:
+                logging.critical(f"Invalid mask: {mask!r}")
+                raise ValueError(f"A mask must be a string of length 54 or a CompiledMask, not {mask!r}.")
+            mask = compileMask(mask)
+        if not mask.indices:
+            return np.ones(len(self), dtype=bool)
+
+        indices = np.array(mask.indices, dtype=np.intp)
+        expected = np.frombuffer(mask.mask.encode("ascii"), dtype=np.uint8)[indices]
+        return (self.states[:, indices] == expected).all(axis=1)
+
+    def checkMasks(self, masks: Iterable[str | CompiledMask | tuple]) -> np.ndarray:
+        """Checks every cube against each of a list of masks, e.g. one of the tables in constants.py.
+        Table entries of the form (face, mask, ...) are checked against their mask.
+
+        Args:
+            masks (Iterable[str | CompiledMask | tuple]): The masks, or (face, mask, ...) entries. The columns
+                                                          of the result follow their iteration order.
+
+        Raises:
+            ValueError: If an entry is not a mask or a (face, mask, ...) tuple.
+
+        Returns:
+            np.ndarray: An (N, M) bool array, True where cube n matches mask m.
+        """
+        masks = list(masks)
+        result = np.empty((len(self), len(masks)), dtype=bool)
+        for column, mask in enumerate(masks):
+            if isinstance(mask, tuple):
+                if len(mask) < 2:
+                    logging.critical(f"Invalid mask table entry: {mask!r}")
+                    raise ValueError(f"A mask table entry must be (face, mask, ...), not {mask!r}.")
+                mask = mask[1]
+            result[:, column] = self.checkMask(mask)
+        return result
+
+    def checkAnyMask(self, masks: Iterable[str | CompiledMask | tuple]) -> np.ndarray:
+        """Checks whether every cube matches at least one of a list of masks.
+
+        Args:
+            masks (Iterable[str | CompiledMask | tuple]): The masks, or (face, mask, ...) entries.
+
+        Returns:
+            np.ndarray: An (N,) bool array, True where the cube matches any of the masks.
+        """
+        return self.checkMasks(masks).any(axis=1)
@@ -141,10 +141,12 @@ class CubePlotter:
     def makeMove(self, move: str, angle: float = np.pi / 2) -> None:
         """Make a move on the cube plotter.
         Args:
-            move (str): The move to make (e.g., "R", "U'", etc.).
-            angle (float): The angle to rotate by (radians).
+            move (str): The move to make (e.g., "R", "U'", "F2", etc.).
+            angle (float): The angle to rotate by (radians), doubled for half turns.
         """
-        direction = -1 if len(move) == 2 else 1
+        direction = -1 if move[1:] in ("'", "i") else 1
+        if move[1:] == "2":
+            angle *= 2
         move = move[0]
         indices = self.getPlanesToRotate(move)
         axis = AXIS_MAP[move]
@@ -182,37 +184,36 @@ class CubePlotter:
         """Animate a move on the cube plotter.
 
         Args:
-            move (str): The move to animate (e.g., "W", "R'", etc.).
+            move (str): The move to animate (e.g., "W", "R'", "Y2", etc.).
             steps (int): Number of animation steps.
             canvas (FigureCanvasTkAgg): The canvas to draw on if using with a GUI.
             interval (int): Time between frames in milliseconds.
         """
         indices = self.getPlanesToRotate(move)
 
-        if len(move) == 2:
-            direction = -1
-        else:
-            direction = 1
+        direction = -1 if move[1:] in ("'", "i") else 1
+        # a half turn is animated as one 180 degree rotation
+        quarterTurns = 2 if move[1:] == "2" else 1
 
         move = move[0]
 
         if cubeString is not None:
             colours = ["" for _ in range(54)]
 
-            self.makeMove(move, angle=direction * np.pi / 2)
+            self.makeMove(move, angle=direction * quarterTurns * np.pi / 2)
             for p in self.planes:
                 colours[CENTER_ORDERINGS[tuple(map(lambda x: round(x, 2), p["center"]))]] = p["colourName"]
 
             colourString = "".join([c for c in colours])
 
-            self.makeMove(move, angle=-direction * np.pi / 2)
+            self.makeMove(move, angle=-direction * quarterTurns * np.pi / 2)
 
             if colourString != cubeString:
                 direction *= -1
 
         axis = AXIS_MAP[move]
         faceCenter = FACE_CENTER_POSITIONS[move]
-        totalAngle = direction * np.pi / 2
+        totalAngle = direction * quarterTurns * np.pi / 2
         angleStep = totalAngle / steps
 
         def update(frame):
@@ -5,21 +5,56 @@ import cv2
 import numpy as np
 from PIL import Image, ImageTk
 
+from .colour_classifier import COLOUR_SPACES, DEFAULT_COLOUR_SPACE, ColourClassifier
 from .constants import SCAN_COLOURS
-from .scanner_utils import displayFace, extractColours, filterContours
+from .face_tracker import FaceTracker
+from .scanner_pipeline import ScannerPipeline
+from .scanner_utils import COLOUR_METHODS, DEFAULT_DETECTION_WIDTH, displayFace, extractColours, findFace
 
 
 class CubeScanner:
-    def __init__(self, videoLabel: Label, calibratedColours: dict[str, np.ndarray] = None) -> None:
+    def __init__(
+        self,
+        videoLabel: Label,
+        calibratedColours: dict[str, np.ndarray] = None,
+        capture: cv2.VideoCapture = None,
+        colourMethod: str = "kmeans",
+        colourSpace: str = DEFAULT_COLOUR_SPACE,
+        tracking: bool = True,
+        detectionWidth: int | None = DEFAULT_DETECTION_WIDTH,
+    ) -> None:
         """Initialises the CubeScanner with a video label and optional calibrated colours.
 
+        Frames are read and processed on background threads (see ScannerPipeline), and the Tk event
+        loop only displays the newest processed frame, so a slow frame never stalls the GUI.
+
         Args:
             videoLabel (Label): The Tkinter label to display the video feed.
             calibratedColours (dict[str, np.ndarray], optional): A dictionary of calibrated colours. Defaults to None.
+            capture (cv2.VideoCapture, optional): The source of frames. Defaults to None, which opens the
+                                                  first webcam.
+            colourMethod (str, optional): How the colour of each sticker is estimated, one of
+                                          scanner_utils.COLOUR_METHODS. "median" and "pixels" are much
+                                          faster than k-means. Defaults to "kmeans".
+            colourSpace (str, optional): The colour space stickers are matched to the colours in, one of
+                                         colour_classifier.COLOUR_SPACES. Defaults to DEFAULT_COLOUR_SPACE, RGB.
+            tracking (bool, optional): Whether to only search the region around the last face found
+                                       (see FaceTracker), rather than every whole frame. Defaults to True.
+            detectionWidth (int | None, optional): The width frames are scaled down to when looking for the
+                                                   cube, or None for full resolution. Colours are still read
+                                                   at full resolution. Defaults to DEFAULT_DETECTION_WIDTH.
         """
         logging.info("Initialising CubeScanner")
+        if colourMethod not in COLOUR_METHODS:
+            logging.critical(f"Unknown colour method {colourMethod}.")
+            raise ValueError(f"Unknown colour method {colourMethod}, expected one of {', '.join(COLOUR_METHODS)}.")
+        if colourSpace not in COLOUR_SPACES:
+            logging.critical(f"Unknown colour space {colourSpace}.")
+            raise ValueError(f"Unknown colour space {colourSpace}, expected one of {', '.join(COLOUR_SPACES)}.")
+
         self.videoLabel = videoLabel
-        self.vid = cv2.VideoCapture(0)
+        self.colourMethod = colourMethod
+        self.vid = capture if capture is not None else cv2.VideoCapture(0)
         self.previousFaces = {
             "Red": [],
             "Green": [],
@@ -30,6 +65,8 @@ class CubeScanner:
         }
         self.running = True
         self.photo = None
+        # the size frames are displayed at, read by the processing thread to resize them there
+        self.displaySize: tuple[int, int] = None
 
         self.previous = []
         self.previousCount = 0
@@ -40,130 +77,114 @@ class CubeScanner:
                 self.colours.append((colourName, rgb))
         else:
             self.colours = SCAN_COLOURS
+        # built once, with its lookup table, rather than on every frame
+        self.classifier = ColourClassifier(self.colours, colourSpace)
+        self.detectionWidth = detectionWidth
+        self.tracker = FaceTracker(detectionWidth=detectionWidth) if tracking else None
 
+        self.pipeline = ScannerPipeline(self.vid, self.processFrame)
+        self.pipeline.start()
         self.updateFrame()
 
     def updateFrame(self) -> None:
-        """Gets a frame from the VideoCapture and then tries to find a rubiks cube in
-        the image, extract the colours and add it to the list of found faces."""
+        """Displays the newest processed frame, if there is a new one. Runs on the Tk event loop."""
         if not self.running:
-            if self.vid.isOpened():
-                self.vid.release()
             return
 
         if not self.videoLabel.winfo_exists():
-            self.running = False
-            if self.vid.isOpened():
-                self.vid.release()
+            self.stop()
             return
 
-        ret, frame = self.vid.read()
-        if not ret:
-            if self.running:
-                self.videoLabel.after(10, self.updateFrame)
-            return
+        w = round(self.videoLabel.winfo_width() * 0.9)
+        h = round(self.videoLabel.winfo_height() * 0.9)
+        self.displaySize = (w, h) if w > 1 and h > 1 else None
+
+        rgbImage = self.pipeline.latest()
+        if rgbImage is not None:
+            try:
+                pil_image = Image.fromarray(rgbImage)
+                tk_image = ImageTk.PhotoImage(image=pil_image, master=self.videoLabel)
+
+                # Keep a reference to prevent garbage collection
+                self.photo = tk_image
+                self.videoLabel.config(image=self.photo)
+
+            except Exception as e:
+                logging.warning(f"Error updating image: {e}")
 
-        # manipulating image to scan contours
-        grayed = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(grayed, (5, 5), cv2.BORDER_DEFAULT)
-        canny = cv2.Canny(blurred, 20, 40)
-        kernel = np.ones((3, 3), np.uint8)
-        dilated = cv2.dilate(canny, kernel, iterations=2)
-        dilatedFrame = dilated
+        # Schedule next frame only if still running and label exists
+        if self.running and self.videoLabel.winfo_exists():
+            self.videoLabel.after(10, self.updateFrame)
+
+    def processFrame(self, frame: np.ndarray) -> np.ndarray:
+        """Tries to find a rubiks cube in a frame, extract the colours and add it to the list of
+        found faces. Runs on the pipeline's processing thread.
 
-        contours, _ = cv2.findContours(dilatedFrame.copy(), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-        contours = sorted(contours, key=cv2.contourArea, reverse=True)
+        Args:
+            frame (np.ndarray): The BGR frame from the camera.
+
+        Returns:
+            np.ndarray: The frame with the detection and found faces drawn on it, resized for
+                        display and converted to RGB.
+        """
+        if self.tracker is not None:
+            box, squares = self.tracker.detect(frame)
+        else:
+            box, squares = findFace(frame, self.detectionWidth)
 
         output = frame.copy()
-        counter = 30
-        faceContours = []
-        totalWidth = 0
-        # filtering out non-square contours
-        for c in contours:
-            peri = cv2.arcLength(c, True)
-            approx = cv2.approxPolyDP(c, 0.05 * peri, True)
-            minX, minY, width, height = cv2.boundingRect(approx)
-            aspectRatio = width / height
-            if len(approx) == 4 and 2000 > cv2.contourArea(approx) > 300 and 0.8 < aspectRatio < 1.2:
-                counter -= 1
-                if counter == 0:
-                    break
-                totalWidth += width
-                faceContours.append(approx)
-
-        if len(faceContours) > 3:
-            faceContours = filterContours(faceContours, (totalWidth / len(faceContours)) * 4)
-            avgArea = sum([cv2.contourArea(faceContours[i]) for i in range(len(faceContours))]) / len(faceContours)
-
-            faceCornersX = []
-            faceCornersY = []
-            for i in range(len(faceContours)):
-                if avgArea * 0.7 < cv2.contourArea(faceContours[i]) < 1.3 * avgArea:
-                    for ii in range(4):
-                        faceCornersX.append(faceContours[i][ii][0][0])
-                        faceCornersY.append(faceContours[i][ii][0][1])
-
-                    cv2.drawContours(output, [faceContours[i]], -1, (255, 0, 0), 5)
-
-            # checking if there are enough corners to make a square
-            if len(faceCornersX) > 4 and len(faceCornersY) > 4:
-                maxX, maxY = max(faceCornersX), max(faceCornersY)
-                minX, minY = min(faceCornersX), min(faceCornersY)
-
-                areaRect = (maxX - minX) * (maxY - minY)
-
-                if areaRect * 0.45 < avgArea * 9 < areaRect * 1.1:
-                    # checking if the rectangle is roughly square
-                    if (maxX - minX) * 0.8 < maxY - minY < 1.2 * (maxX - minX):
-                        cv2.rectangle(output, (minX, minY), (maxX, maxY), (0, 0, 255), 3)
-
-                        cropped = frame[minY:maxY, minX:maxX]
-                        colours = extractColours(cropped, self.colours)
-
-                        logging.info(f"Detected colours: {colours}")
-
-                        # compares to previous scan
-                        if self.previous == colours:
-                            self.previousCount += 1
-                            if self.previousCount >= 3:
-                                self.previousFaces[colours[4]] = colours
-                        else:
-                            self.previous = colours
-                            self.previousCount = 0
+        if squares:
+            cv2.drawContours(output, squares, -1, (255, 0, 0), 5)
 
-        for _, colourRGB in self.previousFaces.items():
-            if colourRGB != []:
-                output = displayFace(output, colourRGB)
+        if box is not None:
+            minX, minY, maxX, maxY = box
+            cv2.rectangle(output, (minX, minY), (maxX, maxY), (0, 0, 255), 3)
 
-        w = round(self.videoLabel.winfo_width() * 0.9)
-        h = round(self.videoLabel.winfo_height() * 0.9)
-        if w <= 1 or h <= 1:
-            h, w = output.shape[:2]
+            cropped = frame[minY:maxY, minX:maxX]
+            colours = extractColours(cropped, self.classifier, self.colourMethod)
 
-        frame_resized = cv2.resize(output, (w, h), interpolation=cv2.INTER_LINEAR)
+            logging.info(f"Detected colours: {colours}")
 
-        try:
-            rgb_image = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(rgb_image)
-            tk_image = ImageTk.PhotoImage(image=pil_image, master=self.videoLabel)
+            # compares to previous scan
+            if self.previous == colours:
+                self.previousCount += 1
+                if self.previousCount >= 3:
+                    self.previousFaces[colours[4]] = colours
+            else:
+                self.previous = colours
+                self.previousCount = 0
 
-            # Keep a reference to prevent garbage collection
-            self.photo = tk_image
-            self.videoLabel.config(image=self.photo)
+        for _, colourRGB in self.previousFaces.items():
+            if colourRGB != []:
+                output = displayFace(output, colourRGB)
 
-        except Exception as e:
-            logging.warning(f"Error updating image: {e}")
+        size = self.displaySize
+        if size is not None:
+            output = cv2.resize(output, size, interpolation=cv2.INTER_LINEAR)
 
-        # Schedule next frame only if still running and label exists
-        if self.running and self.videoLabel.winfo_exists():
-            self.videoLabel.after(10, self.updateFrame)
+        return cv2.cvtColor(output, cv2.COLOR_BGR2RGB)
 
     def stop(self) -> None:
         """Stops the webcam recording and releases the video."""
         self.running = False
-        if hasattr(self, "vid") and self.vid.isOpened():
+        if hasattr(self, "pipeline"):
+            self.pipeline.stop()
+        elif hasattr(self, "vid") and self.vid.isOpened():
             self.vid.release()
 
+    def stats(self) -> dict[str, dict]:
+        """Returns the frame rate and latency of each stage of the scan, and how often the face was
+        tracked.
+
+        Returns:
+            dict[str, dict]: The statistics keyed by stage (see ScannerPipeline.stats), and the tracking
+                             statistics under "tracking" if tracking (see FaceTracker.stats).
+        """
+        stats = self.pipeline.stats()
+        if self.tracker is not None:
+            stats["tracking"] = self.tracker.stats()
+        return stats
+
     def getCubeString(self) -> str:
         """Returns the cube string representation of the scanned cube.
 
@@ -0,0 +1,118 @@
+from operator import itemgetter
+from typing import Iterable
+
+from .constants import SOLVED_MASK, STRING_ROTATION_MAPPINGS
+
+# the cube state is stored as 54 ascii bytes (one colour letter per square) in the
+# same order as the string representation. Every move is a fixed permutation of
+# those squares, so applying one is a single gather instead of a series of swaps
+SOLVED_STATE = SOLVED_MASK.encode("ascii")
+
+MOVE_PERMUTATIONS: dict[str, tuple[int, ...]] = {
+    move: tuple(mapping) for move, mapping in STRING_ROTATION_MAPPINGS.items()
+}
+MOVE_GATHERS: dict[str, itemgetter] = {move: itemgetter(*perm) for move, perm in MOVE_PERMUTATIONS.items()}
+
+
+def encodeState(stateStr: str) -> bytes:
+    """Converts a string representation of the cube into the compact byte state.
+
+    Args:
+        stateStr (str): A string of length 54 representing the cube's state.
+
+    Returns:
+        bytes: The 54 byte state.
+    """
+    return stateStr.encode("ascii")
+
+
+def decodeState(state: bytes) -> str:
+    """Converts a compact byte state back into its string representation.
+
+    Args:
+        state (bytes): The 54 byte state.
+
+    Returns:
+        str: A string of length 54 representing the cube's state.
+    """
+    return state.decode("ascii")
+
+
+def applyPermutation(state: bytes, gather: itemgetter) -> bytes:
+    """Applies a precomputed permutation gather to a state.
+
+    Args:
+        state (bytes): The state to permute.
+        gather (itemgetter): The gather built from the permutation.
+
+    Returns:
+        bytes: The permuted state.
+    """
+    return bytes(gather(state))
+
+
+def applyMove(state: bytes, move: str) -> bytes:
+    """Applies a single move (e.g. "R" or "R'") to a state.
+
+    Args:
+        state (bytes): The state to apply the move to.
+        move (str): The move to apply.
+
+    Returns:
+        bytes: The new state.
+    """
+    return bytes(MOVE_GATHERS[move](state))
+
+
+def composePermutations(first: tuple[int, ...], second: tuple[int, ...]) -> tuple[int, ...]:
+    """Composes two permutations into one which is equivalent to applying first, then second.
+
+    Args:
+        first (tuple[int, ...]): The permutation applied first.
+        second (tuple[int, ...]): The permutation applied second.
+
+    Returns:
+        tuple[int, ...]: The composed permutation.
+    """
+    return tuple(first[i] for i in second)
+
+
+def composeMoves(moves: Iterable[str]) -> tuple[int, ...]:
+    """Composes a sequence of moves into a single permutation, so applying the whole sequence
+    is one gather however many moves it has.
+
+    Args:
+        moves (Iterable[str]): The moves in face notation, e.g. ["R", "U'"].
+
+    Returns:
+        tuple[int, ...]: The composed permutation.
+    """
+    permutation = tuple(range(54))
+    for move in moves:
+        permutation = composePermutations(permutation, MOVE_PERMUTATIONS[move])
+    return permutation
+
+
+def stateToFaces(state: bytes) -> list[list[list[str]]]:
+    """Builds the nested face list (face -> row -> square) for a state.
+
+    Args:
+        state (bytes): The 54 byte state.
+
+    Returns:
+        list[list[list[str]]]: The faces of the cube.
+    """
+    stateStr = decodeState(state)
+    return [[list(stateStr[start : start + 3]) for start in range(face, face + 9, 3)] for face in range(0, 54, 9)]
+
+
+def facesToState(faces: list[list[list[str]]]) -> bytes:
+    """Flattens a nested face list back into a byte state.
+
+    Args:
+        faces (list[list[list[str]]]): The faces of the cube.
+
+    Returns:
+        bytes: The 54 byte state.
+    """
+    return encodeState("".join(square for face in faces for row in face for square in row))
@@ -1,4 +1,5 @@
-from .constants import STRING_ROTATION_MAPPINGS
+from .cube_state import MOVE_GATHERS
+from .masks import compileMask
 
 
 # these functions perform operations on the masks not the cube
@@ -14,11 +15,7 @@ def rotate(mask: str, rotation: str) -> str:
     Returns:
         str: The rotated mask.
     """
-    output = ""
-    mapping = STRING_ROTATION_MAPPINGS[rotation]
-    for i in range(54):
-        output += mask[mapping[i]]
-    return output
+    return "".join(MOVE_GATHERS[rotation](mask))
 
 
 def checkMask(mask: str, state: str) -> bool:
@@ -31,10 +28,7 @@ def checkMask(mask: str, state: str) -> bool:
     Returns:
         bool: True if the mask matches the state, False otherwise.
     """
-    for i in range(len(mask)):
-        if mask[i] != "." and mask[i] != state[i]:
-            return False
-    return True
+    return compileMask(mask).matches(state)
 
 
 def combineMasks(mask1: str, mask2: str) -> str:
@@ -49,14 +43,69 @@ def combineMasks(mask1: str, mask2: str) -> str:
     Returns:
         str: The combined mask.
     """
-    out = ""
-    for i in range(len(mask1)):
-        if mask1[i] == ".":
-            out += mask2[i]
-        else:
-            out += mask1[i]
+    return compileMask(mask1).combine(compileMask(mask2)).mask
+
+
+# opposite faces turn about the same axis and commute, so moves are grouped by axis. Each axis
+# is written as its two faces, in the order they are output. Sequences in colour notation use
+# the colour of each face instead
+FACE_AXES = (("U", "D"), ("F", "B"), ("R", "L"))
+COLOUR_AXES = (("W", "Y"), ("R", "O"), ("B", "G"))
+
+# the quarter turns clockwise each move suffix stands for, and the suffix each number is written with
+TURN_AMOUNTS = {"": 1, "2": 2, "i": 3, "'": 3}
+AMOUNT_SUFFIXES = ("", "", "2", "i")
+
 
-    return out
+class MoveTables:
+    """The tables optimiseMoves reduces moves in one notation with. A group of moves about one axis is
+    encoded as axis * 16 + turns of the first face * 4 + turns of the second face, each modulo 4.
+    """
+
+    def __init__(self, axes: tuple[tuple[str, str], ...]) -> None:
+        """Initialises a MoveTables object.
+
+        Args:
+            axes (tuple[tuple[str, str], ...]): The two faces of each axis.
+        """
+        turns = []
+        for axis, faces in enumerate(axes):
+            for side, face in enumerate(faces):
+                for suffix, amount in TURN_AMOUNTS.items():
+                    turns.append((face + suffix, axis, side, amount))
+
+        # the index of each move label, and the group each move makes on its own
+        self.indices = {move: index for index, (move, _, _, _) in enumerate(turns)}
+        self.starts = [axis * 16 + (amount << (2 - 2 * side)) for _, axis, side, amount in turns]
+
+        # merges[group * len(turns) + index] is the group made by adding the move to a group about
+        # the same axis, or -1 if they cancel out
+        self.merges = [-1] * (len(axes) * 16 * len(turns))
+        for group in range(len(axes) * 16):
+            for index, (_, axis, side, amount) in enumerate(turns):
+                first, second = group >> 2 & 3, group & 3
+                if side == 0:
+                    first = (first + amount) & 3
+                else:
+                    second = (second + amount) & 3
+                if first or second:
+                    self.merges[group * len(turns) + index] = (group & ~15) + first * 4 + second
+
+        # the moves each group is written as
+        self.written = []
+        for faces in axes:
+            for counts in range(16):
+                first, second = counts >> 2, counts & 3
+                moves = []
+                if first:
+                    moves.append(faces[0] + AMOUNT_SUFFIXES[first])
+                if second:
+                    moves.append(faces[1] + AMOUNT_SUFFIXES[second])
+                self.written.append(moves)
+
+
+FACE_MOVE_TABLES = MoveTables(FACE_AXES)
+COLOUR_MOVE_TABLES = MoveTables(COLOUR_AXES)
 
 
 def optimiseMoves(moves: list[str]) -> list[str]:
@@ -66,61 +115,96 @@ def optimiseMoves(moves: list[str]) -> list[str]:
     this function will result in a shorter list of moves that will perform
     the same transformation on the cube.
 
+    Consecutive moves about the same axis (a face and its opposite, which commute)
+    are merged into one group holding the total turn of each face, and groups which
+    come to nothing are removed, which can let the groups either side of them merge.
+    Using a stack, this reaches the fully reduced sequence in one pass. Each face
+    left is written as a single move in the half turn metric, e.g. R R U D U' -> R2 D.
+
     Args:
-        moves (list[str]): The list of moves to optimise.
+        moves (list[str]): The list of moves to optimise, e.g. ["R", "Ui", "F2"], in face
+                           or colour notation.
 
     Returns:
         list[str]: The optimised list of moves.
     """
-    ## checking if there is a repeated section of 4
-    newList = []
-    i = 0
-    while i <= len(moves) - 4:
-        if moves[i] == moves[i + 1] == moves[i + 2] == moves[i + 3]:
-            i += 4
+    tables = FACE_MOVE_TABLES
+    groups = _reduceMoves(moves, tables)
+    if groups is None:
+        tables = COLOUR_MOVE_TABLES
+        groups = _reduceMoves(moves, tables)
+
+    written = tables.written
+    optimised = []
+    for group in groups:
+        if isinstance(group, str):
+            optimised.append(group)
         else:
-            newList.append(moves[i])
-            i += 1
-
-    newList += moves[i:]
-
-    ## replacing repeated sections of length 3
-    moves = newList.copy()
-    newList = []
-    i = 0
-    while i <= len(moves) - 3:
-        if moves[i] == moves[i + 1] == moves[i + 2]:
-            if len(moves[i]) == 1:
-                newList.append(moves[i] + "i")
-            else:
-                newList.append(moves[i][0])
-            i += 3
+            optimised.extend(written[group])
 
-        else:
-            newList.append(moves[i])
-            i += 1
+    return optimised
 
-    newList += moves[i:]
 
-    ## removing all occurences of a move followed by its inverse
+def _reduceMoves(moves: list[str], tables: MoveTables) -> list[int | str] | None:
+    """Reduces moves to a stack of groups (see MoveTables).
 
-    moves = newList.copy()
-    newList = []
-    i = 0
-    skippedLast = False
-    while i < len(moves) - 1:
-        if moves[i][0] == moves[i + 1][0] and moves[i] != moves[i + 1]:
-            i += 2
-            skippedLast = False
+    Args:
+        moves (list[str]): The moves.
+        tables (MoveTables): The tables for the moves' notation.
+
+    Returns:
+        list[int | str] | None: The groups, with unrecognised moves kept as they are, or None if a move
+                                is in colour notation but the tables are for face notation.
+    """
+    indices, starts, merges = tables.indices, tables.starts, tables.merges
+    numMoves = len(starts)
+
+    groups = []
+    # the group on top of the stack, or -1 if it can't be merged with
+    top = -1
+    for move in moves:
+        index = indices.get(move)
+        if index is None:
+            if tables is FACE_MOVE_TABLES and move[:1] in ("W", "Y", "G", "O"):
+                return None
+            # an unrecognised move is kept as it is and can't be merged with anything
+            groups.append(move)
+            top = -1
+            continue
+
+        start = starts[index]
+        if top >= 0 and top >> 4 == start >> 4:
+            merged = merges[top * numMoves + index]
+            if merged >= 0:
+                groups[-1] = top = merged
+                continue
+
+            groups.pop()
+            top = groups[-1] if groups else -1
+            if isinstance(top, str):
+                top = -1
         else:
-            newList.append(moves[i])
-            i += 1
-            skippedLast = True
+            groups.append(start)
+            top = start
+
+    return groups
+
 
-    if skippedLast:
-        newList.append(moves[-1])
+def countMoves(moves: list[str]) -> dict[str, int]:
+    """Counts a list of moves in the three usual metrics. In the half turn metric (HTM) every
+    face turn is one move, in the quarter turn metric (QTM) a half turn is two, and in the slice
+    turn metric (STM) a turn of a middle slice is also one move. The solvers only turn outer faces,
+    so STM is the same as HTM (R L' is two face turns, not a slice turn). The moves should be
+    optimised first, as R R is counted as two moves but R2 as one.
 
-    return newList
+    Args:
+        moves (list[str]): The moves, e.g. ["R", "Ui", "F2"], in face or colour notation.
+
+    Returns:
+        dict[str, int]: The number of moves in each metric, keyed by "htm", "qtm" and "stm".
+    """
+    qtm = sum(2 if TURN_AMOUNTS.get(move[1:], 1) == 2 else 1 for move in moves)
+    return {"htm": len(moves), "qtm": qtm, "stm": len(moves)}
 
 
 def printAnalysis(analysis: dict) -> None:
@@ -135,6 +219,9 @@ def printAnalysis(analysis: dict) -> None:
     print(f"Avg number of Rotations: {round(analysis['avg_moves'], 5)}")
     print(f"Avg number of optimised rotations: {round(analysis['avg_moves_optimised'], 5)}")
     print(f"Avg number of rotations saved:  {round(analysis['avg_moves_saved'],2)}")
+    print(f"Avg optimised moves (HTM): {round(analysis['avg_moves_htm'], 5)}")
+    print(f"Avg optimised moves (QTM): {round(analysis['avg_moves_qtm'], 5)}")
+    print(f"Avg optimised moves (STM): {round(analysis['avg_moves_stm'], 5)}")
 
     print("-----------------------------")
 
@@ -143,6 +230,7 @@ def printAnalysis(analysis: dict) -> None:
     print(f"Avg Middles Time: {analysis['avg_middles_time']}")
     print(f"Avg Yellow Cross Time: {analysis['avg_yellow_cross_time']}")
     print(f"Avg Yellow Edges Time: {analysis['avg_yellow_edges_time']}")
+    print(f"Avg Yellow Corners Time: {analysis['avg_yellow_corners_time']}")
     print(f"Avg Final Time: {analysis['avg_final_time']}")
 
     print("-----------------------------")
@@ -152,5 +240,6 @@ def printAnalysis(analysis: dict) -> None:
     print(f"Max Middles Time: {analysis['max_middles_time']}")
     print(f"Max Yellow Cross Time: {analysis['max_yellow_cross_time']}")
     print(f"Max Yellow Edges Time: {analysis['max_yellow_edges_time']}")
+    print(f"Max Yellow Corners Time: {analysis['max_yellow_corners_time']}")
     print(f"Max Final Time: {analysis['max_final_time']}")
     print("-----------------------------")
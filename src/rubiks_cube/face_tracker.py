@@ -0,0 +1,156 @@
+import logging
+
+import cv2
+import numpy as np
+
+from .scanner_utils import DEFAULT_DETECTION_WIDTH, findFace
+
+# the margin searched around the last face, as a fraction of its width and height
+DEFAULT_PADDING = 0.5
+
+# corners followed by optical flow, and the fewest that must be followed to trust the shift
+FLOW_FEATURES = 40
+MIN_FLOW_FEATURES = 5
+
+
+class FaceTracker:
+    """Finds the face of the cube in each frame of a video. Once a face has been found, later frames are
+    only searched in a padded region of interest around it, which is many times less work than searching
+    the whole frame. If no face is found there, tracking is lost and the whole frame is searched again.
+    With optical flow, the region is also moved with the cube between frames, so it can move faster
+    without being lost.
+    """
+
+    def __init__(
+        self,
+        padding: float = DEFAULT_PADDING,
+        opticalFlow: bool = False,
+        detectionWidth: int | None = DEFAULT_DETECTION_WIDTH,
+    ) -> None:
+        """Initialises a FaceTracker.
+
+        Args:
+            padding (float, optional): The margin searched around the last face, as a fraction of its size.
+                                       Defaults to DEFAULT_PADDING.
+            opticalFlow (bool, optional): Whether to move the region with the cube using optical flow.
+                                          Defaults to False.
+            detectionWidth (int | None, optional): The width frames are scaled down to for the search (see
+                                                   scanner_utils.findFace). Defaults to DEFAULT_DETECTION_WIDTH.
+
+        Raises:
+            ValueError: If the padding is negative.
+        """
+        if padding < 0:
+            logging.critical(f"Invalid tracking padding {padding}.")
+            raise ValueError(f"The tracking padding can't be negative, not {padding}.")
+
+        self.padding = padding
+        self.opticalFlow = opticalFlow
+        self.detectionWidth = detectionWidth
+        self.box: tuple[int, int, int, int] | None = None
+        self.roiDetections = 0
+        self.fullDetections = 0
+        self.lost = 0
+
+        # the grayscale region around the last face, for optical flow
+        self.previousGray: np.ndarray | None = None
+        self.previousRegion: tuple[int, int, int, int] | None = None
+
+    @property
+    def tracking(self) -> bool:
+        return self.box is not None
+
+    def reset(self) -> None:
+        """Forgets the tracked face, so the next frame is searched in full."""
+        self.box = None
+        self.previousGray = None
+        self.previousRegion = None
+
+    def detect(self, frame: np.ndarray) -> tuple[tuple[int, int, int, int] | None, list[np.ndarray]]:
+        """Finds the face in the next frame, in the region around the last face if there is one.
+
+        Args:
+            frame (np.ndarray): The BGR frame.
+
+        Returns:
+            tuple[tuple[int, int, int, int] | None, list[np.ndarray]]: The bounding box (minX, minY, maxX, maxY)
+                                                                       of the face in the frame, or None if there
+                                                                       isn't one, and the contours of the squares
+                                                                       found (see scanner_utils.findFace).
+        """
+        box, squares = None, []
+        if self.box is not None:
+            if self.opticalFlow:
+                self.box = self.__followFlow(frame)
+
+            minX, minY, maxX, maxY = self.__padBox(self.box, frame.shape)
+            if minX < maxX and minY < maxY:
+                box, squares = findFace(frame[minY:maxY, minX:maxX], self.detectionWidth, frame.shape[1])
+            if box is not None:
+                self.roiDetections += 1
+                box = (box[0] + minX, box[1] + minY, box[2] + minX, box[3] + minY)
+                squares = [square + np.array([minX, minY], dtype=square.dtype) for square in squares]
+            else:
+                self.lost += 1
+
+        if box is None:
+            self.fullDetections += 1
+            box, squares = findFace(frame, self.detectionWidth)
+
+        self.box = box
+        if box is not None and self.opticalFlow:
+            self.previousRegion = self.__padBox(box, frame.shape)
+            minX, minY, maxX, maxY = self.previousRegion
+            self.previousGray = cv2.cvtColor(frame[minY:maxY, minX:maxX], cv2.COLOR_BGR2GRAY)
+        elif box is None:
+            self.reset()
+        return box, squares
+
+    def stats(self) -> dict:
+        """Returns how often faces were found in the region of interest and the whole frame.
+
+        Returns:
+            dict: The roi_detections and full_detections (the frames searched each way), lost (the times
+                  the face wasn't in the region, so the whole frame was searched) and whether a face is
+                  being tracked.
+        """
+        return {
+            "roi_detections": self.roiDetections,
+            "full_detections": self.fullDetections,
+            "lost": self.lost,
+            "tracking": self.tracking,
+        }
+
+    def __padBox(self, box: tuple[int, int, int, int], shape: tuple[int, ...]) -> tuple[int, int, int, int]:
+        """Pads a box by the padding on every side, clipped to the frame."""
+        minX, minY, maxX, maxY = box
+        padX = round((maxX - minX) * self.padding)
+        padY = round((maxY - minY) * self.padding)
+        return (
+            max(0, minX - padX),
+            max(0, minY - padY),
+            min(shape[1], maxX + padX),
+            min(shape[0], maxY + padY),
+        )
+
+    def __followFlow(self, frame: np.ndarray) -> tuple[int, int, int, int]:
+        """Moves the tracked box by the median optical flow of corners around it since the last frame."""
+        if self.previousGray is None:
+            return self.box
+
+        minX, minY, maxX, maxY = self.previousRegion
+        gray = cv2.cvtColor(frame[minY:maxY, minX:maxX], cv2.COLOR_BGR2GRAY)
+        if gray.shape != self.previousGray.shape:
+            return self.box
+
+        points = cv2.goodFeaturesToTrack(self.previousGray, FLOW_FEATURES, 0.01, 5)
+        if points is None:
+            return self.box
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.previousGray, gray, points, None)
+        followed = status.ravel() == 1
+        if followed.sum() < MIN_FLOW_FEATURES:
+            return self.box
+
+        shiftX, shiftY = np.median((moved - points).reshape(-1, 2)[followed], axis=0)
+        shiftX, shiftY = round(float(shiftX)), round(float(shiftY))
+        return (self.box[0] + shiftX, self.box[1] + shiftY, self.box[2] + shiftX, self.box[3] + shiftY)
@@ -25,6 +25,7 @@ class GUI:
         self.mainloopStarted = False
         self.calibratedColours = None
         self.showAnimations = True
+        self.solveMethod = "beginner"
         self.plotter = CubePlotter()
         self.ani = None
 
@@ -52,7 +53,7 @@ class GUI:
         """Solves the cube, and creates a TopLevel window with the moves to solve the cube."""
         logging.info("Solving cube")
 
-        self.cube.solve()
+        self.cube.solve(method=self.solveMethod)
         moves = " ".join(self.cube.optimisedMoves)
 
         top = tk.Toplevel(self.tk)
@@ -361,6 +362,21 @@ class GUI:
         )
         solve_btn.grid(row=3, column=0, columnspan=2, sticky="ew", pady=5)
 
+        def toggle_solve_method():
+            self.solveMethod = "two_phase" if self.solveMethod == "beginner" else "beginner"
+            method_btn.config(text=f"Solver: {'Two Phase' if self.solveMethod == 'two_phase' else 'Beginner'}")
+
+        method_btn = tk.Button(
+            control_frame,
+            text=f"Solver: {'Two Phase' if self.solveMethod == 'two_phase' else 'Beginner'}",
+            font=("Arial", 18, "bold"),
+            bg="lightblue",
+            activebackground="deepskyblue",
+            activeforeground="white",
+            command=toggle_solve_method,
+        )
+        method_btn.grid(row=4, column=0, columnspan=2, sticky="ew", pady=5)
+
         def toggle_animations():
             self.showAnimations = not self.showAnimations
             anim_btn.config(text=f"Animations: {'On' if self.showAnimations else 'Off'}")
@@ -374,7 +390,7 @@ class GUI:
             activeforeground="white",
             command=toggle_animations,
         )
-        anim_btn.grid(row=4, column=0, columnspan=2, sticky="ew", pady=5)
+        anim_btn.grid(row=5, column=0, columnspan=2, sticky="ew", pady=5)
 
         if not self.mainloopStarted:
             logging.info("Starting Tkinter main loop")
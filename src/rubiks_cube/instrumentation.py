@@ -0,0 +1,68 @@
+from typing import Callable
+
+
+class SearchCounters:
+    """Running totals of the work done by the solver, shared by the whole process. They are always
+    counted, as incrementing them is far cheaper than deciding whether to, and a stage's work is the
+    difference between the totals before and after it. Threads solving at the same time share them.
+    """
+
+    __slots__ = ("nodesExpanded", "maskChecks")
+
+    def __init__(self) -> None:
+        self.nodesExpanded = 0
+        self.maskChecks = 0
+
+
+COUNTERS = SearchCounters()
+
+
+class StageSpan:
+    """The time taken and work done by one stage of a solve."""
+
+    __slots__ = ("stage", "wallTime", "cpuTime", "movesAdded", "nodesExpanded", "maskChecks")
+
+    def __init__(
+        self, stage: str, wallTime: float, cpuTime: float, movesAdded: int, nodesExpanded: int, maskChecks: int
+    ) -> None:
+        """Initialises a StageSpan object.
+
+        Args:
+            stage (str): The name of the stage, e.g. "solveCross".
+            wallTime (float): The time the stage took in seconds.
+            cpuTime (float): The CPU time the solving thread spent on the stage in seconds. Unlike the wall
+                             time, this doesn't include time the thread was waiting to be run.
+            movesAdded (int): The number of moves the stage added to movesMade.
+            nodesExpanded (int): The number of states the pathfinding searched.
+            maskChecks (int): The number of times the cube or a searched state was checked against a mask.
+        """
+        self.stage = stage
+        self.wallTime = wallTime
+        self.cpuTime = cpuTime
+        self.movesAdded = movesAdded
+        self.nodesExpanded = nodesExpanded
+        self.maskChecks = maskChecks
+
+    def __repr__(self) -> str:
+        return (
+            f"StageSpan('{self.stage}', wallTime={self.wallTime:.6f}, cpuTime={self.cpuTime:.6f}, "
+            f"movesAdded={self.movesAdded}, nodesExpanded={self.nodesExpanded}, maskChecks={self.maskChecks})"
+        )
+
+    def asDict(self) -> dict:
+        """Returns the span as a dictionary, e.g. for logging it as JSON.
+
+        Returns:
+            dict: The stage, wall_time, cpu_time, moves_added, nodes_expanded and mask_checks.
+        """
+        return {
+            "stage": self.stage,
+            "wall_time": self.wallTime,
+            "cpu_time": self.cpuTime,
+            "moves_added": self.movesAdded,
+            "nodes_expanded": self.nodesExpanded,
+            "mask_checks": self.maskChecks,
+        }
+
+
+StageObserver = Callable[[StageSpan], None]
@@ -1,8 +1,71 @@
+import argparse
+import json
+import sys
+
+from .batch import SOLVE_METHODS, solveMany
 from .cube import Cube
 from .gui import GUI
+from .table_cache import buildAllTables, getCacheDir, setCacheDir
+
+
+def buildTables(args: argparse.Namespace) -> None:
+    """Prebuilds every search table into the cache directory."""
+    if args.cache_dir is not None:
+        setCacheDir(args.cache_dir)
+
+    for name in buildAllTables(force=args.force):
+        print(f"Built {name}")
+    print(f"Tables cached in {getCacheDir()}")
+
+
+def solveFile(args: argparse.Namespace) -> None:
+    """Solves every state in a file, printing one line per state in the order they were solved."""
+    if args.cache_dir is not None:
+        setCacheDir(args.cache_dir)
+
+    with open(args.file) if args.file != "-" else sys.stdin as f:
+        # blank lines and comments are skipped
+        states = (line.strip() for line in f if line.strip() and not line.lstrip().startswith("#"))
+        results = solveMany(
+            states,
+            workers=args.workers,
+            chunkSize=args.chunk_size,
+            ordered=not args.unordered,
+            method=args.method,
+        )
+        for result in results:
+            if args.json:
+                print(json.dumps(result))
+            elif result["error"] is not None:
+                print(f"{result['index']}: error: {result['error']}")
+            else:
+                print(f"{result['index']}: {' '.join(result['optimised_moves'])}")
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(prog="rubiks-cube", description="Rubik's cube scanner, GUI and solver.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    buildParser = subparsers.add_parser("build-tables", help="prebuild the solver's search tables")
+    buildParser.add_argument("--cache-dir", help="directory to cache the tables in")
+    buildParser.add_argument("--force", action="store_true", help="rebuild tables which are already cached")
+    buildParser.set_defaults(func=buildTables)
+
+    solveParser = subparsers.add_parser("solve", help="solve a file of cube states in parallel")
+    solveParser.add_argument("file", help="file with one 54 character state per line, or - for stdin")
+    solveParser.add_argument("--method", choices=SOLVE_METHODS, default="beginner", help="solving method")
+    solveParser.add_argument("--workers", type=int, help="number of worker processes (default: number of CPUs)")
+    solveParser.add_argument("--chunk-size", type=int, default=16, help="states sent to a worker at a time")
+    solveParser.add_argument("--unordered", action="store_true", help="print results as soon as they are solved")
+    solveParser.add_argument("--json", action="store_true", help="print each result as a JSON object")
+    solveParser.add_argument("--cache-dir", help="directory the solver's tables are cached in")
+    solveParser.set_defaults(func=solveFile)
 
+    args = parser.parse_args(argv)
+    if args.command is not None:
+        args.func(args)
+        return
 
-def main() -> None:
     cube = Cube()
     gui = GUI(cube)
     gui.createTkWindow()
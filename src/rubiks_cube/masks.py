@@ -0,0 +1,283 @@
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterable
+
+from .constants import (
+    F2L_CORNERS_INSERTION_MASKS,
+    F2L_CORNERS_SOLVED_MASKS,
+    F2L_MIDDLE_INSERTION_MASKS,
+    F2L_MIDDLE_SOLVED_MASKS,
+    SOLVED_MASK,
+    WHITE_CROSS_INSERTION_MASKS,
+    WHITE_CROSS_RECURSION_MASKS,
+    WHITE_CROSS_SOLVED_MASKS,
+    YELLOW_CROSS_SOLVED_MASK,
+    YELLOW_EDGES_SOLVED_MASK,
+    YELLOW_L_MASKS,
+    YELLOW_LINE_MASKS,
+)
+
+
+class CompiledMask:
+    """A mask compiled into the form it is checked and combined in. The squares it specifies
+    are stored as one bitmask per colour (bit i set if square i must be that colour), so
+    combining two masks is a bitwise OR, and as a list of (index, colour) constraints read
+    with a single itemgetter, so checking a state only touches the constrained squares.
+
+    Compiled masks compare and hash equal to other compiled masks of the same mask string,
+    and str() gives the mask string back.
+    """
+
+    __slots__ = ("mask", "colourBits", "specified", "indices", "expected", "__getter")
+
+    def __init__(self, colourBits: dict[str, int]) -> None:
+        """Initialises a CompiledMask. Use compileMask to compile a mask string.
+
+        Args:
+            colourBits (dict[str, int]): A bitmask of the squares each colour is required in. The bitmasks
+                                         must not overlap.
+        """
+        self.colourBits = {colour: bits for colour, bits in colourBits.items() if bits}
+        self.specified = 0
+        squares = ["."] * 54
+        for colour, bits in self.colourBits.items():
+            self.specified |= bits
+            while bits:
+                low = bits & -bits
+                squares[low.bit_length() - 1] = colour
+                bits ^= low
+
+        self.mask = "".join(squares)
+        self.indices = tuple(i for i, square in enumerate(squares) if square != ".")
+        expected = tuple(ord(squares[i]) for i in self.indices)
+        if len(self.indices) == 0:
+            self.__getter = None
+            self.expected = ()
+        elif len(self.indices) == 1:
+            # itemgetter with one index returns the item rather than a tuple
+            self.__getter = itemgetter(self.indices[0])
+            self.expected = expected[0]
+        else:
+            self.__getter = itemgetter(*self.indices)
+            self.expected = expected
+
+    def __str__(self) -> str:
+        return self.mask
+
+    def __repr__(self) -> str:
+        return f"CompiledMask('{self.mask}')"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompiledMask):
+            return NotImplemented
+        return self.mask == other.mask
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def matches(self, state: bytes | str) -> bool:
+        """Checks if a state matches the mask.
+
+        Args:
+            state (bytes | str): The state to check, either as bytes or as a string of length 54.
+
+        Returns:
+            bool: True if every square the mask specifies has the right colour, False otherwise.
+        """
+        if self.__getter is None:
+            return True
+        if isinstance(state, str):
+            state = state.encode("ascii")
+        return self.__getter(state) == self.expected
+
+    def combine(self, other: "CompiledMask") -> "CompiledMask":
+        """Combines two masks. If they both specify a certain square differently, priority is
+        given to this mask.
+
+        Args:
+            other (CompiledMask): The mask to combine with.
+
+        Returns:
+            CompiledMask: The combined mask.
+        """
+        return _combine(self, other)
+
+
+@lru_cache(maxsize=4096)
+def compileMask(mask: str) -> CompiledMask:
+    """Compiles a mask string. Compiled masks are cached, so compiling the same mask again is a lookup.
+
+    Args:
+        mask (str): A string of length 54, with "." for squares that can be any colour.
+
+    Returns:
+        CompiledMask: The compiled mask.
+    """
+    colourBits = {}
+    for i, square in enumerate(mask):
+        if square != ".":
+            colourBits[square] = colourBits.get(square, 0) | (1 << i)
+    return CompiledMask(colourBits)
+
+
+@lru_cache(maxsize=4096)
+def _combine(mask1: CompiledMask, mask2: CompiledMask) -> CompiledMask:
+    """Combines two compiled masks, giving priority to mask1. The solvers combine the same few
+    masks over and over, so the results are cached."""
+    unspecified = ~mask1.specified
+    colourBits = dict(mask1.colourBits)
+    for colour, bits in mask2.colourBits.items():
+        colourBits[colour] = colourBits.get(colour, 0) | (bits & unspecified)
+    return CompiledMask(colourBits)
+
+
+def _compileTable(table: set[tuple]) -> tuple[tuple, ...]:
+    """Compiles the mask in every (face, mask, ...) entry of a mask table. The entries are sorted, as the
+    solvers take the first match, so iterating the set would make solutions depend on the hash seed."""
+    return tuple((entry[0], compileMask(entry[1])) + tuple(entry[2:]) for entry in sorted(table))
+
+
+EMPTY_MASK = compileMask("." * 54)
+COMPILED_SOLVED_MASK = compileMask(SOLVED_MASK)
+
+COMPILED_WHITE_CROSS_SOLVED_MASKS = _compileTable(WHITE_CROSS_SOLVED_MASKS)
+COMPILED_WHITE_CROSS_INSERTION_MASKS = _compileTable(WHITE_CROSS_INSERTION_MASKS)
+COMPILED_WHITE_CROSS_RECURSION_MASKS = tuple(compileMask(mask) for mask in sorted(WHITE_CROSS_RECURSION_MASKS))
+
+COMPILED_F2L_CORNERS_SOLVED_MASKS = _compileTable(F2L_CORNERS_SOLVED_MASKS)
+COMPILED_F2L_CORNERS_INSERTION_MASKS = _compileTable(F2L_CORNERS_INSERTION_MASKS)
+COMPILED_F2L_MIDDLE_SOLVED_MASKS = _compileTable(F2L_MIDDLE_SOLVED_MASKS)
+COMPILED_F2L_MIDDLE_INSERTION_MASKS = _compileTable(F2L_MIDDLE_INSERTION_MASKS)
+
+COMPILED_YELLOW_CROSS_SOLVED_MASK = compileMask(YELLOW_CROSS_SOLVED_MASK)
+COMPILED_YELLOW_L_MASKS = _compileTable(YELLOW_L_MASKS)
+COMPILED_YELLOW_LINE_MASKS = _compileTable(YELLOW_LINE_MASKS)
+COMPILED_YELLOW_EDGES_SOLVED_MASK = compileMask(YELLOW_EDGES_SOLVED_MASK)
+
+
+class MaskMatcher:
+    """Finds which of a set of masks a state matches in a single pass. The masks are arranged
+    into a decision tree: each branch reads one square and follows the child for its colour,
+    where masks which don't constrain that square are shared by every child. The leaf reached
+    only holds the masks still possible, and checks the squares the tree hasn't already read.
+    """
+
+    MAX_TREE_DEPTH = 8
+
+    def __init__(self, masks: Iterable[CompiledMask]) -> None:
+        """Initialises a MaskMatcher.
+
+        Args:
+            masks (Iterable[CompiledMask]): The masks to match against. If a state matches more than one,
+                                            the first is returned.
+        """
+        self.masks = tuple(masks)
+        candidates = [
+            (order, mask, {i: ord(mask.mask[i]) for i in mask.indices}) for order, mask in enumerate(self.masks)
+        ]
+        self.__root = self.__buildNode(candidates, 0)
+
+    def __buildNode(self, candidates: list[tuple[int, CompiledMask, dict[int, int]]], depth: int) -> tuple | list:
+        """Builds the subtree for the masks still possible at a node.
+
+        Args:
+            candidates (list[tuple[int, CompiledMask, dict[int, int]]]): The order, mask and unread constraints
+                                                                         (position -> colour) of each mask.
+            depth (int): The depth of the node.
+
+        Returns:
+            tuple | list: A branch (position, {colour: child}, child if no colour matches), or a leaf list of
+                          (order, getter, expected, mask) checks.
+        """
+        bestPosition = None
+        bestSize = len(candidates)
+        if len(candidates) > 1 and depth < self.MAX_TREE_DEPTH:
+            positions = {position for _, _, constraints in candidates for position in constraints}
+            for position in sorted(positions):
+                counts = {}
+                unconstrained = 0
+                for _, _, constraints in candidates:
+                    colour = constraints.get(position)
+                    if colour is None:
+                        unconstrained += 1
+                    else:
+                        counts[colour] = counts.get(colour, 0) + 1
+                # the largest set of masks left to check after reading this square
+                size = unconstrained + max(counts.values())
+                if size < bestSize:
+                    bestPosition, bestSize = position, size
+
+        if bestPosition is None:
+            leaf = []
+            for order, mask, constraints in candidates:
+                indices = tuple(constraints)
+                if len(indices) == 0:
+                    getter, expected = None, None
+                elif len(indices) == 1:
+                    getter, expected = itemgetter(indices[0]), constraints[indices[0]]
+                else:
+                    getter, expected = itemgetter(*indices), tuple(constraints.values())
+                leaf.append((order, getter, expected, mask))
+            return leaf
+
+        branches = {}
+        shared = []
+        for candidate in candidates:
+            colour = candidate[2].get(bestPosition)
+            if colour is None:
+                shared.append(candidate)
+            else:
+                constraints = {k: v for k, v in candidate[2].items() if k != bestPosition}
+                branches.setdefault(colour, []).append((candidate[0], candidate[1], constraints))
+
+        children = {}
+        for colour, branchCandidates in branches.items():
+            merged = sorted(branchCandidates + shared, key=lambda candidate: candidate[0])
+            children[colour] = self.__buildNode(merged, depth + 1)
+        return (bestPosition, children, self.__buildNode(shared, depth + 1))
+
+    def match(self, state: bytes | str) -> CompiledMask | None:
+        """Finds the first mask a state matches.
+
+        Args:
+            state (bytes | str): The state to check, either as bytes or as a string of length 54.
+
+        Returns:
+            CompiledMask | None: The first matching mask, or None if the state matches none of them.
+        """
+        if isinstance(state, str):
+            state = state.encode("ascii")
+
+        node = self.__root
+        while node.__class__ is tuple:
+            position, children, default = node
+            node = children.get(state[position], default)
+
+        for _, getter, expected, mask in node:
+            if getter is None or getter(state) == expected:
+                return mask
+        return None
+
+    def matchesAny(self, state: bytes | str) -> bool:
+        """Checks if a state matches any of the masks.
+
+        Args:
+            state (bytes | str): The state to check, either as bytes or as a string of length 54.
+
+        Returns:
+            bool: True if the state matches at least one mask, False otherwise.
+        """
+        return self.match(state) is not None
+
+
+@lru_cache(maxsize=256)
+def getMaskMatcher(masks: tuple[CompiledMask, ...]) -> MaskMatcher:
+    """Returns a (cached) MaskMatcher for a tuple of masks.
+
+    Args:
+        masks (tuple[CompiledMask, ...]): The masks to match against.
+
+    Returns:
+        MaskMatcher: The matcher.
+    """
+    return MaskMatcher(masks)
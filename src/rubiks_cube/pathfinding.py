@@ -0,0 +1,324 @@
+from collections import OrderedDict, deque
+from functools import lru_cache
+from operator import itemgetter
+
+from .constants import POSSIBLE_ROTATIONS, STRING_ROTATION_MAPPINGS
+from .cube_state import encodeState
+from .instrumentation import COUNTERS
+from .masks import CompiledMask, compileMask, getMaskMatcher
+
+# the moves searched, as (label, gather) pairs
+SEARCH_MOVES: tuple[tuple[str, itemgetter], ...] = tuple(
+    (move, itemgetter(*STRING_ROTATION_MAPPINGS[move])) for move in POSSIBLE_ROTATIONS
+)
+
+# opposite faces commute, so of the two orders only the one where the first face comes
+# first in this order is searched
+FACE_ORDER = "UDFBRL"
+OPPOSITE_FACES = {"U": "D", "D": "U", "F": "B", "B": "F", "R": "L", "L": "R"}
+
+
+def _buildStickerDistances() -> list[list[int]]:
+    """Works out the minimum number of moves needed to take the square at each position
+    to every other position.
+
+    Returns:
+        list[list[int]]: distances[start][end], or -1 if end can't be reached from start.
+    """
+    # a gather takes the square at mapping[i] to position i
+    neighbours = [set() for _ in range(54)]
+    for move in POSSIBLE_ROTATIONS:
+        for end, start in enumerate(STRING_ROTATION_MAPPINGS[move]):
+            if start != end:
+                neighbours[start].add(end)
+
+    distances = []
+    for start in range(54):
+        row = [-1] * 54
+        row[start] = 0
+        queue = deque([start])
+        while queue:
+            position = queue.popleft()
+            for nextPosition in neighbours[position]:
+                if row[nextPosition] == -1:
+                    row[nextPosition] = row[position] + 1
+                    queue.append(nextPosition)
+        distances.append(row)
+
+    return distances
+
+
+def _buildMoveSuccessors() -> dict[int, tuple[int, ...]]:
+    """Works out which moves are worth trying after each move. With half turns searched, two turns
+    of one face in a row are never needed (R R is R2, R R2 is R', R R' is nothing), and of two
+    turns of opposite faces only the canonical order is tried (D U is U D).
+
+    Returns:
+        dict[int, tuple[int, ...]]: The moves to try, keyed by the index of the previous move, which
+                                    is -1 at the start of the search.
+    """
+    successors = {-1: tuple(range(len(SEARCH_MOVES)))}
+    for last, (lastMove, _) in enumerate(SEARCH_MOVES):
+        allowed = []
+        for index, (move, _) in enumerate(SEARCH_MOVES):
+            if move[0] == lastMove[0]:
+                continue
+            if move[0] == OPPOSITE_FACES[lastMove[0]] and FACE_ORDER.index(move[0]) < FACE_ORDER.index(lastMove[0]):
+                continue
+            allowed.append(index)
+        successors[last] = tuple(allowed)
+
+    return successors
+
+
+STICKER_DISTANCES = _buildStickerDistances()
+MAX_STICKER_DISTANCE = max(max(row) for row in STICKER_DISTANCES)
+MOVE_SUCCESSORS = _buildMoveSuccessors()
+
+
+# rough size in bytes of one transposition table entry (key tuple, 54 byte state, OrderedDict node)
+TRANSPOSITION_ENTRY_SIZE = 300
+DEFAULT_TRANSPOSITION_MEMORY = 32 * 1024 * 1024
+
+
+class TranspositionTable:
+    """A bounded cache of search nodes already proven to be dead ends. Each entry records the
+    most moves a node was searched with without reaching a mask, so the node can be skipped when
+    it is reached again (through an equivalent sequence of moves, or in a later search) with at
+    most that many moves remaining. When the table is full the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxMemory: int = DEFAULT_TRANSPOSITION_MEMORY) -> None:
+        """Initialises a TranspositionTable.
+
+        Args:
+            maxMemory (int, optional): The approximate maximum memory in bytes the table may use.
+                                       Defaults to DEFAULT_TRANSPOSITION_MEMORY (32MB).
+        """
+        self.maxEntries = max(1, maxMemory // TRANSPOSITION_ENTRY_SIZE)
+        self.__entries: OrderedDict[tuple, int] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def isDeadEnd(self, key: tuple, remaining: int) -> bool:
+        """Checks if a node is known not to reach a mask within a number of moves.
+
+        Args:
+            key (tuple): The key of the node.
+            remaining (int): The number of moves remaining.
+
+        Returns:
+            bool: True if the node was already searched with at least that many moves remaining.
+        """
+        provenDepth = self.__entries.get(key)
+        if provenDepth is not None and provenDepth >= remaining:
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        return False
+
+    def store(self, key: tuple, remaining: int) -> None:
+        """Records that a node doesn't reach a mask within a number of moves.
+
+        Args:
+            key (tuple): The key of the node.
+            remaining (int): The number of moves it was searched with.
+        """
+        entries = self.__entries
+        # a deeper result already recorded for the node is kept
+        if entries.get(key, -1) < remaining:
+            entries[key] = remaining
+        entries.move_to_end(key)
+
+        if len(entries) > self.maxEntries:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes every entry and resets the statistics."""
+        self.__entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns the table's statistics.
+
+        Returns:
+            dict: The number of entries, maximum entries, hits, misses, hit rate and evictions.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.__entries),
+            "max_entries": self.maxEntries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+_transpositionTable: TranspositionTable | None = None
+
+
+def getTranspositionTable() -> TranspositionTable | None:
+    """Returns the transposition table shared by every Cube's pathfinding, or None if it is disabled."""
+    return _transpositionTable
+
+
+def setTranspositionTable(table: TranspositionTable | None) -> None:
+    """Replaces the transposition table shared by every Cube's pathfinding.
+
+    Args:
+        table (TranspositionTable | None): The new table, or None to disable it.
+    """
+    global _transpositionTable
+    _transpositionTable = table
+
+
+@lru_cache(maxsize=4096)
+def compileSearchMask(mask: str) -> tuple[tuple[tuple[int, tuple[int, ...]], ...], ...]:
+    """Compiles a mask into the checks the search needs at each remaining depth. Entry r holds,
+    for every square the mask specifies, the colour it needs and the positions a square of that
+    colour could be moved into it from in at most r moves. If one of those checks fails, no
+    sequence of r moves can reach the mask, which is the heuristic the search prunes with.
+    Entry 0 is the mask itself.
+
+    Args:
+        mask (str): The mask to compile.
+
+    Returns:
+        tuple[tuple[tuple[int, tuple[int, ...]], ...], ...]: The checks for each remaining depth,
+                                                             up to MAX_STICKER_DISTANCE.
+    """
+    checks = []
+    for remaining in range(MAX_STICKER_DISTANCE + 1):
+        constraints = []
+        for position, colour in enumerate(mask):
+            if colour == ".":
+                continue
+            sources = tuple(start for start in range(54) if 0 <= STICKER_DISTANCES[start][position] <= remaining)
+            # once every position the square can come from is in range it can never fail
+            if remaining > 0 and len(sources) == sum(1 for row in STICKER_DISTANCES if row[position] >= 0):
+                continue
+            constraints.append((ord(colour), sources))
+
+        # the most selective checks go first so failing masks are rejected quickly
+        constraints.sort(key=lambda constraint: len(constraint[1]))
+        checks.append(tuple(constraints))
+
+    return tuple(checks)
+
+
+def _canReach(state: bytes, constraints: tuple[tuple[int, tuple[int, ...]], ...]) -> bool:
+    """Checks whether a state passes all of a compiled mask's checks for one depth.
+
+    Args:
+        state (bytes): The state to check.
+        constraints (tuple[tuple[int, tuple[int, ...]], ...]): The checks from compileSearchMask.
+
+    Returns:
+        bool: True if every check passes.
+    """
+    for colour, sources in constraints:
+        for position in sources:
+            if state[position] == colour:
+                break
+        else:
+            return False
+    return True
+
+
+def findPath(
+    state: bytes | str, masks: list[str | CompiledMask], maxDepth: int, table: TranspositionTable | None = None
+) -> list[str] | None:
+    """Finds the shortest sequence of moves which takes a state to one matching any of the masks,
+    using IDA* (iterative deepening A*). Sequences which are equivalent to shorter ones are never
+    tried, and branches are cut as soon as the heuristic shows none of the masks can be reached
+    in the moves remaining.
+
+    Args:
+        state (bytes | str): The state to search from.
+        masks (list[str | CompiledMask]): The masks to search for.
+        maxDepth (int): The maximum number of moves to search.
+        table (TranspositionTable | None, optional): A table to record dead ends in and skip them with.
+                                                     Defaults to None.
+
+    Returns:
+        list[str] | None: The moves to reach one of the masks, or None if none can be reached within maxDepth moves.
+    """
+    if isinstance(state, str):
+        state = encodeState(state)
+    masks = tuple(mask if isinstance(mask, CompiledMask) else compileMask(mask) for mask in masks)
+    if not masks:
+        return None
+
+    # the leaf test dominates the search, so it uses one matcher for all the masks
+    matcher = getMaskMatcher(masks)
+    match = matcher.match
+    COUNTERS.maskChecks += 1
+    if match(state) is not None:
+        return []
+
+    compiled = [compileSearchMask(mask.mask) for mask in masks]
+
+    # squares of a colour none of the masks mention can never affect the search, so table keys
+    # blank them out to let states differing only in those squares share entries. The moves
+    # which may follow a node depend on the last move, so that is part of the key too
+    if table is not None:
+        maskColours = {colour for mask in masks for colour in mask.colourBits}
+        blankUnused = bytes(i if chr(i) in maskColours else ord(".") for i in range(256))
+
+    path = []
+    # the nodes searched and leaves tested, added to the shared counters once the search is done
+    counts = [0, 0]
+
+    def search(state: bytes, remaining: int, last: int) -> bool:
+        counts[0] += 1
+        depth = min(remaining, MAX_STICKER_DISTANCE)
+        if not any(_canReach(state, checks[depth]) for checks in compiled):
+            return False
+
+        if remaining == 1:
+            successors = MOVE_SUCCESSORS[last]
+            counts[1] += len(successors)
+            for index in successors:
+                move, gather = SEARCH_MOVES[index]
+                if match(bytes(gather(state))) is not None:
+                    counts[1] -= len(successors) - successors.index(index) - 1
+                    path.append(move)
+                    return True
+            return False
+
+        if table is not None:
+            key = (matcher, state.translate(blankUnused), last)
+            if table.isDeadEnd(key, remaining):
+                return False
+
+        for index in MOVE_SUCCESSORS[last]:
+            move, gather = SEARCH_MOVES[index]
+            path.append(move)
+            if search(bytes(gather(state)), remaining - 1, index):
+                return True
+            path.pop()
+
+        if table is not None:
+            table.store(key, remaining)
+        return False
+
+    # shallower depths were already ruled out, so a path found at this depth is a shortest one
+    found = False
+    for depth in range(1, maxDepth + 1):
+        if search(state, depth, -1):
+            found = True
+            break
+
+    COUNTERS.nodesExpanded += counts[0] + counts[1]
+    COUNTERS.maskChecks += counts[1]
+    return path if found else None
@@ -0,0 +1,394 @@
+import json
+import logging
+import platform
+import random
+import time
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from .benchmark import SOLVES_PER_TASK, calibrationWorkload, runBenchmark
+from .constants import QUARTER_TURNS, SCAN_COLOURS, WHITE_CROSS_RECURSION_MASKS
+from .cube_utils import optimiseMoves, rotate
+from .scanner_utils import COLOUR_METHODS, extractColours
+
+RESULTS_VERSION = 3
+
+# the relative change in a metric allowed before it counts as a regression (an absolute change for
+# metrics whose baseline is 0). Timings are allowed for the noise left after calibration, and the move
+# counts and failed solves, which only depend on the seed, for real changes to the solver
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_TOLERANCES = {"solve.moves": 0.03, "solve.optimised_moves": 0.03, "solve.failures": 0.0}
+
+# timings are measured in CPU time, as a multiple of the time the calibration workload took next to
+# them (see benchmark.calibrationWorkload), and summarised by the median of the medians of several
+# separate runs, so one run on a slow machine doesn't move them. The micro benchmarks are timed in rounds,
+# each timing every benchmark in turn, and each task of the solve benchmark (SOLVES_PER_TASK solves in a
+# worker) is a run
+TIMING_RUNS = 9
+MICRO_REPEATS = 20
+CALIBRATION_REPEATS = 2
+
+
+def _timeRepeats(function: Callable[[], None], repeats: int = MICRO_REPEATS, warmUp: bool = True) -> np.ndarray:
+    """Times a function several times, in CPU time (of every thread, as OpenCV can use several).
+
+    Args:
+        function (Callable[[], None]): The function to time.
+        repeats (int, optional): The number of times to run it. Defaults to MICRO_REPEATS.
+        warmUp (bool, optional): Whether to run it once first, untimed. Defaults to True.
+
+    Returns:
+        np.ndarray: The CPU time each run took, in seconds.
+    """
+    if warmUp:
+        function()  # warm up caches
+    samples = np.zeros(repeats)
+    for i in range(repeats):
+        startTime = time.process_time_ns()
+        function()
+        samples[i] = (time.process_time_ns() - startTime) / 1e9
+    return samples
+
+
+def makeFaceImages(seed: int = 0, count: int = 12, size: int = 240) -> list[tuple[np.ndarray, list[str]]]:
+    """Generates images of cube faces with random stickers and sensor style noise, to stand in
+    for images recorded from a webcam.
+
+    Args:
+        seed (int, optional): The seed for the stickers and noise. Defaults to 0.
+        count (int, optional): The number of images. Defaults to 12.
+        size (int, optional): The width and height of each image in pixels. Defaults to 240.
+
+    Returns:
+        list[tuple[np.ndarray, list[str]]]: The BGR images, each with the colour names of its 9 stickers.
+    """
+    rng = np.random.default_rng(seed)
+    cell = size // 3
+    images = []
+    for _ in range(count):
+        image = np.zeros((size, size, 3), dtype=np.float32)
+        names = []
+        for y in range(3):
+            for x in range(3):
+                name, rgb = SCAN_COLOURS[rng.integers(len(SCAN_COLOURS))]
+                names.append(name)
+                image[y * cell : (y + 1) * cell, x * cell : (x + 1) * cell] = np.array(rgb[::-1]) * rng.uniform(0.9, 1)
+                # dark borders between the stickers
+                image[y * cell : (y + 1) * cell, x * cell : x * cell + cell // 12] = 20
+                image[y * cell : y * cell + cell // 12, x * cell : (x + 1) * cell] = 20
+        image += rng.normal(0, 6, image.shape)
+        images.append((np.clip(image, 0, 255).astype(np.uint8), names))
+    return images
+
+
+def loadFaceImages(directory: str | Path) -> list[tuple[np.ndarray, list[str] | None]]:
+    """Loads recorded images of cube faces (any .png or .jpg files) from a directory.
+
+    Args:
+        directory (str | Path): The directory to load from.
+
+    Returns:
+        list[tuple[np.ndarray, list[str] | None]]: The BGR images. The sticker colours are unknown, so are None.
+    """
+    paths = sorted(path for path in Path(directory).iterdir() if path.suffix.lower() in (".png", ".jpg", ".jpeg"))
+    return [(cv2.imread(str(path)), None) for path in paths]
+
+
+def collectSamples(
+    numSolves: int = 1000,
+    workers: int = None,
+    seed: int = 0,
+    images: list[tuple[np.ndarray, list[str] | None]] = None,
+    runs: int = TIMING_RUNS,
+) -> tuple[dict[str, list[np.ndarray]], dict]:
+    """Runs every benchmark, collecting the samples each metric is compared with, split into runs.
+
+    Args:
+        numSolves (int, optional): The number of solves for the solver metrics. Defaults to 1000.
+        workers (int, optional): The number of worker processes for the solves. Defaults to the number of CPUs.
+        seed (int, optional): The seed for the scrambles and inputs. Defaults to 0.
+        images (list[tuple[np.ndarray, list[str] | None]], optional): The face images for extractColours.
+                                                                      Defaults to makeFaceImages(seed).
+        runs (int, optional): The number of rounds the micro benchmarks are timed in. Defaults to TIMING_RUNS.
+
+    Returns:
+        tuple[dict[str, list[np.ndarray]], dict]: The samples of each metric (times as multiples of the
+                                                  calibration time of their run) in a list with an array per
+                                                  run, and the solve benchmark's results.
+    """
+    samples = {}
+    solveResults = runBenchmark(numSolves, workers=workers, seed=seed, calibrate=True)
+    raw = solveResults["raw"]
+    # each task's solves are a run
+    taskStarts = np.arange(SOLVES_PER_TASK, numSolves, SOLVES_PER_TASK)
+    for stage, values in raw.items():
+        if stage in ("moves", "optimised_moves"):
+            samples[f"solve.{stage}"] = [values.astype(np.float64)]
+        elif stage == "failed":
+            samples["solve.failures"] = [values.astype(np.float64)]
+        elif stage != "calibration":
+            name = "solve.total" if stage == "total" else f"stage.{stage}"
+            taskTimes = np.split(values.astype(np.float64), taskStarts)
+            samples[name] = [times / calibration for times, calibration in zip(taskTimes, raw["calibration"])]
+
+    # the micro benchmarks keep to quarter turns, so their workloads match older baselines
+    rng = random.Random(seed)
+    moveLists = [[rng.choice(QUARTER_TURNS).replace("'", "i") for _ in range(150)] for _ in range(50)]
+    masks = sorted(WHITE_CROSS_RECURSION_MASKS)
+    rotations = [rng.choice(QUARTER_TURNS) for _ in range(200)]
+    images = images if images is not None else makeFaceImages(seed)
+    microBenchmarks = {
+        "optimiseMoves": (lambda: [optimiseMoves(moves) for moves in moveLists], MICRO_REPEATS),
+        "rotate": (lambda: [rotate(mask, rotation) for mask in masks for rotation in rotations], MICRO_REPEATS),
+        "extractColours": (
+            lambda: [extractColours(image, SCAN_COLOURS) for image, _ in images],
+            max(1, MICRO_REPEATS // 10),
+        ),
+    }
+
+    # extractColours uses k-means with random initial centres
+    cv2.setRNGSeed(seed)
+    for name in microBenchmarks:
+        samples[name] = []
+    for run in range(runs):
+        for name, (function, repeats) in microBenchmarks.items():
+            before = _timeRepeats(calibrationWorkload, CALIBRATION_REPEATS, warmUp=False)
+            times = _timeRepeats(function, repeats, warmUp=run == 0)
+            after = _timeRepeats(calibrationWorkload, CALIBRATION_REPEATS, warmUp=False)
+            samples[name].append(times / np.median(np.concatenate([before, after])))
+
+    return samples, solveResults
+
+
+def summariseRuns(name: str, runs: list[np.ndarray]) -> dict:
+    """Summarises a metric's samples. Times are summarised by the median of each run's median, and
+    other metrics, which don't vary between runs, by their mean.
+
+    Args:
+        name (str): The metric.
+        runs (list[np.ndarray]): The samples of each run, with times as multiples of the calibration time.
+
+    Returns:
+        dict: The value compared between results, the value of each run, the number of samples and the unit.
+    """
+    if name in ("solve.moves", "solve.optimised_moves"):
+        unit = "moves"
+    elif name == "solve.failures":
+        unit = "fraction"
+    else:
+        unit = "calibrations"
+
+    runs = [values for values in runs if len(values)]
+    if unit == "calibrations":
+        runValues = [float(np.median(values)) for values in runs]
+        value = float(np.median(runValues)) if runValues else 0.0
+    else:
+        runValues = [float(values.mean()) for values in runs]
+        value = float(np.concatenate(runs).mean()) if runs else 0.0
+
+    return {"value": value, "runs": runValues, "count": int(sum(len(values) for values in runs)), "unit": unit}
+
+
+def compareColourMethods(images: list[tuple[np.ndarray, list[str] | None]], seed: int = 0, repeats: int = 3) -> dict:
+    """Runs every way of estimating the sticker colours (see scanner_utils.COLOUR_METHODS) on face images,
+    timing each and comparing its stickers with those k-means finds and, for images whose stickers are
+    known, with the true colours.
+
+    Args:
+        images (list[tuple[np.ndarray, list[str] | None]]): The face images.
+        seed (int, optional): The seed for k-means's initial centres. Defaults to 0.
+        repeats (int, optional): The number of timed runs over the images. Defaults to 3.
+
+    Returns:
+        dict: For each method, the mean CPU time per frame (in seconds), the fraction of stickers matching
+              k-means (agreement) and the fraction correct (accuracy, None if no image's stickers are known).
+    """
+    cv2.setRNGSeed(seed)
+    found = {method: [extractColours(image, SCAN_COLOURS, method) for image, _ in images] for method in COLOUR_METHODS}
+    known = [(index, names) for index, (_, names) in enumerate(images) if names is not None]
+    numStickers = 9 * len(images)
+
+    comparison = {}
+    for method, colours in found.items():
+        times = _timeRepeats(lambda: [extractColours(image, SCAN_COLOURS, method) for image, _ in images], repeats)
+        agreement = sum(a == b for face, reference in zip(colours, found["kmeans"]) for a, b in zip(face, reference))
+        correct = sum(a == b for index, names in known for a, b in zip(colours[index], names))
+        comparison[method] = {
+            "frame_time": float(times.mean()) / len(images),
+            "agreement": agreement / numStickers,
+            "accuracy": correct / (9 * len(known)) if known else None,
+        }
+
+    return comparison
+
+
+def printColourComparison(comparison: dict) -> None:
+    """Prints a comparison from compareColourMethods to the console.
+
+    Args:
+        comparison (dict): The comparison.
+    """
+    print(f"{'Colour method':<15}{'ms/frame':>10}{'agreement':>11}{'accuracy':>10}")
+    for method, row in comparison.items():
+        accuracy = f"{row['accuracy']:.1%}" if row["accuracy"] is not None else "-"
+        print(f"{method:<15}{row['frame_time'] * 1e3:>10.3f}{row['agreement']:>11.1%}{accuracy:>10}")
+
+
+def runRegressionBenchmark(
+    numSolves: int = 1000, workers: int = None, seed: int = 0, images: list[tuple[np.ndarray, list[str] | None]] = None
+) -> dict:
+    """Runs every benchmark and summarises the results in a JSON serialisable form.
+
+    Args:
+        numSolves (int, optional): The number of solves for the solver metrics. Defaults to 1000.
+        workers (int, optional): The number of worker processes for the solves. Defaults to the number of CPUs.
+        seed (int, optional): The seed for the scrambles and inputs. Defaults to 0.
+        images (list[tuple[np.ndarray, list[str] | None]], optional): The face images for extractColours.
+                                                                      Defaults to makeFaceImages(seed).
+
+    Returns:
+        dict: The results, with the throughput of the solves (solves per calibration time, which is compared)
+              and the CPU throughput (solves per CPU second, see runBenchmark), the median calibration time in
+              seconds, a summary of every metric (see summariseRuns), and the comparison of the colour
+              estimation methods (see compareColourMethods).
+    """
+    images = images if images is not None else makeFaceImages(seed)
+    samples, solveResults = collectSamples(numSolves, workers, seed, images)
+    metrics = {name: summariseRuns(name, runs) for name, runs in samples.items()}
+    calibratedTime = float(np.concatenate(samples["solve.total"]).sum())
+
+    return {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {"solves": numSolves, "workers": solveResults["workers"], "seed": seed},
+        "throughput": numSolves / calibratedTime if calibratedTime > 0 else 0.0,
+        "cpu_throughput": solveResults["cpu_throughput"],
+        "calibration": float(np.median(solveResults["raw"]["calibration"])) / 1e9,
+        "metrics": metrics,
+        "colour_methods": compareColourMethods(images, seed),
+    }
+
+
+def saveResults(results: dict, path: str | Path) -> None:
+    """Saves benchmark results as JSON.
+
+    Args:
+        results (dict): The results from runRegressionBenchmark.
+        path (str | Path): The file to save to.
+    """
+    Path(path).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def loadResults(path: str | Path) -> dict:
+    """Loads benchmark results saved with saveResults.
+
+    Args:
+        path (str | Path): The file to load.
+
+    Raises:
+        ValueError: If the results were saved in a different format version.
+
+    Returns:
+        dict: The results.
+    """
+    results = json.loads(Path(path).read_text())
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported benchmark results version {results.get('version')}.")
+    return results
+
+
+def _change(baseline: float, current: float) -> float:
+    """The relative change from the baseline to the current value, or the absolute change if the baseline is 0."""
+    return current / baseline - 1 if baseline > 0 else current - baseline
+
+
+def compareResults(
+    current: dict,
+    baseline: dict,
+    tolerances: dict[str, float] = None,
+    defaultTolerance: float = DEFAULT_TOLERANCE,
+) -> list[dict]:
+    """Compares benchmark results against a baseline. A metric regresses if it is worse than the
+    baseline's by more than its tolerance. Timings are multiples of the calibration time next to them
+    (see collectSamples), so they allow for the machine's speed, but not for differences between kinds of
+    machine, so the baseline is best saved on the kind the check runs on.
+
+    Args:
+        current (dict): The results to check.
+        baseline (dict): The baseline results.
+        tolerances (dict[str, float], optional): Relative tolerances for specific metrics, on top of
+                                                 DEFAULT_TOLERANCES. Defaults to None.
+        defaultTolerance (float, optional): The relative tolerance for other metrics. Defaults to DEFAULT_TOLERANCE.
+
+    Raises:
+        ValueError: If the results were run with different settings (number of solves, workers or seed).
+
+    Returns:
+        list[dict]: One row per metric in both results, and the throughput, with the baseline and current
+                    values, the change (positive when worse), the tolerance and whether it regressed.
+    """
+    if current["settings"] != baseline["settings"]:
+        logging.critical(f"Benchmark settings {current['settings']} don't match the baseline's {baseline['settings']}.")
+        raise ValueError(
+            f"Can't compare results run with {current['settings']} against a baseline run with {baseline['settings']}."
+        )
+
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+
+    rows = []
+    for name, baselineMetric in baseline["metrics"].items():
+        currentMetric = current["metrics"].get(name)
+        if currentMetric is None:
+            continue
+
+        change = _change(baselineMetric["value"], currentMetric["value"])
+        tolerance = tolerances.get(name, defaultTolerance)
+        rows.append(
+            {
+                "metric": name,
+                "baseline": baselineMetric["value"],
+                "current": currentMetric["value"],
+                "change": change,
+                "tolerance": tolerance,
+                "regressed": change > tolerance,
+            }
+        )
+
+    # throughput (solves per calibration time) is higher when better, so it regresses when it drops. The change
+    # is the slowdown, as for the times
+    change = baseline["throughput"] / current["throughput"] - 1 if current["throughput"] > 0 else 0.0
+    tolerance = tolerances.get("throughput", defaultTolerance)
+    rows.append(
+        {
+            "metric": "throughput",
+            "baseline": baseline["throughput"],
+            "current": current["throughput"],
+            "change": change,
+            "tolerance": tolerance,
+            "regressed": change > tolerance,
+        }
+    )
+
+    return rows
+
+
+def printComparison(rows: list[dict]) -> None:
+    """Prints a comparison from compareResults to the console, flagging regressions.
+
+    Args:
+        rows (list[dict]): The comparison rows.
+    """
+    print("\n-----------------------------")
+    print(f"{'Metric':<30}{'baseline':>12}{'current':>12}{'change':>9}{'limit':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['metric']:<30}{row['baseline']:>12.6g}{row['current']:>12.6g}"
+            f"{row['change']:>+9.1%}{row['tolerance']:>+8.0%}{flag}"
+        )
+    print("-----------------------------")
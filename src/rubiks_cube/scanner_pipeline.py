@@ -0,0 +1,199 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+# weight of the newest sample in the smoothed frame rates and latencies
+STATS_SMOOTHING = 0.1
+
+
+class StageStats:
+    """The frame rate and latency of one stage of a ScannerPipeline. Each stage is only updated by the
+    thread running it, so reading the statistics from another thread needs no lock.
+    """
+
+    __slots__ = ("stage", "frames", "dropped", "fps", "latency", "lastTime")
+
+    def __init__(self, stage: str) -> None:
+        """Initialises a StageStats object.
+
+        Args:
+            stage (str): The name of the stage, e.g. "capture".
+        """
+        self.stage = stage
+        self.frames = 0
+        self.dropped = 0
+        self.fps = 0.0
+        self.latency = 0.0
+        self.lastTime: float = None
+
+    def record(self, latency: float, now: float = None) -> None:
+        """Records a frame finishing the stage.
+
+        Args:
+            latency (float): The seconds between the frame being captured and finishing the stage.
+            now (float, optional): The time the frame finished, from time.perf_counter. Defaults to now.
+        """
+        now = time.perf_counter() if now is None else now
+        if self.lastTime is None:
+            self.latency = latency
+        else:
+            interval = now - self.lastTime
+            if interval > 0:
+                fps = 1 / interval
+                self.fps = fps if self.frames == 1 else self.fps + STATS_SMOOTHING * (fps - self.fps)
+            self.latency += STATS_SMOOTHING * (latency - self.latency)
+        self.lastTime = now
+        self.frames += 1
+
+    def asDict(self) -> dict:
+        """Returns the statistics as a dictionary, e.g. for logging them as JSON.
+
+        Returns:
+            dict: The stage, frames, dropped, fps and latency (in seconds), the last two smoothed.
+        """
+        return {
+            "stage": self.stage,
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "fps": self.fps,
+            "latency": self.latency,
+        }
+
+
+def putLatest(items: queue.Queue, item: Any, stats: StageStats) -> None:
+    """Puts an item on a bounded queue, dropping the oldest item waiting if it is full, so whoever
+    reads the queue always gets the newest items.
+
+    Args:
+        items (queue.Queue): The queue.
+        item (Any): The item to put on it.
+        stats (StageStats): The statistics of the stage producing the item, which counts the drops.
+    """
+    while True:
+        try:
+            items.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                items.get_nowait()
+                stats.dropped += 1
+            except queue.Empty:
+                pass
+
+
+class ScannerPipeline:
+    """Reads frames from a camera and processes them on two background threads, so neither blocks the
+    thread displaying them. The capture thread keeps reading frames, the processing thread works on the
+    newest one, and the consumer takes the newest result with latest. Both queues are bounded, and when
+    a stage falls behind the frames it hasn't got to yet are dropped, so results never lag further
+    behind the camera than one frame per stage.
+    """
+
+    def __init__(self, capture: Any, process: Callable[[Any], Any], queueSize: int = 1) -> None:
+        """Initialises a ScannerPipeline. The threads are started by start.
+
+        Args:
+            capture (Any): The source of frames, e.g. a cv2.VideoCapture. Anything with read() returning
+                           (ret, frame) and release() works.
+            process (Callable[[Any], Any]): Called on the processing thread with each frame, returning the
+                                            result passed to the consumer.
+            queueSize (int, optional): The most frames or results waiting between two stages. Defaults to 1.
+        """
+        self.capture = capture
+        self.process = process
+        self.frames: queue.Queue = queue.Queue(maxsize=max(1, queueSize))
+        self.results: queue.Queue = queue.Queue(maxsize=max(1, queueSize))
+        self.captureStats = StageStats("capture")
+        self.processStats = StageStats("process")
+        self.displayStats = StageStats("display")
+
+        self.__stopping = threading.Event()
+        self.__threads: list[threading.Thread] = []
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self.__threads)
+
+    def start(self) -> None:
+        """Starts the capture and processing threads."""
+        if self.running:
+            return
+        self.__stopping.clear()
+        self.__threads = [
+            threading.Thread(target=self.__captureLoop, name="scanner-capture", daemon=True),
+            threading.Thread(target=self.__processLoop, name="scanner-process", daemon=True),
+        ]
+        for thread in self.__threads:
+            thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stops the threads and releases the capture.
+
+        Args:
+            timeout (float, optional): The most seconds to wait for each thread to finish. Defaults to 2.0.
+        """
+        self.__stopping.set()
+        for thread in self.__threads:
+            thread.join(timeout)
+        self.__threads = []
+
+    def latest(self) -> Any | None:
+        """Takes the newest result, recording it in the display statistics. Called by the consumer.
+
+        Returns:
+            Any | None: The result, or None if there is no result it hasn't already taken.
+        """
+        try:
+            captured, result = self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+        now = time.perf_counter()
+        self.displayStats.record(now - captured, now)
+        return result
+
+    def stats(self) -> dict[str, dict]:
+        """Returns the statistics of every stage.
+
+        Returns:
+            dict[str, dict]: The statistics (see StageStats.asDict) keyed by stage: capture, process and display.
+        """
+        return {stats.stage: stats.asDict() for stats in (self.captureStats, self.processStats, self.displayStats)}
+
+    def __captureLoop(self) -> None:
+        """Reads frames until stopped, then releases the capture."""
+        try:
+            while not self.__stopping.is_set():
+                start = time.perf_counter()
+                ret, frame = self.capture.read()
+                if not ret:
+                    # no frame yet, or the camera was disconnected
+                    self.__stopping.wait(0.01)
+                    continue
+
+                now = time.perf_counter()
+                self.captureStats.record(now - start, now)
+                putLatest(self.frames, (now, frame), self.captureStats)
+        finally:
+            self.capture.release()
+
+    def __processLoop(self) -> None:
+        """Processes the newest frame until stopped."""
+        while not self.__stopping.is_set():
+            try:
+                captured, frame = self.frames.get(timeout=0.05)
+            except queue.Empty:
+                continue
+
+            try:
+                result = self.process(frame)
+            except Exception as e:
+                # one bad frame shouldn't stop the scan
+                logging.warning(f"Error processing frame: {e}")
+                continue
+
+            now = time.perf_counter()
+            self.processStats.record(now - captured, now)
+            putLatest(self.results, (captured, result), self.processStats)
@@ -3,8 +3,27 @@ import logging
 import cv2
 import numpy as np
 
+from .colour_classifier import DEFAULT_COLOUR_SPACE, ColourClassifier, getClassifier
 from .constants import FACE_TO_POSITION, USUAL_COLOUR_VALUES
 
+# the ways extractColours can estimate the colour of each cell: k-means on each cell, a per channel
+# median or trimmed mean of every cell at once in CIELAB, or classifying every pixel and taking
+# each cell's most common colour
+COLOUR_METHODS = ("kmeans", "median", "trimmed", "pixels")
+
+# the fraction of each cell's pixels cut from both ends of each channel by the trimmed mean
+TRIM_FRACTION = 0.25
+
+# faces are searched for in frames scaled down to this width, and the square contour thresholds are
+# tuned for it: the area of each sticker and how far its sides can differ. At other resolutions the
+# areas are scaled with the resolution, and smaller squares are allowed to be less square, as their
+# sides are rounded to fewer pixels. The blur and edge dilation are tuned for it too, so much smaller
+# detection widths miss faces that aren't close to the camera
+DEFAULT_DETECTION_WIDTH = 640
+REFERENCE_WIDTH = 640
+SQUARE_AREA_RANGE = (300, 2000)
+SQUARE_ASPECT_TOLERANCE = 0.2
+
 
 def distance(r, g, b, r2, g2, b2) -> float:
     """Gets the distance between two RGB colors.
@@ -23,20 +42,21 @@ def distance(r, g, b, r2, g2, b2) -> float:
     return (r - r2) ** 2 + (g - g2) ** 2 + (b - b2) ** 2
 
 
-def getClosestColourName(colour: tuple[float, float, float], colours: list[tuple[str, np.ndarray]]) -> str:
-    """Gets the name of the closest color to the given RGB values.
+def getClosestColourName(
+    colour: tuple[float, float, float], colours: list[tuple[str, np.ndarray]], space: str = DEFAULT_COLOUR_SPACE
+) -> str:
+    """Gets the name of the closest color to the given RGB values (see ColourClassifier).
 
     Args:
         colour (tuple[float, float, float]): The RGB values of the color.
+        colours (list[tuple[str, np.ndarray]]): The name and RGB value of each colour to choose from.
+        space (str, optional): The colour space the colours are compared in, one of
+                               colour_classifier.COLOUR_SPACES. Defaults to DEFAULT_COLOUR_SPACE, RGB.
 
     Returns:
         str: The name of the closest color.
     """
-    r, g, b = colour[0], colour[1], colour[2]
-
-    closestColour = min(colours, key=lambda x: distance(r, g, b, *x[1]))
-
-    return closestColour[0]
+    return getClassifier(colours, space).classifyNames([colour])[0]
 
 
 def displayFace(image: np.ndarray, colourList: list[list]) -> np.ndarray:
@@ -96,15 +116,106 @@ def getDominantColours(image: np.ndarray, numClusters: int = 2) -> list[tuple]:
     return dominantColours
 
 
-def extractColours(image: np.ndarray, faceColours: list[tuple[str, np.ndarray]]) -> list[list]:
+def getCellPixels(image: np.ndarray) -> np.ndarray:
+    """Takes the pixels from the middle of each of the 9 cells of a face (the same part of each
+    cell extractColours samples with k-means), all in one array.
+
+    Args:
+        image (np.ndarray): The BGR image of the Rubik's Cube face.
+
+    Returns:
+        np.ndarray: The (9, N, 3) BGR pixels of each cell, in reading order.
+    """
+    height, width = image.shape[:2]
+    cellHeight, cellWidth = height // 3, width // 3
+    startY, endY = int(round(0.2 * cellHeight)), int(round(0.8 * cellHeight))
+    startX, endX = int(round(0.2 * cellWidth)), int(round(0.8 * cellWidth))
+
+    # (rows, cell y, columns, cell x, channel) -> (cell, pixel, channel)
+    cells = image[: cellHeight * 3, : cellWidth * 3].reshape(3, cellHeight, 3, cellWidth, 3)[
+        :, startY:endY, :, startX:endX
+    ]
+    return np.ascontiguousarray(cells.transpose(0, 2, 1, 3, 4)).reshape(9, -1, 3)
+
+
+def getCellColours(image: np.ndarray, statistic: str = "median") -> np.ndarray:
+    """Estimates the colour of each of the 9 cells of a face in one vectorised pass. The middle of
+    every cell (see getCellPixels) is converted to CIELAB, where distances match how different
+    colours look, and summarised by a per channel median or trimmed mean, which ignore glare and
+    the edges of the stickers.
+
+    Args:
+        image (np.ndarray): The BGR image of the Rubik's Cube face.
+        statistic (str, optional): "median" or "trimmed" (the mean of the middle half). Defaults to "median".
+
+    Returns:
+        np.ndarray: The (9, 3) RGB colour of each cell, in reading order.
+    """
+    pixels = getCellPixels(image)
+    lab = cv2.cvtColor(pixels.reshape(-1, 1, 3), cv2.COLOR_BGR2LAB).reshape(9, -1, 3)
+
+    # the values are bytes, so a histogram of each channel of each cell gives its order statistics
+    # without sorting. Row i of counts is channel i % 3 of cell i // 3
+    numPixels = lab.shape[1]
+    values = lab.transpose(0, 2, 1).reshape(27, numPixels).astype(np.int64) + np.arange(27)[:, None] * 256
+    counts = np.bincount(values.ravel(), minlength=27 * 256).reshape(27, 256)
+    cumulative = counts.cumsum(axis=1)
+
+    if statistic == "median":
+        summary = np.argmax(cumulative * 2 >= numPixels, axis=1).astype(np.float64)
+    else:
+        # how many of each value fall between the trimmed ends
+        trim = int(numPixels * TRIM_FRACTION)
+        kept = np.clip(np.minimum(cumulative, numPixels - trim) - np.maximum(cumulative - counts, trim), 0, None)
+        summary = kept @ np.arange(256) / kept.sum(axis=1)
+
+    bgr = cv2.cvtColor(np.round(summary).astype(np.uint8).reshape(9, 1, 3), cv2.COLOR_LAB2BGR)
+    # as floats, since the distances to the face colours would overflow uint8
+    return bgr.reshape(9, 3)[:, ::-1].astype(np.float32)
+
+
+def extractColours(
+    image: np.ndarray,
+    faceColours: list[tuple[str, np.ndarray]] | ColourClassifier,
+    method: str = "kmeans",
+    space: str = DEFAULT_COLOUR_SPACE,
+) -> list[list]:
     """Extracts the colours of each cell in the Rubik's Cube face.
 
     Args:
         image (np.ndarray): The image of the Rubik's Cube face.
+        faceColours (list[tuple[str, np.ndarray]] | ColourClassifier): The name and RGB value of each colour
+                                                                       to choose from, or a classifier for them.
+        method (str, optional): How each cell's colour is estimated, one of COLOUR_METHODS. "kmeans" finds
+                                the dominant colour of each cell with k-means, "median" and "trimmed" use
+                                getCellColours and "pixels" classifies every pixel with the classifier's lookup
+                                table, which are all far faster. Defaults to "kmeans".
+        space (str, optional): The colour space the cells' colours are matched to the palette in, one of
+                               colour_classifier.COLOUR_SPACES. A classifier uses its own. Defaults to
+                               DEFAULT_COLOUR_SPACE, RGB.
+
+    Raises:
+        ValueError: If the method is not one of COLOUR_METHODS.
 
     Returns:
         list[list]: A list of lists containing the colours of each face of the cube.
     """
+    if method not in COLOUR_METHODS:
+        logging.critical(f"Unknown colour method {method}.")
+        raise ValueError(f"Unknown colour method {method}, expected one of {', '.join(COLOUR_METHODS)}.")
+
+    classifier = getClassifier(faceColours, space)
+    if method == "pixels":
+        labels = classifier.classifyImage(getCellPixels(image))
+        numColours = len(classifier.names)
+        # the most common class in each cell
+        offsets = np.arange(9)[:, None] * numColours
+        votes = np.bincount((labels + offsets).ravel(), minlength=9 * numColours).reshape(9, numColours)
+        return [classifier.names[index] for index in votes.argmax(axis=1)]
+
+    if method != "kmeans":
+        return classifier.classifyNames(getCellColours(image, method))
+
     cells = []
 
     w, h = image.shape[:2]
@@ -120,15 +231,127 @@ def extractColours(image: np.ndarray, faceColours: list[tuple[str, np.ndarray]])
 
             cells.append(image[startY:endY, startX:endX])
 
-    counter = 0
-    colours = []
-    for cell in cells:
-        counter += 1
-        dominantColour = getDominantColours(cell)[0]
-        dominantColourName = getClosestColourName(dominantColour, faceColours)
+    dominantColours = [getDominantColours(cell)[0] for cell in cells]
+    return classifier.classifyNames(np.array(dominantColours))
+
 
-        colours.append(dominantColourName)
-    return colours
+def scaleDown(image: np.ndarray, scale: float) -> np.ndarray:
+    """Scales an image down through a pyramid: halving it while it is at least twice as big as wanted,
+    which averages each 2x2 block of pixels, and resizing the rest of the way bilinearly. This is much
+    faster than resizing by area in one go, without the aliasing of resizing bilinearly in one go.
+
+    Args:
+        image (np.ndarray): The image.
+        scale (float): The fraction of its size to scale it to, at most 1.
+
+    Returns:
+        np.ndarray: The scaled image, or the image itself if the scale is 1.
+    """
+    if scale >= 1:
+        return image
+
+    size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+    while image.shape[1] >= size[0] * 2 and image.shape[0] >= size[1] * 2:
+        image = cv2.resize(image, (image.shape[1] // 2, image.shape[0] // 2), interpolation=cv2.INTER_AREA)
+    if (image.shape[1], image.shape[0]) != size:
+        image = cv2.resize(image, size, interpolation=cv2.INTER_LINEAR)
+    return image
+
+
+def findFace(
+    image: np.ndarray, detectionWidth: int | None = DEFAULT_DETECTION_WIDTH, frameWidth: int | None = None
+) -> tuple[tuple[int, int, int, int] | None, list[np.ndarray]]:
+    """Looks for a face of the cube in an image: at least four squares of a similar size close
+    together, whose bounding box is roughly square and mostly covered by them.
+
+    The image is searched scaled down so the frame is detectionWidth wide, and the face is mapped back
+    to the full resolution, so the colours can still be read from the full resolution image.
+
+    Args:
+        image (np.ndarray): The BGR image to search, a frame or a region cut from one.
+        detectionWidth (int | None, optional): The width the frame is scaled down to for the search, or
+                                               None to search at full resolution. Frames are never scaled
+                                               up. Defaults to DEFAULT_DETECTION_WIDTH.
+        frameWidth (int | None, optional): The width of the frame the image was cut from, which sets
+                                           the scale and the size of squares looked for. Defaults to
+                                           None, the image's width.
+
+    Returns:
+        tuple[tuple[int, int, int, int] | None, list[np.ndarray]]: The bounding box (minX, minY, maxX, maxY)
+                                                                   of the face, or None if there isn't one,
+                                                                   and the contours of the squares found,
+                                                                   both in the image's coordinates.
+    """
+    frameWidth = image.shape[1] if frameWidth is None else frameWidth
+    scale = 1.0 if detectionWidth is None else min(1.0, detectionWidth / frameWidth)
+
+    # the thresholds at the resolution searched
+    linearScale = frameWidth * scale / REFERENCE_WIDTH
+    minArea, maxArea = (area * linearScale**2 for area in SQUARE_AREA_RANGE)
+    aspectTolerance = SQUARE_ASPECT_TOLERANCE * max(1.0, 1 / linearScale)
+
+    # manipulating image to scan contours
+    grayed = scaleDown(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), scale)
+    blurred = cv2.GaussianBlur(grayed, (5, 5), cv2.BORDER_DEFAULT)
+    canny = cv2.Canny(blurred, 20, 40)
+    kernel = np.ones((3, 3), np.uint8)
+    dilated = cv2.dilate(canny, kernel, iterations=2)
+
+    contours, _ = cv2.findContours(dilated, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    contours = sorted(contours, key=cv2.contourArea, reverse=True)
+
+    counter = 30
+    faceContours = []
+    totalWidth = 0
+    # filtering out non-square contours
+    for c in contours:
+        peri = cv2.arcLength(c, True)
+        approx = cv2.approxPolyDP(c, 0.05 * peri, True)
+        minX, minY, width, height = cv2.boundingRect(approx)
+        aspectRatio = width / height
+        if len(approx) == 4 and maxArea > cv2.contourArea(approx) > minArea and abs(aspectRatio - 1) < aspectTolerance:
+            counter -= 1
+            if counter == 0:
+                break
+            totalWidth += width
+            faceContours.append(approx)
+
+    if len(faceContours) <= 3:
+        return None, []
+
+    faceContours = filterContours(faceContours, (totalWidth / len(faceContours)) * 4)
+    if not faceContours:
+        return None, []
+    avgArea = sum([cv2.contourArea(faceContours[i]) for i in range(len(faceContours))]) / len(faceContours)
+
+    squares = []
+    faceCornersX = []
+    faceCornersY = []
+    for i in range(len(faceContours)):
+        if avgArea * 0.7 < cv2.contourArea(faceContours[i]) < 1.3 * avgArea:
+            for ii in range(4):
+                faceCornersX.append(int(faceContours[i][ii][0][0]))
+                faceCornersY.append(int(faceContours[i][ii][0][1]))
+            squares.append(faceContours[i])
+
+    box = None
+    # checking if there are enough corners to make a square
+    if len(faceCornersX) > 4:
+        maxX, maxY = max(faceCornersX), max(faceCornersY)
+        minX, minY = min(faceCornersX), min(faceCornersY)
+        areaRect = (maxX - minX) * (maxY - minY)
+
+        # checking the squares cover most of the rectangle, and that it is roughly square
+        if areaRect * 0.45 < avgArea * 9 < areaRect * 1.1 and (maxX - minX) * 0.8 < maxY - minY < 1.2 * (maxX - minX):
+            box = (minX, minY, maxX, maxY)
+
+    if scale < 1:
+        # mapping back to full resolution
+        squares = [np.round(square / scale).astype(square.dtype) for square in squares]
+        if box is not None:
+            minX, minY, maxX, maxY = box
+            box = (int(minX / scale), int(minY / scale), int(np.ceil(maxX / scale)), int(np.ceil(maxY / scale)))
+    return box, squares
 
 
 def filterContours(contours: list[np.ndarray], thresholdDistance: int) -> list[np.ndarray]:
@@ -0,0 +1,103 @@
+from functools import lru_cache
+
+from .constants import POSSIBLE_ROTATIONS
+
+FACE_NOTATION = {"R": "R", "L": "L", "U": "U", "D": "D", "F": "F", "B": "B"}
+COLOUR_NOTATION = {"B": "R", "G": "L", "W": "U", "Y": "D", "R": "F", "O": "B"}
+FACE_TO_COLOUR = {face: colour for colour, face in COLOUR_NOTATION.items()}
+
+# how the suffix of each move in POSSIBLE_ROTATIONS is written in movesMade
+LABEL_SUFFIXES = {"": "", "'": "i", "2": "2"}
+
+# every move a compiled sequence can contain, as (move, label) pairs, where move is in face notation
+# (e.g. "R'" or "R2") and label is how it is recorded in movesMade. The first 18 are labelled in face
+# notation and the next 18 in colour notation, each in POSSIBLE_ROTATIONS order, so a move code is an
+# index into this tuple
+SEQUENCE_MOVES: tuple[tuple[str, str], ...] = tuple(
+    (move, move[0] + LABEL_SUFFIXES[move[1:]]) for move in POSSIBLE_ROTATIONS
+) + tuple((move, FACE_TO_COLOUR[move[0]] + LABEL_SUFFIXES[move[1:]]) for move in POSSIBLE_ROTATIONS)
+MOVE_CODES: dict[tuple[str, str], int] = {move: code for code, move in enumerate(SEQUENCE_MOVES)}
+COLOUR_CODE_OFFSET = len(POSSIBLE_ROTATIONS)
+
+
+@lru_cache(maxsize=4096)
+def compileSequence(sequence: str, useColours: bool = False) -> tuple[int, ...]:
+    """Parses a sequence of moves into move codes (indices into SEQUENCE_MOVES) which Cube.executeSequence
+    can execute without parsing it again. "'" or "i" after a letter turns that face anticlockwise, "2"
+    after it makes a half turn (a single move), any other number after it repeats the quarter turn, and
+    other characters are skipped. Results are cached, so compiling the same sequence again is a
+    dictionary lookup.
+
+    Args:
+        sequence (str): A string representing the sequence of moves, e.g. "RUR'U'" or "F2Di".
+        useColours (bool, optional): If True, the sequence is in colour notation (R, G, W, Y, B, O) instead
+                                     of face notation (R, L, U, D, F, B). Defaults to False.
+
+    Returns:
+        tuple[int, ...]: The code of each move in the sequence.
+    """
+    seq = sequence.replace(" ", "")
+    letterToFace = COLOUR_NOTATION if useColours else FACE_NOTATION
+
+    codes = []
+    i = 0
+    while i < len(seq):
+        ch = seq[i]
+        if ch not in letterToFace:
+            i += 1
+            continue
+
+        face = letterToFace[ch]
+        suffix = ""
+        repeats = 1
+        j = i + 1
+
+        if j < len(seq) and seq[j] in ("'", "i"):
+            suffix = "'"
+            j += 1
+
+        elif j < len(seq) and seq[j].isdigit():
+            numStr = ""
+            while j < len(seq) and seq[j].isdigit():
+                numStr += seq[j]
+                j += 1
+            if numStr == "2":
+                suffix = "2"
+            else:
+                repeats = max(1, int(numStr))
+
+        codes.extend([MOVE_CODES[(face + suffix, ch + LABEL_SUFFIXES[suffix])]] * repeats)
+
+        i = j
+
+    return tuple(codes)
+
+
+def sequenceMoves(codes: tuple[int, ...]) -> list[str]:
+    """Returns the moves of a compiled sequence in face notation.
+
+    Args:
+        codes (tuple[int, ...]): The compiled sequence.
+
+    Returns:
+        list[str]: The moves, e.g. ["R", "U'", "F2"].
+    """
+    return [SEQUENCE_MOVES[code][0] for code in codes]
+
+
+def relativeCodes(relativeMoveMap: dict[str, str]) -> tuple[int, ...]:
+    """Builds the table translating move codes in face notation to the colour notation codes of the same
+    moves made relative to an orientation of the cube. Codes already in colour notation are unchanged.
+
+    Args:
+        relativeMoveMap (dict[str, str]): The colour of the face in each direction (see Cube.calculateFaces).
+
+    Returns:
+        tuple[int, ...]: The translated code for each code.
+    """
+    table = []
+    for move, label in SEQUENCE_MOVES[:COLOUR_CODE_OFFSET]:
+        colour = relativeMoveMap[move[0]]
+        suffix = move[1:]
+        table.append(MOVE_CODES[(COLOUR_NOTATION[colour] + suffix, colour + label[1:])])
+    return tuple(table) + tuple(range(COLOUR_CODE_OFFSET, len(SEQUENCE_MOVES)))
@@ -0,0 +1,218 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from .cube_state import encodeState
+from .symmetry import INVERSE_SYMMETRIES, canonicalState, conjugateMoves
+
+# bumped whenever the solvers change in a way that makes stored solutions worth recomputing.
+# Together with the package version it is part of every key, so old entries are never used
+CACHE_VERSION = 1
+try:
+    SOLVER_VERSION = f"{version('rubiks-cube')}.{CACHE_VERSION}"
+except PackageNotFoundError:
+    SOLVER_VERSION = f"0.0.0.{CACHE_VERSION}"
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_DISK_ENTRIES = 1_000_000
+
+
+class SolutionCache:
+    """A cache of solutions, kept in memory with an optional sqlite file behind it. Solutions are
+    stored for the canonical state of each symmetry class (see symmetry.canonicalState), so a state
+    finds the solution of any of its up to 48 symmetric equivalents. In memory, the least recently
+    used entry is evicted when the cache is full. On disk, the oldest entries are deleted.
+    """
+
+    def __init__(
+        self,
+        maxEntries: int = DEFAULT_MAX_ENTRIES,
+        path: str | Path | None = None,
+        maxDiskEntries: int = DEFAULT_MAX_DISK_ENTRIES,
+    ) -> None:
+        """Initialises a SolutionCache.
+
+        Args:
+            maxEntries (int, optional): The most solutions kept in memory. Defaults to DEFAULT_MAX_ENTRIES.
+            path (str | Path | None, optional): A sqlite file solutions are also stored in, so they persist
+                                                between runs and can be shared between processes. Defaults
+                                                to None, which keeps solutions in memory only.
+            maxDiskEntries (int, optional): The most solutions kept in the file. Each process counts the
+                                            entries it adds, so the cap is approximate when several share a
+                                            file. Defaults to DEFAULT_MAX_DISK_ENTRIES.
+        """
+        self.maxEntries = max(1, maxEntries)
+        self.maxDiskEntries = max(1, maxDiskEntries)
+        self.__entries: OrderedDict[tuple[bytes, str], tuple[str, ...]] = OrderedDict()
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path = Path(path) if path is not None else None
+        self.__connection = None
+        self.__diskEntries = 0
+        # the connection may be used by whichever thread solves, one at a time
+        self.__lock = threading.Lock()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.__connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("PRAGMA synchronous=NORMAL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions "
+                "(state BLOB, method TEXT, moves TEXT, PRIMARY KEY (state, method))"
+            )
+            self.__connection.commit()
+            self.__diskEntries = self.__connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @staticmethod
+    def methodKey(method: str, maxLength: int = None) -> str:
+        """Builds the part of a key identifying the solver, e.g. "two_phase/22@1.0.0.1".
+
+        Args:
+            method (str): The solving method.
+            maxLength (int, optional): two_phase only - the maximum solution length. Defaults to None.
+
+        Returns:
+            str: The method key.
+        """
+        name = method if maxLength is None else f"{method}/{maxLength}"
+        return f"{name}@{SOLVER_VERSION}"
+
+    def lookup(self, state: bytes | str, method: str) -> list[str] | None:
+        """Looks up the solution of a state.
+
+        Args:
+            state (bytes | str): The state.
+            method (str): The method key (see methodKey).
+
+        Returns:
+            list[str] | None: The moves solving the state, or None if no solution is stored.
+        """
+        if isinstance(state, str):
+            state = encodeState(state)
+        canonical, symmetry = canonicalState(state)
+        key = (canonical, method)
+
+        moves = self.__entries.get(key)
+        if moves is not None:
+            self.__entries.move_to_end(key)
+            self.hits += 1
+        elif self.__connection is not None:
+            with self.__lock:
+                row = self.__connection.execute(
+                    "SELECT moves FROM solutions WHERE state = ? AND method = ?", key
+                ).fetchone()
+            if row is not None:
+                moves = tuple(row[0].split())
+                self.__remember(key, moves)
+                self.diskHits += 1
+
+        if moves is None:
+            self.misses += 1
+            return None
+
+        # the stored moves solve the canonical state, so they are mapped back to this state
+        return conjugateMoves(list(moves), INVERSE_SYMMETRIES[symmetry])
+
+    def store(self, state: bytes | str, method: str, moves: list[str]) -> None:
+        """Stores the solution of a state.
+
+        Args:
+            state (bytes | str): The state.
+            method (str): The method key (see methodKey).
+            moves (list[str]): The moves solving the state, in face notation.
+        """
+        if isinstance(state, str):
+            state = encodeState(state)
+        canonical, symmetry = canonicalState(state)
+        key = (canonical, method)
+        canonicalMoves = tuple(conjugateMoves(moves, symmetry))
+        self.__remember(key, canonicalMoves)
+
+        if self.__connection is not None:
+            with self.__lock:
+                inserted = self.__connection.execute(
+                    "INSERT OR IGNORE INTO solutions VALUES (?, ?, ?)", (*key, " ".join(canonicalMoves))
+                ).rowcount
+                self.__diskEntries += inserted
+                if self.__diskEntries > self.maxDiskEntries:
+                    excess = self.__diskEntries - self.maxDiskEntries
+                    self.__connection.execute(
+                        "DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY rowid LIMIT ?)",
+                        (excess,),
+                    )
+                    self.__diskEntries -= excess
+                self.__connection.commit()
+
+    def __remember(self, key: tuple[bytes, str], moves: tuple[str, ...]) -> None:
+        """Adds an entry to the in memory cache, evicting the least recently used one if it is full."""
+        self.__entries[key] = moves
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.maxEntries:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes every entry, including those on disk, and resets the statistics."""
+        self.__entries.clear()
+        if self.__connection is not None:
+            with self.__lock:
+                self.__connection.execute("DELETE FROM solutions")
+                self.__connection.commit()
+            self.__diskEntries = 0
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def close(self) -> None:
+        """Closes the sqlite file, if there is one. The in memory entries can still be used."""
+        if self.__connection is not None:
+            with self.__lock:
+                self.__connection.close()
+            self.__connection = None
+
+    def stats(self) -> dict:
+        """Returns the cache's statistics.
+
+        Returns:
+            dict: The number of entries in memory and on disk, the maximum entries, hits (from memory and
+                  from disk), misses, hit rate and evictions.
+        """
+        lookups = self.hits + self.diskHits + self.misses
+        return {
+            "entries": len(self.__entries),
+            "max_entries": self.maxEntries,
+            "disk_entries": self.__diskEntries,
+            "max_disk_entries": self.maxDiskEntries if self.path is not None else 0,
+            "hits": self.hits,
+            "disk_hits": self.diskHits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.diskHits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+_solutionCache: SolutionCache | None = None
+
+
+def getSolutionCache() -> SolutionCache | None:
+    """Returns the solution cache Cube.solve consults, or None if it is disabled (the default)."""
+    return _solutionCache
+
+
+def setSolutionCache(cache: SolutionCache | None) -> None:
+    """Replaces the solution cache Cube.solve consults.
+
+    Args:
+        cache (SolutionCache | None): The new cache, or None to disable it.
+    """
+    global _solutionCache
+    _solutionCache = cache
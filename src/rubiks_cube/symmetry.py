@@ -0,0 +1,203 @@
+import itertools
+from operator import itemgetter
+
+import numpy as np
+
+from .constants import POSSIBLE_ROTATIONS, SOLVED_MASK, STRING_ROTATION_MAPPINGS
+from .cube_state import composePermutations, encodeState
+
+CENTRE_INDICES = (4, 13, 22, 31, 40, 49)
+SOLVED_CENTRES = tuple(SOLVED_MASK[i] for i in CENTRE_INDICES)
+
+
+def _stickerGeometry() -> tuple[np.ndarray, np.ndarray]:
+    """Places every square of the cube in space, with x pointing to the right face, y to the top face
+    and z to the front face. Each square is given by the position of its piece (each coordinate -1, 0
+    or 1) and the outward normal of the face it is on. This layout reproduces STRING_ROTATION_MAPPINGS,
+    with a clockwise turn being a -90 degree rotation about the face's normal.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The (54, 3) positions and (54, 3) normals.
+    """
+    positions = []
+    normals = []
+    for index in range(54):
+        face, row, col = index // 9, index % 9 // 3, index % 3
+        if face == 0:
+            position, normal = (col - 1, 1, row - 1), (0, 1, 0)
+        elif face == 1:
+            position, normal = (-1, 1 - row, col - 1), (-1, 0, 0)
+        elif face == 2:
+            position, normal = (col - 1, 1 - row, 1), (0, 0, 1)
+        elif face == 3:
+            position, normal = (1, 1 - row, 1 - col), (1, 0, 0)
+        elif face == 4:
+            position, normal = (1 - col, 1 - row, -1), (0, 0, -1)
+        else:
+            position, normal = (col - 1, -1, 1 - row), (0, -1, 0)
+        positions.append(position)
+        normals.append(normal)
+
+    return np.array(positions), np.array(normals)
+
+
+def _symmetryMatrices() -> list[np.ndarray]:
+    """Builds the 48 symmetries of the cube as signed permutation matrices, the 24 rotations first
+    (starting with the identity) and then the 24 rotations combined with a reflection.
+
+    Returns:
+        list[np.ndarray]: The 3x3 integer matrices.
+    """
+    matrices = []
+    for axes in itertools.permutations(range(3)):
+        for signs in itertools.product((1, -1), repeat=3):
+            matrix = np.zeros((3, 3), dtype=int)
+            for row, (axis, sign) in enumerate(zip(axes, signs)):
+                matrix[row, axis] = sign
+            matrices.append(matrix)
+
+    # stable sort, so the identity stays first
+    return sorted(matrices, key=lambda matrix: round(np.linalg.det(matrix)) < 0)
+
+
+def _buildSymmetries() -> tuple[list[tuple[int, ...]], list[bytes], list[int]]:
+    """Builds the square permutation, colour relabelling and inverse of every symmetry.
+
+    Returns:
+        tuple[list[tuple[int, ...]], list[bytes], list[int]]: For each symmetry, the permutation (where
+                                                              new[i] = old[permutation[i]]), the
+                                                              bytes.translate table relabelling the
+                                                              colours, and the index of its inverse.
+    """
+    positions, normals = _stickerGeometry()
+    squares = {(tuple(p), tuple(n)): index for index, (p, n) in enumerate(zip(positions, normals))}
+    matrices = _symmetryMatrices()
+
+    permutations = []
+    translations = []
+    inverses = []
+    for matrix in matrices:
+        # the square moved to i by the symmetry is the one at the inverse image of i, and the
+        # inverse of an orthogonal matrix is its transpose
+        inverse = matrix.T
+        permutation = tuple(squares[(tuple(inverse @ p), tuple(inverse @ n))] for p, n in zip(positions, normals))
+        permutations.append(permutation)
+
+        # the centres move with the rest of the cube, so the colours are renamed to put each
+        # centre back to its usual colour
+        moved = [SOLVED_MASK[permutation[i]] for i in CENTRE_INDICES]
+        translations.append(bytes.maketrans("".join(moved).encode("ascii"), "".join(SOLVED_CENTRES).encode("ascii")))
+
+        inverses.append(next(index for index, other in enumerate(matrices) if (other == inverse).all()))
+
+    return permutations, translations, inverses
+
+
+def _buildMoveConjugates(permutations: list[tuple[int, ...]]) -> list[dict[str, str]]:
+    """Works out which move each move becomes under each symmetry, i.e. the move m' for which
+    transforming a state after the move m gives the same state as making m' after transforming it.
+
+    Args:
+        permutations (list[tuple[int, ...]]): The permutation of each symmetry.
+
+    Returns:
+        list[dict[str, str]]: For each symmetry, the move (in face notation) each move is conjugated to.
+    """
+    moves = {tuple(STRING_ROTATION_MAPPINGS[move]): move for move in POSSIBLE_ROTATIONS}
+    conjugates = []
+    for permutation in permutations:
+        inverse = [0] * 54
+        for i, source in enumerate(permutation):
+            inverse[source] = i
+        inverse = tuple(inverse)
+
+        # applying the move and then the symmetry equals applying the symmetry and then
+        # inverse * move * symmetry, which is another face turn
+        table = {}
+        for move in POSSIBLE_ROTATIONS:
+            moveThenSymmetry = composePermutations(tuple(STRING_ROTATION_MAPPINGS[move]), permutation)
+            table[move] = moves[composePermutations(inverse, moveThenSymmetry)]
+        conjugates.append(table)
+
+    return conjugates
+
+
+SYMMETRY_PERMUTATIONS, SYMMETRY_TRANSLATIONS, INVERSE_SYMMETRIES = _buildSymmetries()
+SYMMETRY_GATHERS = [itemgetter(*permutation) for permutation in SYMMETRY_PERMUTATIONS]
+MOVE_CONJUGATES = _buildMoveConjugates(SYMMETRY_PERMUTATIONS)
+
+NUM_SYMMETRIES = len(SYMMETRY_PERMUTATIONS)
+NUM_ROTATIONS = 24
+
+
+def transformState(state: bytes | str, symmetry: int) -> bytes:
+    """Applies a symmetry to a state: the whole cube is rotated (and reflected for symmetries 24 and
+    up), then the colours are renamed so the centres have their usual colours again. The result is
+    solvable exactly when the state is, with the solution changed by conjugateMoves. The renaming
+    assumes the state has the usual centres, as every state reached by face turns does.
+
+    Args:
+        state (bytes | str): The state to transform.
+        symmetry (int): The index of the symmetry, from 0 (the identity) to 47.
+
+    Returns:
+        bytes: The transformed state.
+    """
+    if isinstance(state, str):
+        state = encodeState(state)
+    return bytes(SYMMETRY_GATHERS[symmetry](state)).translate(SYMMETRY_TRANSLATIONS[symmetry])
+
+
+def canonicalState(state: bytes | str, rotationsOnly: bool = False) -> tuple[bytes, int]:
+    """Finds the representative of a state's symmetry class, the smallest of its transforms, so
+    caches can store one entry for up to 48 equivalent states.
+
+    Args:
+        state (bytes | str): The state.
+        rotationsOnly (bool, optional): If True, only the 24 rotations are used. Defaults to False.
+
+    Returns:
+        tuple[bytes, int]: The canonical state and the symmetry which transforms the state into it.
+    """
+    if isinstance(state, str):
+        state = encodeState(state)
+
+    best = state
+    bestSymmetry = 0
+    for symmetry in range(1, NUM_ROTATIONS if rotationsOnly else NUM_SYMMETRIES):
+        transformed = bytes(SYMMETRY_GATHERS[symmetry](state)).translate(SYMMETRY_TRANSLATIONS[symmetry])
+        if transformed < best:
+            best = transformed
+            bestSymmetry = symmetry
+
+    return best, bestSymmetry
+
+
+def conjugateMoves(moves: list[str], symmetry: int) -> list[str]:
+    """Converts moves made on a state into the moves which do the same thing to the state transformed by
+    a symmetry. To use a solution found for a canonical state on the original state, pass the inverse of
+    the symmetry canonicalState returned, i.e. INVERSE_SYMMETRIES[symmetry].
+
+    Args:
+        moves (list[str]): The moves in face notation, e.g. ["R", "Ui", "F'", "D2"].
+        symmetry (int): The index of the symmetry.
+
+    Returns:
+        list[str]: The conjugated moves, written in the same style as the originals.
+    """
+    table = MOVE_CONJUGATES[symmetry]
+    conjugated = []
+    for move in moves:
+        face, suffix = move[0], move[1:]
+        if suffix == "2":
+            conjugated.append(table[face][0] + "2")
+            continue
+
+        anticlockwise = suffix in ("'", "i")
+        result = table[face + "'" if anticlockwise else face]
+        if result.endswith("'"):
+            conjugated.append(result[0] + (suffix if anticlockwise else "i"))
+        else:
+            conjugated.append(result)
+
+    return conjugated
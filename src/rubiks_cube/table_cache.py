@@ -0,0 +1,228 @@
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+# Tables are stored one per file, as <cache dir>/<name>.table. Every file starts with a
+# 64 byte little-endian header, followed by the table's data in C order:
+#
+#   offset  size  field
+#   0       8     magic, b"RCTABLE\0"
+#   8       2     format version (FORMAT_VERSION), bumped if this layout changes
+#   10      2     header size in bytes (always 64)
+#   12      4     table version, bumped by a table's builder whenever its contents change
+#   16      8     numpy dtype string, e.g. b"<u2", null padded
+#   24      4     number of dimensions (at most 4)
+#   28      4     CRC32 checksum of the data
+#   32      32    shape, as 4 uint64 values (unused dimensions are 0)
+#
+# Files are loaded with mmap, so every process using the same cache directory shares one
+# copy of each table in memory. Files are written to a temporary file and then renamed,
+# so a process never sees a half written table.
+MAGIC = b"RCTABLE\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHI8sII4Q")
+HEADER_SIZE = HEADER.size
+MAX_DIMENSIONS = 4
+
+CACHE_DIR_ENV = "RUBIKS_CUBE_CACHE_DIR"
+
+_cacheDir: Path | None = None
+_registry: dict[str, tuple[int, Callable[[], np.ndarray]]] = {}
+_loaded: dict[str, np.ndarray] = {}
+
+
+class TableFormatError(Exception):
+    """Raised when a table file is not in the expected format, or is out of date."""
+
+
+def getCacheDir() -> Path:
+    """Returns the directory tables are cached in. This is the directory set with setCacheDir,
+    then the RUBIKS_CUBE_CACHE_DIR environment variable, then ~/.cache/rubiks_cube.
+
+    Returns:
+        Path: The cache directory.
+    """
+    if _cacheDir is not None:
+        return _cacheDir
+    return Path(os.environ.get(CACHE_DIR_ENV, Path.home() / ".cache" / "rubiks_cube"))
+
+
+def setCacheDir(path: str | Path | None) -> None:
+    """Sets the directory tables are cached in. Tables which have already been loaded are
+    unaffected. Passing None goes back to the default directory.
+
+    Args:
+        path (str | Path | None): The new cache directory.
+    """
+    global _cacheDir
+    _cacheDir = None if path is None else Path(path)
+
+
+def registerTable(name: str, version: int, builder: Callable[[], np.ndarray]) -> None:
+    """Registers a table so it can be loaded with getTable and prebuilt with buildAllTables.
+
+    Args:
+        name (str): The name of the table, also used as its file name.
+        version (int): The version of the table. Cached files with a different version are rebuilt.
+        builder (Callable[[], np.ndarray]): A function with no arguments which builds the table.
+    """
+    _registry[name] = (version, builder)
+
+
+def getRegisteredTables() -> list[str]:
+    return list(_registry)
+
+
+def getTable(name: str) -> np.ndarray:
+    """Returns a registered table. The table is loaded from the cache directory the first time
+    it is needed, and is built and saved there first if there is no valid cached copy.
+
+    Args:
+        name (str): The name of the table.
+
+    Raises:
+        KeyError: If no table with that name has been registered.
+
+    Returns:
+        np.ndarray: The (read only) table.
+    """
+    table = _loaded.get(name)
+    if table is None:
+        if name not in _registry:
+            raise KeyError(f"Unknown table: {name}")
+        version, builder = _registry[name]
+        table = loadOrBuildTable(getCacheDir() / f"{name}.table", version, builder)
+        _loaded[name] = table
+    return table
+
+
+def buildAllTables(force: bool = False) -> list[str]:
+    """Builds and caches every registered table which is not already cached.
+
+    Args:
+        force (bool, optional): If True, rebuilds every table even if a valid copy is cached. Defaults to False.
+
+    Returns:
+        list[str]: The names of the tables.
+    """
+    for name in _registry:
+        if force:
+            _loaded.pop(name, None)
+            version, builder = _registry[name]
+            saveTable(getCacheDir() / f"{name}.table", builder(), version)
+        getTable(name)
+    return getRegisteredTables()
+
+
+def loadOrBuildTable(path: Path, version: int, builder: Callable[[], np.ndarray]) -> np.ndarray:
+    """Loads a table file, or builds the table and saves it there if the file is missing,
+    corrupted or out of date.
+
+    Args:
+        path (Path): The table file.
+        version (int): The expected version of the table.
+        builder (Callable[[], np.ndarray]): A function with no arguments which builds the table.
+
+    Returns:
+        np.ndarray: The table.
+    """
+    try:
+        return loadTable(path, version)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, TableFormatError) as e:
+        logging.warning(f"Rebuilding table {path.name}: {e}")
+
+    logging.info(f"Building table {path.name}")
+    table = builder()
+    try:
+        saveTable(path, table, version)
+        return loadTable(path, version)
+    except OSError as e:
+        logging.warning(f"Could not cache table {path.name}: {e}")
+        return table
+
+
+def saveTable(path: Path, table: np.ndarray, version: int) -> None:
+    """Saves a table to a file in the table format.
+
+    Args:
+        path (Path): The file to save to.
+        table (np.ndarray): The table to save.
+        version (int): The version of the table.
+    """
+    if table.ndim > MAX_DIMENSIONS:
+        raise ValueError(f"Tables can have at most {MAX_DIMENSIONS} dimensions.")
+
+    data = np.ascontiguousarray(table).tobytes()
+    shape = list(table.shape) + [0] * (MAX_DIMENSIONS - table.ndim)
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        HEADER_SIZE,
+        version,
+        table.dtype.str.encode("ascii"),
+        table.ndim,
+        zlib.crc32(data),
+        *shape,
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tempPath = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(data)
+        # mkstemp creates files only the owner can read, but the cache may be shared between users
+        os.chmod(tempPath, 0o644)
+        os.replace(tempPath, path)
+    except BaseException:
+        os.unlink(tempPath)
+        raise
+
+
+def loadTable(path: Path, version: int = None, verify: bool = True) -> np.ndarray:
+    """Memory maps a table file.
+
+    Args:
+        path (Path): The file to load.
+        version (int, optional): The expected version of the table. If None, any version is accepted.
+        verify (bool, optional): If True, checks the data against the checksum. Defaults to True.
+
+    Raises:
+        TableFormatError: If the file is not a valid table file, is out of date or is corrupted.
+
+    Returns:
+        np.ndarray: The (read only) table.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER_SIZE:
+            raise TableFormatError("File is too small to be a table.")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, formatVersion, headerSize, tableVersion, dtype, ndim, checksum, *shape = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise TableFormatError("File is not a table.")
+    if formatVersion != FORMAT_VERSION or headerSize != HEADER_SIZE:
+        raise TableFormatError(f"Unsupported table format version {formatVersion}.")
+    if version is not None and tableVersion != version:
+        raise TableFormatError(f"Table version {tableVersion} does not match version {version}.")
+
+    dtype = np.dtype(dtype.rstrip(b"\0").decode("ascii"))
+    shape = tuple(shape[:ndim])
+    size = int(np.prod(shape)) * dtype.itemsize
+    if len(mapped) != HEADER_SIZE + size:
+        raise TableFormatError("Table file has the wrong size.")
+
+    data = memoryview(mapped)[HEADER_SIZE:]
+    if verify and zlib.crc32(data) != checksum:
+        raise TableFormatError("Table checksum does not match.")
+
+    return np.frombuffer(data, dtype=dtype).reshape(shape)
@@ -0,0 +1,309 @@
+import logging
+import time
+from functools import lru_cache
+from itertools import permutations
+from math import factorial
+
+import numpy as np
+
+from .coords import (
+    MOVE_CUBES,
+    MOVES,
+    NUM_MOVES,
+    NUM_SLICES,
+    SOLVED_SLICE,
+    CubieCube,
+    _rankPermutations,
+    getMoveTable,
+    permutationRank,
+)
+from .table_cache import getTable, registerTable
+
+# phase 1 takes the cube into the subgroup G1 = <U, D, R2, L2, F2, B2>, where every
+# corner and edge is oriented and the middle layer edges are in the middle layer.
+# Phase 2 then solves the cube using only the moves which keep it inside G1
+PHASE2_MOVES = [MOVES.index(move) for move in ["U", "U2", "U'", "R2", "F2", "D", "D2", "D'", "L2", "B2"]]
+NUM_PHASE2_MOVES = len(PHASE2_MOVES)
+NUM_UD_EDGE_PERMS = factorial(8)
+NUM_SLICE_PERMS = factorial(4)
+
+# longer phase 2 searches are rarely worth it, a longer phase 1 solution followed
+# by a short phase 2 is found much faster and is usually just as short overall
+PHASE2_MAX_DEPTH = 12
+
+# any cube can be solved in 12 phase 1 moves followed by 18 phase 2 moves
+MAX_SOLUTION_LENGTH = 30
+
+# bump the version of a table whenever the way it is built changes, so cached copies are rebuilt
+TABLE_VERSION = 1
+
+
+class SearchTimeout(Exception):
+    """Raised internally to stop the search once the time limit has been reached."""
+
+
+def _buildUDEdgePermMoveTable() -> np.ndarray:
+    perms = np.array(list(permutations(range(8))), dtype=np.int8)
+    table = np.zeros((NUM_UD_EDGE_PERMS, NUM_PHASE2_MOVES), dtype=np.uint16)
+    for index, move in enumerate(PHASE2_MOVES):
+        table[:, index] = _rankPermutations(perms[:, MOVE_CUBES[move].ep[:8]])
+    return table
+
+
+def _buildSlicePermMoveTable() -> np.ndarray:
+    perms = np.array(list(permutations(range(4))), dtype=np.int8)
+    table = np.zeros((NUM_SLICE_PERMS, NUM_PHASE2_MOVES), dtype=np.uint16)
+    for index, move in enumerate(PHASE2_MOVES):
+        table[:, index] = _rankPermutations(perms[:, [edge - 8 for edge in MOVE_CUBES[move].ep[8:]]])
+    return table
+
+
+def _buildPruningTable(moveTable1: np.ndarray, moveTable2: np.ndarray, goal: int) -> np.ndarray:
+    """Builds a table of the number of moves needed to reach the goal from every combination
+    of two coordinates, using a breadth first search over all of them at once.
+
+    Args:
+        moveTable1 (np.ndarray): The move table of the first coordinate.
+        moveTable2 (np.ndarray): The move table of the second coordinate.
+        goal (int): The combined index (first * size of second + second) of the goal.
+
+    Returns:
+        np.ndarray: The distance to the goal for each combined index.
+    """
+    size2 = moveTable2.shape[0]
+    distances = np.full(moveTable1.shape[0] * size2, -1, dtype=np.int8)
+    distances[goal] = 0
+
+    depth = 0
+    frontier = np.array([goal])
+    while len(frontier) > 0:
+        coord1, coord2 = np.divmod(frontier, size2)
+        neighbours = (moveTable1[coord1].astype(np.int64) * size2 + moveTable2[coord2]).ravel()
+        neighbours = np.unique(neighbours[distances[neighbours] == -1])
+        depth += 1
+        distances[neighbours] = depth
+        frontier = neighbours
+
+    return distances
+
+
+def _buildCornerPermPhase2MoveTable() -> np.ndarray:
+    return np.ascontiguousarray(getMoveTable("corner_perm")[:, PHASE2_MOVES])
+
+
+TABLE_BUILDERS = {
+    "two_phase_ud_edge_perm_move": _buildUDEdgePermMoveTable,
+    "two_phase_slice_perm_move": _buildSlicePermMoveTable,
+    "two_phase_corner_perm_move": _buildCornerPermPhase2MoveTable,
+    "two_phase_twist_slice_prune": lambda: _buildPruningTable(
+        getMoveTable("twist"), getMoveTable("slice"), SOLVED_SLICE
+    ),
+    "two_phase_flip_slice_prune": lambda: _buildPruningTable(getMoveTable("flip"), getMoveTable("slice"), SOLVED_SLICE),
+    "two_phase_corner_slice_prune": lambda: _buildPruningTable(
+        getTable("two_phase_corner_perm_move"), getTable("two_phase_slice_perm_move"), 0
+    ),
+    "two_phase_edge_slice_prune": lambda: _buildPruningTable(
+        getTable("two_phase_ud_edge_perm_move"), getTable("two_phase_slice_perm_move"), 0
+    ),
+}
+
+for _name, _builder in TABLE_BUILDERS.items():
+    registerTable(_name, TABLE_VERSION, _builder)
+
+
+def _flat(table: np.ndarray) -> memoryview:
+    """Flattens a table into a memoryview, which is much faster than numpy to index one item at a time."""
+    return memoryview(np.ascontiguousarray(table).ravel())
+
+
+class TwoPhaseSolver:
+    def __init__(self) -> None:
+        """Initialises the solver, loading (or building and caching) all the tables it needs."""
+        self.twistMove = _flat(getMoveTable("twist"))
+        self.flipMove = _flat(getMoveTable("flip"))
+        self.sliceMove = _flat(getMoveTable("slice"))
+        self.cornerMove = _flat(getTable("two_phase_corner_perm_move"))
+        self.udEdgeMove = _flat(getTable("two_phase_ud_edge_perm_move"))
+        self.slicePermMove = _flat(getTable("two_phase_slice_perm_move"))
+
+        self.twistSlicePrune = _flat(getTable("two_phase_twist_slice_prune"))
+        self.flipSlicePrune = _flat(getTable("two_phase_flip_slice_prune"))
+        self.cornerSlicePrune = _flat(getTable("two_phase_corner_slice_prune"))
+        self.edgeSlicePrune = _flat(getTable("two_phase_edge_slice_prune"))
+
+    def solve(self, state: str, maxLength: int = 22, timeout: float = 1.0) -> list[str]:
+        """Finds a solution for a cube using Kociemba's two phase algorithm. The search stops
+        as soon as it finds a solution of at most maxLength moves, or when the timeout is
+        reached, in which case the shortest solution found so far is returned.
+
+        Args:
+            state (str): A string of length 54 representing the cube's state.
+            maxLength (int, optional): The solution length to stop searching at. Defaults to 22.
+            timeout (float, optional): The time in seconds after which the best solution found so
+                                       far is returned. Defaults to 1.0.
+
+        Raises:
+            ValueError: If the cube cannot be solved.
+
+        Returns:
+            list[str]: The solution in half turn metric, e.g. ["R", "U2", "F'"].
+        """
+        cube = CubieCube.fromString(state)
+        if not cube.isValid():
+            raise ValueError("The cube is not solvable.")
+
+        self.cube = cube
+        self.targetLength = maxLength
+        self.deadline = time.perf_counter() + timeout
+        self.bestSolution = None
+        self.phase1Moves = []
+        self.phase2Moves = []
+        self.nodes = 0
+
+        twist, flip, slc = cube.getTwist(), cube.getFlip(), cube.getSlice()
+        try:
+            for depth in range(self.__phase1Heuristic(twist, flip, slc), MAX_SOLUTION_LENGTH + 1):
+                if self.bestSolution is not None and depth >= len(self.bestSolution):
+                    break
+                if self.__phase1(twist, flip, slc, depth, -1):
+                    break
+        except SearchTimeout:
+            pass
+
+        return [MOVES[move] for move in self.bestSolution]
+
+    def __phase1Heuristic(self, twist: int, flip: int, slc: int) -> int:
+        return max(self.twistSlicePrune[twist * NUM_SLICES + slc], self.flipSlicePrune[flip * NUM_SLICES + slc])
+
+    def __phase1(self, twist: int, flip: int, slc: int, togo: int, lastFace: int) -> bool:
+        """Searches for phase 1 solutions of exactly togo more moves, starting phase 2 from each one.
+
+        Returns:
+            bool: True if a solution short enough to stop the search was found.
+        """
+        if togo == 0:
+            # a phase 1 solution ending in a phase 2 move was already found one move earlier
+            if self.phase1Moves and self.phase1Moves[-1] in PHASE2_MOVES:
+                return False
+            return self.__startPhase2()
+
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and self.bestSolution is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        for move in range(NUM_MOVES):
+            face = move // 3
+            if face == lastFace or face == lastFace - 3:
+                continue
+
+            newTwist = self.twistMove[twist * NUM_MOVES + move]
+            newFlip = self.flipMove[flip * NUM_MOVES + move]
+            newSlice = self.sliceMove[slc * NUM_MOVES + move]
+            if self.__phase1Heuristic(newTwist, newFlip, newSlice) >= togo:
+                continue
+
+            self.phase1Moves.append(move)
+            found = self.__phase1(newTwist, newFlip, newSlice, togo - 1, face)
+            self.phase1Moves.pop()
+            if found:
+                return True
+
+        return False
+
+    def __startPhase2(self) -> bool:
+        """Runs phase 2 from the end of the current phase 1 solution.
+
+        Returns:
+            bool: True if a solution short enough to stop the search was found.
+        """
+        if self.bestSolution is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        bestLength = MAX_SOLUTION_LENGTH + 1 if self.bestSolution is None else len(self.bestSolution)
+        maxDepth = min(bestLength - 1 - len(self.phase1Moves), PHASE2_MAX_DEPTH)
+        if maxDepth < 0:
+            return False
+
+        cube = self.cube
+        for move in self.phase1Moves:
+            cube = cube.multiply(MOVE_CUBES[move])
+
+        corners = cube.getCornerPerm()
+        udEdges = permutationRank(cube.ep[:8])
+        slicePerm = permutationRank([edge - 8 for edge in cube.ep[8:]])
+        lastFace = self.phase1Moves[-1] // 3 if self.phase1Moves else -1
+
+        for depth in range(self.__phase2Heuristic(corners, udEdges, slicePerm), maxDepth + 1):
+            if self.__phase2(corners, udEdges, slicePerm, depth, lastFace):
+                self.bestSolution = self.phase1Moves + self.phase2Moves[::-1]
+                self.phase2Moves = []
+                logging.info(f"Found two phase solution of length {len(self.bestSolution)}")
+                return len(self.bestSolution) <= self.targetLength
+
+        return False
+
+    def __phase2Heuristic(self, corners: int, udEdges: int, slicePerm: int) -> int:
+        return max(
+            self.cornerSlicePrune[corners * NUM_SLICE_PERMS + slicePerm],
+            self.edgeSlicePrune[udEdges * NUM_SLICE_PERMS + slicePerm],
+        )
+
+    def __phase2(self, corners: int, udEdges: int, slicePerm: int, togo: int, lastFace: int) -> bool:
+        """Searches for phase 2 solutions of exactly togo more moves. The moves of a solution
+        are left in self.phase2Moves in reverse order.
+
+        Returns:
+            bool: True if a solution was found.
+        """
+        if togo == 0:
+            return True
+
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and self.bestSolution is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        for index in range(NUM_PHASE2_MOVES):
+            move = PHASE2_MOVES[index]
+            face = move // 3
+            if face == lastFace or face == lastFace - 3:
+                continue
+
+            newCorners = self.cornerMove[corners * NUM_PHASE2_MOVES + index]
+            newSlicePerm = self.slicePermMove[slicePerm * NUM_PHASE2_MOVES + index]
+            if self.cornerSlicePrune[newCorners * NUM_SLICE_PERMS + newSlicePerm] >= togo:
+                continue
+
+            newUDEdges = self.udEdgeMove[udEdges * NUM_PHASE2_MOVES + index]
+            if self.edgeSlicePrune[newUDEdges * NUM_SLICE_PERMS + newSlicePerm] >= togo:
+                continue
+
+            if self.__phase2(newCorners, newUDEdges, newSlicePerm, togo - 1, face):
+                self.phase2Moves.append(move)
+                return True
+
+        return False
+
+
+@lru_cache(maxsize=None)
+def getSolver() -> TwoPhaseSolver:
+    """Returns the shared solver, so the tables are only loaded once per process.
+
+    Returns:
+        TwoPhaseSolver: The solver.
+    """
+    return TwoPhaseSolver()
+
+
+def solveTwoPhase(state: str, maxLength: int = 22, timeout: float = 1.0) -> list[str]:
+    """Solves a cube using the two phase algorithm.
+
+    Args:
+        state (str): A string of length 54 representing the cube's state.
+        maxLength (int, optional): The solution length to stop searching at. Defaults to 22.
+        timeout (float, optional): The time in seconds after which the best solution found so
+                                   far is returned. Defaults to 1.0.
+
+    Returns:
+        list[str]: The solution in half turn metric, e.g. ["R", "U2", "F'"].
+    """
+    return getSolver().solve(state, maxLength, timeout)
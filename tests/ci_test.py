@@ -1,30 +1,66 @@
+import argparse
 import queue
 import sys
+from pathlib import Path
 from threading import Thread
 
-from rubiks_cube import Cube
+from rubiks_cube.regression import (
+    DEFAULT_TOLERANCE,
+    compareResults,
+    loadFaceImages,
+    loadResults,
+    printColourComparison,
+    printComparison,
+    runRegressionBenchmark,
+    saveResults,
+)
 
 TIMEOUT = 45  # seconds
+# the settings the baseline was run with. Timings and throughput are only comparable between runs
+# with the same number of workers, and the move counts between runs of the same solves
+WORKERS = 1
+SOLVES = 2500
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
 
 
-def run_analysis(q: queue.Queue) -> None:
-    """Runs the cube analysis in a separate thread and puts the result in the queue.
+def run_analysis(q: queue.Queue, args: argparse.Namespace) -> None:
+    """Runs the benchmarks in a separate thread and puts the result in the queue.
 
     Args:
         q (queue.Queue): The queue to put the result in.
+        args (argparse.Namespace): The command line arguments.
     """
     try:
-        cube = Cube()
-        results = cube.analyseSolves(1000, displayAllTimes=False, displayStats=True)
+        images = loadFaceImages(args.images) if args.images else None
+        results = runRegressionBenchmark(SOLVES, workers=WORKERS, seed=args.seed, images=images)
         q.put(results)
     except Exception as e:
         q.put(e)
 
 
+def parseTolerances(values: list[str]) -> dict[str, float]:
+    """Parses metric=tolerance pairs from the command line."""
+    tolerances = {}
+    for value in values:
+        metric, tolerance = value.split("=")
+        tolerances[metric] = float(tolerance)
+    return tolerances
+
+
 def main() -> None:
-    """Main function to run the cube analysis with a timeout."""
+    """Main function to run the benchmarks with a timeout and check them against the baseline."""
+    parser = argparse.ArgumentParser(description="Solver and scanner benchmarks with regression checks.")
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="baseline results to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="default relative tolerance")
+    parser.add_argument("--metric-tolerance", action="append", default=[], help="METRIC=TOLERANCE for one metric")
+    parser.add_argument("--images", help="directory of recorded face images for the scanner benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the scrambles and inputs")
+    args = parser.parse_args()
+
     q = queue.Queue()
-    thread = Thread(target=run_analysis, args=(q,))
+    thread = Thread(target=run_analysis, args=(q, args))
     thread.daemon = True
     thread.start()
     thread.join(TIMEOUT)
@@ -42,6 +78,34 @@ def main() -> None:
     except queue.Empty:
         raise RuntimeError("Analysis thread finished without returning a result")
 
+    print(f"Solves: {result['settings']['solves']} ({result['settings']['workers']} workers)")
+    print(f"Throughput: {round(result['cpu_throughput'], 1)} solves/CPU second")
+    print(f"Calibration: {round(result['calibration'] * 1000, 2)} ms")
+    printColourComparison(result["colour_methods"])
+
+    if args.output:
+        saveResults(result, args.output)
+    if args.update_baseline:
+        saveResults(result, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return
+    if not Path(args.baseline).exists():
+        print(f"No baseline at {args.baseline}, skipping the regression check.")
+        return
+
+    try:
+        rows = compareResults(
+            result, loadResults(args.baseline), parseTolerances(args.metric_tolerance), args.tolerance
+        )
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    printComparison(rows)
+    regressed = [row["metric"] for row in rows if row["regressed"]]
+    if regressed:
+        print(f"Performance regressed: {', '.join(regressed)}")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
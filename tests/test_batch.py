@@ -0,0 +1,77 @@
+import random
+import unittest
+
+from rubiks_cube.batch import solveMany, solveState
+from rubiks_cube.cube import BEGINNER_STAGES, Cube
+from rubiks_cube.solution_cache import SolutionCache, setSolutionCache
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        random.seed(11)
+        cube = Cube()
+        self.states = []
+        for _ in range(10):
+            cube.randomise()
+            self.states.append(str(cube))
+
+    def checkResult(self, result: dict) -> None:
+        self.assertIsNone(result["error"])
+        cube = Cube(result["state"])
+        cube.executeSequence("".join(result["moves"]))
+        self.assertTrue(cube.isSolved)
+
+    def test_solveState(self):
+        result = solveState(self.states[0])
+        self.checkResult(result)
+        self.assertEqual(list(result["timings"]), list(BEGINNER_STAGES))
+        self.assertAlmostEqual(result["total_time"], sum(result["timings"].values()))
+
+        result = solveState(self.states[0], method="two_phase")
+        self.checkResult(result)
+        self.assertEqual(list(result["timings"]), ["two_phase"])
+
+        result = solveState("W" * 54)
+        self.assertIsNotNone(result["error"])
+        self.assertIsNone(result["moves"])
+
+    def test_solveStateCache(self):
+        cache = SolutionCache()
+        setSolutionCache(cache)
+        try:
+            first, second = solveMany(self.states[:1] * 2, workers=1)
+        finally:
+            setSolutionCache(None)
+        # the second solve goes through Cube.solve to the cache
+        self.assertEqual(list(first["timings"]), list(BEGINNER_STAGES))
+        self.assertEqual(list(second["timings"]), ["solution_cache"])
+        self.assertEqual(second["moves"], first["moves"])
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_solveManyOrdered(self):
+        for workers in (1, 2):
+            results = list(solveMany(self.states, workers=workers, chunkSize=3))
+            self.assertEqual([result["index"] for result in results], list(range(len(self.states))))
+            self.assertEqual([result["state"] for result in results], self.states)
+            for result in results:
+                self.checkResult(result)
+
+    def test_solveManyUnordered(self):
+        states = self.states + ["W" * 54]
+        results = list(solveMany(states, workers=2, chunkSize=2, ordered=False, method="two_phase"))
+        self.assertEqual(sorted(result["index"] for result in results), list(range(len(states))))
+        for result in results:
+            if result["index"] == len(self.states):
+                self.assertIsNotNone(result["error"])
+            else:
+                self.checkResult(result)
+
+    def test_invalidArguments(self):
+        with self.assertRaises(ValueError):
+            next(solveMany(self.states, method="unknown"))
+        with self.assertRaises(ValueError):
+            next(solveMany(self.states, workers=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
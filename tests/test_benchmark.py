@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from rubiks_cube.benchmark import runBenchmark, summariseMoves, summariseTimes
+from rubiks_cube.cube import BEGINNER_STAGES, Cube
+from rubiks_cube.solution_cache import SolutionCache, setSolutionCache
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_runBenchmark(self):
+        results = runBenchmark(120, workers=1, seed=3)
+        self.assertEqual(results["solves"], 120)
+        self.assertEqual(list(results["stages"]), list(BEGINNER_STAGES))
+        self.assertEqual(len(results["raw"]["total"]), 120)
+        self.assertEqual(sum(results["moves"]["histogram"].values()), 120)
+        self.assertGreater(results["throughput"], 0)
+        self.assertGreater(results["cpu_throughput"], 0)
+
+        total = results["total"]
+        self.assertTrue(total["p50"] <= total["p90"] <= total["p99"] <= total["max"])
+        # every stage of every solve is timed through Cube.solve
+        self.assertTrue(all((results["raw"][stage] > 0).all() for stage in BEGINNER_STAGES))
+
+        # the scrambles only depend on the seed, so the same solves are done with any number of workers
+        parallel = runBenchmark(120, workers=2, seed=3)
+        self.assertTrue(np.array_equal(results["raw"]["moves"], parallel["raw"]["moves"]))
+        other = runBenchmark(120, workers=1, seed=4)
+        self.assertFalse(np.array_equal(results["raw"]["moves"], other["raw"]["moves"]))
+
+    def test_runBenchmarkCache(self):
+        cache = SolutionCache()
+        setSolutionCache(cache)
+        try:
+            first = runBenchmark(20, workers=1, seed=3)
+            second = runBenchmark(20, workers=1, seed=3)
+        finally:
+            setSolutionCache(None)
+        # the same scrambles are solved again rather than found in the cache
+        self.assertEqual(len(cache), 0)
+        self.assertTrue(np.array_equal(first["raw"]["moves"], second["raw"]["moves"]))
+        self.assertTrue((second["raw"]["solveCross"] > 0).all())
+
+    def test_summaries(self):
+        summary = summariseTimes(np.array([1_000_000, 2_000_000, 3_000_000], dtype=np.int64))
+        self.assertAlmostEqual(summary["mean"], 0.002)
+        self.assertAlmostEqual(summary["p50"], 0.002)
+        self.assertAlmostEqual(summary["max"], 0.003)
+
+        moves = summariseMoves(np.array([10, 12, 10]))
+        self.assertEqual(moves["histogram"], {10: 2, 12: 1})
+        self.assertEqual((moves["min"], moves["max"]), (10, 12))
+
+    def test_analyseSolves(self):
+        results = Cube().analyseSolves(5, displayAllTimes=False, displayStats=False)
+        stageTimes = [results[f"avg_{name}_time"] for name in ("cross", "corners", "middles", "yellow_cross")]
+        stageTimes += [results[f"avg_{name}_time"] for name in ("yellow_edges", "yellow_corners", "final")]
+        self.assertAlmostEqual(sum(stageTimes), results["avg_time"], places=3)
+        self.assertGreaterEqual(results["max_yellow_edges_time"], results["avg_yellow_edges_time"])
+        self.assertGreater(results["max_yellow_corners_time"], 0)
+        self.assertEqual(results["avg_moves_htm"], results["avg_moves_optimised"])
+        self.assertGreater(results["avg_moves_qtm"], results["avg_moves_htm"])
+        self.assertEqual(results["avg_moves_stm"], results["avg_moves_htm"])
+
+
+if __name__ == "__main__":
+    unittest.main()
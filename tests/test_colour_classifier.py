@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from rubiks_cube.colour_classifier import COLOUR_SPACES, ColourClassifier, convertColours, getClassifier
+from rubiks_cube.constants import SCAN_COLOURS
+from rubiks_cube.scanner_utils import COLOUR_METHODS, distance, extractColours, getClosestColourName
+
+
+class TestColourClassifier(unittest.TestCase):
+    def setUp(self):
+        self.palette = np.array([rgb for _, rgb in SCAN_COLOURS], dtype=np.float32)
+        self.names = [name for name, _ in SCAN_COLOURS]
+
+    def test_classify(self):
+        for space in COLOUR_SPACES:
+            classifier = ColourClassifier(SCAN_COLOURS, space, lutBins=None)
+            self.assertEqual(classifier.classifyNames(self.palette), self.names)
+            # any shape of array can be classified at once
+            self.assertEqual(classifier.classify(self.palette.reshape(2, 3, 3)).shape, (2, 3))
+
+        # a palette from CubeCalibrator.getAverages
+        classifier = ColourClassifier(dict(SCAN_COLOURS))
+        self.assertEqual(classifier.names, tuple(self.names))
+        self.assertEqual(classifier.classifyNames([[120, 30, 25], [250, 250, 245]]), ["Red", "White"])
+
+    def test_defaultSpace(self):
+        # the scanner has always matched colours by their distance in RGB, which CIELAB disagrees with here
+        colour = [186, 161, 139]
+        closest = min(SCAN_COLOURS, key=lambda entry: distance(*colour, *entry[1]))[0]
+        self.assertEqual(closest, "Orange")
+        self.assertEqual(getClosestColourName(colour, SCAN_COLOURS), closest)
+        self.assertEqual(getClosestColourName(colour, SCAN_COLOURS, "lab"), "White")
+
+        image = np.full((90, 90, 3), colour[::-1], dtype=np.uint8)
+        for method in COLOUR_METHODS:
+            self.assertEqual(extractColours(image, SCAN_COLOURS, method), [closest] * 9)
+            self.assertEqual(extractColours(image, SCAN_COLOURS, method, "lab"), ["White"] * 9)
+
+    def test_convertColours(self):
+        lab = convertColours(np.array([[255, 255, 255], [0, 0, 0]]), "lab")
+        self.assertTrue(np.allclose(lab, [[100, 0, 0], [0, 0, 0]], atol=0.1))
+        hsv = convertColours(np.array([[128, 128, 128], [255, 0, 0]]), "hsv")
+        self.assertTrue(np.allclose(hsv[0, :2], 0))
+        self.assertTrue(np.allclose(hsv[1], [100, 0, 100], atol=0.1))
+
+    def test_lookupTable(self):
+        classifier = ColourClassifier(SCAN_COLOURS)
+        self.assertEqual(classifier.lut.shape, (32, 32, 32))
+
+        rng = np.random.default_rng(23)
+        image = rng.integers(0, 256, size=(60, 80, 3), dtype=np.uint8)
+        exact = ColourClassifier(SCAN_COLOURS, lutBins=None).classifyImage(image)
+        self.assertTrue(np.array_equal(exact, classifier.classify(image[..., ::-1])))
+        # quantising only changes colours close to the boundary between two classes
+        self.assertGreater((classifier.classifyImage(image) == exact).mean(), 0.95)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ColourClassifier([])
+        with self.assertRaises(ValueError):
+            ColourClassifier(SCAN_COLOURS, "xyz")
+        with self.assertRaises(ValueError):
+            ColourClassifier(SCAN_COLOURS, lutBins=30)
+
+    def test_getClassifier(self):
+        classifier = getClassifier(SCAN_COLOURS)
+        self.assertIs(getClassifier(list(SCAN_COLOURS)), classifier)
+        self.assertIs(getClassifier(classifier), classifier)
+        self.assertIsNot(getClassifier(SCAN_COLOURS, "hsv"), classifier)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from rubiks_cube.constants import SOLVED_MASK
+from rubiks_cube.coords import MOVES, CubieCube, getMoveTable, packState
+from rubiks_cube.cube import Cube
+
+
+class TestCoords(unittest.TestCase):
+    def test_solved(self):
+        cube = CubieCube.fromString(SOLVED_MASK)
+        self.assertEqual(cube, CubieCube())
+        self.assertEqual(cube.getCoordinates(), (0, 0, 0, 0))
+        self.assertEqual(cube.toString(), SOLVED_MASK)
+
+    def test_roundTrip(self):
+        for _ in range(20):
+            cube = Cube()
+            cube.randomise()
+            cubie = CubieCube.fromCube(cube)
+            self.assertTrue(cubie.isValid())
+            self.assertEqual(cubie.toString(), str(cube))
+            self.assertEqual(CubieCube.unpack(cubie.pack()), cubie)
+
+    def test_invalidString(self):
+        with self.assertRaises(ValueError):
+            CubieCube.fromString("W" * 54)
+
+    def test_moves(self):
+        cube = Cube()
+        cube.randomise()
+        cubie = CubieCube.fromCube(cube)
+
+        for move in ["U", "D'", "F", "B'", "R", "L'"]:
+            cube.executeSequence(move)
+            cubie = cubie.applyMove(move)
+            self.assertEqual(cubie.toString(), str(cube))
+
+        self.assertEqual(packState(str(cube)), cubie.pack())
+
+    def test_moveTables(self):
+        twistTable = getMoveTable("twist")
+        flipTable = getMoveTable("flip")
+        sliceTable = getMoveTable("slice")
+        cornerTable = getMoveTable("corner_perm")
+
+        cube = Cube()
+        cube.randomise()
+        cubie = CubieCube.fromCube(cube)
+        for index, move in enumerate(MOVES):
+            moved = cubie.applyMove(move)
+            self.assertEqual(twistTable[cubie.getTwist(), index], moved.getTwist())
+            self.assertEqual(flipTable[cubie.getFlip(), index], moved.getFlip())
+            self.assertEqual(sliceTable[cubie.getSlice(), index], moved.getSlice())
+            self.assertEqual(cornerTable[cubie.getCornerPerm(), index], moved.getCornerPerm())
+
+
+if __name__ == "__main__":
+    unittest.main()
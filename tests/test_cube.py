@@ -1,7 +1,10 @@
+import os
+import subprocess
+import sys
 import unittest
 
-from rubiks_cube.constants import SOLVED_MASK
-from rubiks_cube.cube import Cube
+from rubiks_cube.constants import RELATIVE_FACE_MAPPING, SOLVED_MASK
+from rubiks_cube.cube import BEGINNER_STAGES, Cube
 
 
 class TestCubeNonSolver(unittest.TestCase):
@@ -20,12 +23,43 @@ class TestCubeNonSolver(unittest.TestCase):
             r = repr(cube)
             self.assertTrue(r == f"Cube('{str(cube)}')")
 
+    def test_strCache(self):
+        cube = Cube()
+        self.assertIs(str(cube), str(cube))
+        cube.executeSequence("R")
+        self.assertNotEqual(str(cube), SOLVED_MASK)
+        cube.executeSequence("R'")
+        self.assertEqual(str(cube), SOLVED_MASK)
+
+    def test_eqAndHash(self):
+        cube1 = Cube()
+        cube2 = Cube()
+        self.assertEqual(cube1, cube2)
+        self.assertEqual(hash(cube1), hash(cube2))
+        self.assertNotEqual(cube1, SOLVED_MASK)
+
+        cube1.executeSequence("RU")
+        self.assertNotEqual(cube1, cube2)
+        cube2.executeSequence("RU")
+        self.assertEqual(len({cube1, cube2, Cube()}), 2)
+
     def test_getitem(self):
         cube = Cube()
         for i in range(6):
             face = cube[i]
             self.assertEqual(face, cube.faces[i])
 
+    def test_faces(self):
+        cube = Cube("ORBRWYYGRWBROGYYGOGYWORBYROGBRWBOBRWYGGWOBBGGBYWOYWOWR")
+        self.assertEqual(cube.faces[0], [["O", "R", "B"], ["R", "W", "Y"], ["Y", "G", "R"]])
+
+        faces = cube.faces
+        faces[0][0][0] = "W"
+        self.assertEqual(str(cube)[0], "O")
+
+        cube.faces = faces
+        self.assertEqual(str(cube)[0], "W")
+
     def test_calculateFaces(self):
         cube = Cube()
         cube.calculateFaces("R", "W")
@@ -123,6 +157,21 @@ class TestCubeNonSolver(unittest.TestCase):
 
         self.assertEqual(str(cube1), str(cube2))
 
+    def test_movesMade(self):
+        cube = Cube()
+        cube.executeSequence("RU'F2Di")
+        self.assertEqual(cube.movesMade, ["R", "Ui", "F2", "Di"])
+
+    def test_convertSequenceFromFace(self):
+        for face in ("R", "B", "O", "G"):
+            cube1 = Cube()
+            cube2 = Cube()
+            sequence = "FLDDL'F'D2Ri"
+            cube1.convertSequenceFromFace(face, sequence)
+            cube2.executeSequence("".join(RELATIVE_FACE_MAPPING.get(face, {}).get(ch, ch) for ch in sequence))
+            self.assertEqual(str(cube1), str(cube2))
+            self.assertEqual(cube1.movesMade, cube2.movesMade)
+
     def test_checkMask(self):
         cube = Cube()
         self.assertTrue(SOLVED_MASK)
@@ -138,6 +187,74 @@ class TestCubeNonSolver(unittest.TestCase):
         cube.solve()
         self.assertTrue(cube.isSolved)
 
+    def test_solveHashSeed(self):
+        # the solutions mustn't depend on the order sets of strings are iterated in
+        script = (
+            "import random\n"
+            "from rubiks_cube.cube import Cube\n"
+            "rng = random.Random(5)\n"
+            "for _ in range(20):\n"
+            "    cube = Cube()\n"
+            "    cube.randomise(rng)\n"
+            "    cube.movesMade = []\n"
+            "    cube.solve(useCache=False)\n"
+            "    print(''.join(cube.movesMade))\n"
+        )
+        solutions = [
+            subprocess.run(
+                [sys.executable, "-c", script],
+                env={**os.environ, "PYTHONHASHSEED": seed},
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            for seed in ("1", "2")
+        ]
+        self.assertEqual(solutions[0], solutions[1])
+
+    def test_solveTwoPhase(self):
+        cube = Cube()
+        cube.randomise()
+        cube.solve(method="two_phase", maxLength=30)
+        self.assertTrue(cube.isSolved)
+
+        cube = Cube()
+        cube.solve(method="two_phase")
+        self.assertEqual(cube.movesMade, [])
+
+        with self.assertRaises(ValueError):
+            cube.solve(method="unknown")
+
+    def test_collectSpans(self):
+        cube = Cube()
+        cube.randomise()
+        with cube.collectSpans() as spans:
+            cube.solve()
+        self.assertTrue(cube.isSolved)
+        self.assertEqual([span.stage for span in spans], list(BEGINNER_STAGES))
+        self.assertEqual(sum(span.movesAdded for span in spans), len(cube.movesMade))
+        self.assertTrue(all(span.wallTime >= 0 and span.cpuTime >= 0 for span in spans))
+        self.assertGreater(sum(span.maskChecks for span in spans), 0)
+        self.assertGreater(spans[0].nodesExpanded, 0)
+        self.assertEqual(spans[0].asDict()["nodes_expanded"], spans[0].nodesExpanded)
+
+        # the observer is removed when the block exits
+        cube.randomise()
+        cube.solve()
+        self.assertEqual(len(spans), len(BEGINNER_STAGES))
+        self.assertEqual(cube.observers, [])
+
+    def test_observer(self):
+        cube = Cube()
+        cube.randomise()
+        spans = []
+        cube.addObserver(spans.append)
+        cube.solve(method="two_phase", maxLength=30)
+        cube.removeObserver(spans.append)
+        self.assertEqual([span.stage for span in spans], ["two_phase"])
+        self.assertEqual(spans[0].movesAdded, len(cube.movesMade))
+        self.assertGreater(spans[0].nodesExpanded, 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+import random
+import unittest
+
+import numpy as np
+
+from rubiks_cube.constants import (
+    F2L_CORNERS_INSERTION_MASKS,
+    POSSIBLE_ROTATIONS,
+    WHITE_CROSS_SOLVED_MASKS,
+    YELLOW_CROSS_SOLVED_MASK,
+)
+from rubiks_cube.cube import Cube
+from rubiks_cube.cube_batch import CubeBatch
+from rubiks_cube.masks import COMPILED_F2L_CORNERS_SOLVED_MASKS
+from rubiks_cube.sequences import compileSequence
+
+
+class TestCubeBatch(unittest.TestCase):
+    def setUp(self):
+        random.seed(13)
+        self.cubes = []
+        for _ in range(20):
+            cube = Cube()
+            cube.randomise()
+            self.cubes.append(cube)
+
+    def test_conversions(self):
+        batch = CubeBatch.fromCubes(self.cubes)
+        self.assertEqual(len(batch), 20)
+        self.assertEqual(batch.toStrings(), [str(cube) for cube in self.cubes])
+        self.assertEqual(batch[3], str(self.cubes[3]))
+        self.assertEqual(CubeBatch.fromStrings(batch.toStrings()).toStrings(), batch.toStrings())
+        self.assertEqual([str(cube) for cube in batch.toCubes()], batch.toStrings())
+
+        with self.assertRaises(ValueError):
+            CubeBatch(np.zeros((3, 53), dtype=np.uint8))
+
+    def test_applySequence(self):
+        batch = CubeBatch.fromCubes(self.cubes)
+        batch.applyMove("R")
+        batch.applySequence(compileSequence("FUi B2 L'D"))
+        for cube in self.cubes:
+            cube.executeSequence("RFUiB2L'D")
+        self.assertEqual(batch.toStrings(), [str(cube) for cube in self.cubes])
+
+        # a sequence followed by its inverse is the identity
+        before = batch.copy()
+        batch.applySequence("RUR'U'")
+        batch.applySequence("URU'R'")
+        np.testing.assert_array_equal(batch.states, before.states)
+
+    def test_applyMoveIndices(self):
+        batch = CubeBatch.fromCubes(self.cubes)
+        moves = np.arange(len(self.cubes)) % len(POSSIBLE_ROTATIONS)
+        batch.applyMoveIndices(moves)
+        for cube, move in zip(self.cubes, moves):
+            cube.executeSequence(POSSIBLE_ROTATIONS[move])
+        self.assertEqual(batch.toStrings(), [str(cube) for cube in self.cubes])
+
+    def test_randomise(self):
+        batch = CubeBatch.solved(50)
+        self.assertTrue(batch.isSolved.all())
+
+        moves = batch.randomise(30, np.random.default_rng(0))
+        self.assertEqual(moves.shape, (50, 30))
+        self.assertFalse(batch.isSolved.any())
+        for state, sequence in zip(batch.toStrings(), moves):
+            cube = Cube()
+            cube.executeSequence("".join(POSSIBLE_ROTATIONS[move] for move in sequence))
+            self.assertEqual(state, str(cube))
+
+    def test_checkMasks(self):
+        batch = CubeBatch.fromCubes(self.cubes + [Cube()])
+        masks = [mask for _, mask in WHITE_CROSS_SOLVED_MASKS] + [YELLOW_CROSS_SOLVED_MASK]
+        expected = np.array([[cube.checkMask(mask) for mask in masks] for cube in self.cubes + [Cube()]])
+        np.testing.assert_array_equal(batch.checkMasks(masks), expected)
+        np.testing.assert_array_equal(batch.checkAnyMask(masks), expected.any(axis=1))
+        self.assertTrue(batch.checkMask(masks[-1])[-1])
+        self.assertTrue(batch.checkMask("." * 54).all())
+
+    def test_checkMaskTables(self):
+        cubes = self.cubes + [Cube()]
+        batch = CubeBatch.fromCubes(cubes)
+        # the tables in constants.py, with (face, mask) and (face, mask, pattern) entries
+        for table in (WHITE_CROSS_SOLVED_MASKS, F2L_CORNERS_INSERTION_MASKS, COMPILED_F2L_CORNERS_SOLVED_MASKS):
+            entries = list(table)
+            expected = np.array([[cube.checkMask(entry[1]) for entry in entries] for cube in cubes])
+            np.testing.assert_array_equal(batch.checkMasks(entries), expected)
+            np.testing.assert_array_equal(batch.checkAnyMask(table), expected.any(axis=1))
+
+        with self.assertRaises(ValueError):
+            batch.checkMasks([("G",)])
+        with self.assertRaises(ValueError):
+            batch.checkMask("...")
+
+
+if __name__ == "__main__":
+    unittest.main()
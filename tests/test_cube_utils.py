@@ -1,7 +1,8 @@
+import random
 import unittest
 
 from rubiks_cube.cube import Cube
-from rubiks_cube.cube_utils import checkMask, combineMasks, rotate
+from rubiks_cube.cube_utils import checkMask, combineMasks, countMoves, optimiseMoves, rotate
 
 
 class TestCubeNonSolver(unittest.TestCase):
@@ -53,6 +54,36 @@ class TestCubeNonSolver(unittest.TestCase):
             cube.executeSequence(rotation)
             self.assertEqual(rotated, str(cube))
 
+    def test_optimiseMoves(self):
+        self.assertEqual(optimiseMoves(["R", "R"]), ["R2"])
+        self.assertEqual(optimiseMoves(["R", "R", "R"]), ["Ri"])
+        self.assertEqual(optimiseMoves(["R", "R", "R", "R"]), [])
+        self.assertEqual(optimiseMoves(["U", "D", "Ui"]), ["D"])
+        self.assertEqual(optimiseMoves(["F", "R", "L", "Li", "Ri", "Fi", "U"]), ["U"])
+        self.assertEqual(optimiseMoves(["R2", "R'", "L", "R"]), ["R2", "L"])
+        self.assertEqual(optimiseMoves(["W", "Y", "Wi", "B"]), ["Y", "B"])
+        self.assertEqual(optimiseMoves(["U", "X", "Ui"]), ["U", "X", "Ui"])
+
+        rng = random.Random(19)
+        for _ in range(200):
+            moves = [rng.choice("RLUDFB") + rng.choice(("", "i", "'", "2")) for _ in range(rng.randint(0, 30))]
+            optimised = optimiseMoves(moves)
+            self.assertLessEqual(len(optimised), len(moves))
+            self.assertEqual(optimiseMoves(optimised), optimised)
+
+            cube1 = Cube()
+            cube1.executeSequence("".join(moves))
+            cube2 = Cube()
+            cube2.executeSequence("".join(optimised))
+            self.assertEqual(cube1, cube2)
+
+    def test_countMoves(self):
+        self.assertEqual(countMoves([]), {"htm": 0, "qtm": 0, "stm": 0})
+        self.assertEqual(countMoves(["R", "U2", "Fi"]), {"htm": 3, "qtm": 4, "stm": 3})
+        # opposite faces turned the same way are still two face turns, not a slice turn
+        self.assertEqual(countMoves(["R", "Li", "U2", "D2", "F", "B"]), {"htm": 6, "qtm": 8, "stm": 6})
+        self.assertEqual(countMoves(["B", "Gi", "W2"]), {"htm": 3, "qtm": 4, "stm": 3})
+
 
 if __name__ == "__main__":
     unittest.main()
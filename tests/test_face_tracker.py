@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+
+from rubiks_cube.constants import SCAN_COLOURS
+from rubiks_cube.face_tracker import FaceTracker
+from rubiks_cube.regression import makeFaceImages
+from rubiks_cube.scanner_utils import extractColours, findFace
+
+
+def makeFrame(face: np.ndarray | None, x: int, y: int, seed: int = 0, shape: tuple = (480, 640)) -> np.ndarray:
+    """Pastes a face into a noisy grey frame (480x640 by default) with its top left corner at (x, y)."""
+    rng = np.random.default_rng(seed)
+    frame = np.clip(rng.normal(90, 6, (*shape, 3)), 0, 255).astype(np.uint8)
+    if face is not None:
+        frame[y : y + face.shape[0], x : x + face.shape[1]] = face
+    return frame
+
+
+class TestFaceTracker(unittest.TestCase):
+    def setUp(self):
+        self.face = makeFaceImages(seed=1, count=1, size=120)[0][0]
+
+    def assertFaceAt(self, box, x, y, size=120):
+        self.assertIsNotNone(box)
+        tolerance = size // 15
+        self.assertLessEqual(abs(box[0] - x), tolerance)
+        self.assertLessEqual(abs(box[1] - y), tolerance)
+        self.assertLessEqual(abs(box[2] - x - size), tolerance)
+        self.assertLessEqual(abs(box[3] - y - size), tolerance)
+
+    def test_findFace(self):
+        box, squares = findFace(makeFrame(self.face, 200, 150))
+        self.assertFaceAt(box, 200, 150)
+        self.assertGreater(len(squares), 4)
+        self.assertEqual(findFace(makeFrame(None, 0, 0)), (None, []))
+
+    def test_detectionWidth(self):
+        # a face at twice the resolution has four times the area
+        face, names = makeFaceImages(seed=1, count=1, size=240)[0]
+        frame = makeFrame(face, 400, 300, shape=(960, 1280))
+        for detectionWidth in (640, 800, None):
+            box, squares = findFace(frame, detectionWidth)
+            # searched scaled down, but found in full resolution coordinates
+            self.assertFaceAt(box, 400, 300, 240)
+            self.assertTrue(all(400 - 16 <= square[:, 0, 0].min() < 640 for square in squares))
+            minX, minY, maxX, maxY = box
+            self.assertEqual(extractColours(frame[minY:maxY, minX:maxX], SCAN_COLOURS, "median"), names)
+
+        # a face too small for the resolution is ignored
+        small = makeFrame(makeFaceImages(seed=1, count=1, size=60)[0][0], 400, 300, shape=(960, 1280))
+        self.assertIsNone(findFace(small)[0])
+
+        tracker = FaceTracker()
+        tracker.detect(frame)
+        self.assertFaceAt(tracker.detect(makeFrame(face, 440, 320, 1, (960, 1280)))[0], 440, 320, 240)
+        self.assertEqual(tracker.stats()["roi_detections"], 1)
+
+    def test_tracking(self):
+        tracker = FaceTracker()
+        self.assertFaceAt(tracker.detect(makeFrame(self.face, 200, 150, 0))[0], 200, 150)
+        self.assertTrue(tracker.tracking)
+
+        # small movements stay inside the region of interest
+        box, squares = tracker.detect(makeFrame(self.face, 230, 170, 1))
+        self.assertFaceAt(box, 230, 170)
+        # the squares are in frame coordinates too
+        self.assertTrue(all(230 - 8 <= square[:, 0, 0].min() < 350 for square in squares))
+        self.assertEqual(tracker.stats(), {"roi_detections": 1, "full_detections": 1, "lost": 0, "tracking": True})
+
+        # a jump out of the region loses tracking, and the whole frame finds the face again
+        self.assertFaceAt(tracker.detect(makeFrame(self.face, 450, 300, 2))[0], 450, 300)
+        self.assertEqual(tracker.stats()["lost"], 1)
+        self.assertEqual(tracker.stats()["full_detections"], 2)
+
+        self.assertEqual(tracker.detect(makeFrame(None, 0, 0, 3)), (None, []))
+        self.assertFalse(tracker.tracking)
+
+    def test_opticalFlow(self):
+        tracker = FaceTracker(opticalFlow=True)
+        tracker.detect(makeFrame(self.face, 200, 150, 0))
+        # further than the padding, but followed by the flow
+        self.assertFaceAt(tracker.detect(makeFrame(self.face, 270, 150, 0))[0], 270, 150)
+        self.assertEqual(tracker.stats()["roi_detections"], 1)
+        self.assertEqual(tracker.stats()["lost"], 0)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            FaceTracker(padding=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
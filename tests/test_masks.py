@@ -0,0 +1,88 @@
+import random
+import unittest
+
+from rubiks_cube.constants import SOLVED_MASK
+from rubiks_cube.cube import Cube
+from rubiks_cube.cube_utils import checkMask, combineMasks
+from rubiks_cube.masks import (
+    COMPILED_F2L_CORNERS_INSERTION_MASKS,
+    COMPILED_F2L_MIDDLE_INSERTION_MASKS,
+    COMPILED_F2L_MIDDLE_SOLVED_MASKS,
+    COMPILED_WHITE_CROSS_RECURSION_MASKS,
+    COMPILED_WHITE_CROSS_SOLVED_MASKS,
+    EMPTY_MASK,
+    CompiledMask,
+    MaskMatcher,
+    compileMask,
+)
+
+
+class TestMasks(unittest.TestCase):
+    def test_compileMask(self):
+        mask = "W" + "." * 52 + "Y"
+        compiled = compileMask(mask)
+        self.assertEqual(str(compiled), mask)
+        self.assertEqual(compiled.indices, (0, 53))
+        self.assertEqual(compiled.colourBits, {"W": 1, "Y": 1 << 53})
+        self.assertIs(compileMask(mask), compiled)
+        self.assertEqual(compiled, CompiledMask({"Y": 1 << 53, "W": 1}))
+
+    def test_matches(self):
+        self.assertTrue(compileMask(SOLVED_MASK).matches(SOLVED_MASK))
+        self.assertTrue(compileMask(SOLVED_MASK).matches(SOLVED_MASK.encode("ascii")))
+        self.assertTrue(EMPTY_MASK.matches("G" * 54))
+        self.assertTrue(compileMask("." * 53 + "Y").matches(SOLVED_MASK))
+        self.assertFalse(compileMask("Y" + "." * 53).matches(SOLVED_MASK))
+
+        for _, mask in COMPILED_WHITE_CROSS_SOLVED_MASKS:
+            self.assertTrue(mask.matches(SOLVED_MASK))
+
+    def test_combine(self):
+        mask1 = "W" * 9 + "." * 45
+        mask2 = "G" * 18 + "." * 36
+        combined = compileMask(mask1).combine(compileMask(mask2))
+        self.assertEqual(str(combined), "W" * 9 + "G" * 9 + "." * 36)
+        self.assertEqual(str(combined), combineMasks(mask1, mask2))
+        self.assertEqual(EMPTY_MASK.combine(combined), combined)
+
+    def test_matchesUncompiled(self):
+        masks = ["R" * 54, "." * 54, "R" * 10 + "." * 44, "." * 20 + "B" + "." * 33]
+        states = ["R" * 54, "G" * 54, "R" * 10 + "G" * 44, SOLVED_MASK]
+        for mask in masks:
+            for state in states:
+                expected = all(m == "." or m == s for m, s in zip(mask, state))
+                self.assertEqual(checkMask(mask, state), expected)
+
+    def test_compiledTableOrder(self):
+        for table in (COMPILED_WHITE_CROSS_SOLVED_MASKS, COMPILED_F2L_MIDDLE_SOLVED_MASKS):
+            self.assertIsInstance(table, tuple)
+            entries = [(face, str(mask)) for face, mask in table]
+            self.assertEqual(entries, sorted(entries))
+        self.assertIsInstance(COMPILED_WHITE_CROSS_RECURSION_MASKS, tuple)
+        masks = [str(mask) for mask in COMPILED_WHITE_CROSS_RECURSION_MASKS]
+        self.assertEqual(masks, sorted(masks))
+
+    def test_maskMatcher(self):
+        random.seed(3)
+        tables = [
+            [mask for mask in COMPILED_WHITE_CROSS_RECURSION_MASKS],
+            [mask for _, mask in COMPILED_F2L_CORNERS_INSERTION_MASKS],
+            [mask for _, mask in COMPILED_F2L_MIDDLE_INSERTION_MASKS] + [EMPTY_MASK],
+            [],
+        ]
+        cube = Cube()
+        for masks in tables:
+            matcher = MaskMatcher(masks)
+            for _ in range(100):
+                cube.randomise()
+                # partly solved states, so that some of the masks match
+                if random.random() < 0.5:
+                    cube.solveCross()
+                expected = next((mask for mask in masks if mask.matches(cube.state)), None)
+                self.assertIs(matcher.match(cube.state), expected)
+                self.assertIs(matcher.match(str(cube)), expected)
+                self.assertEqual(matcher.matchesAny(cube.state), expected is not None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import itertools
+import random
+import unittest
+
+from rubiks_cube.constants import POSSIBLE_ROTATIONS, SOLVED_MASK, WHITE_CROSS_RECURSION_MASKS, WHITE_CROSS_SOLVED_MASKS
+from rubiks_cube.cube import Cube
+from rubiks_cube.cube_utils import checkMask, combineMasks, rotate
+from rubiks_cube.pathfinding import (
+    MOVE_SUCCESSORS,
+    SEARCH_MOVES,
+    TRANSPOSITION_ENTRY_SIZE,
+    TranspositionTable,
+    findPath,
+)
+
+
+class TestPathfinding(unittest.TestCase):
+    def test_solvedState(self):
+        self.assertEqual(findPath(SOLVED_MASK, [SOLVED_MASK], 3), [])
+        self.assertIsNone(findPath(SOLVED_MASK, [], 3))
+
+    def test_shortestPath(self):
+        cube = Cube()
+        cube.executeSequence("RUF'")
+        path = findPath(str(cube), [SOLVED_MASK], 4)
+        self.assertEqual(path, ["F", "U'", "R'"])
+
+        # half turns are single moves
+        cube.executeSequence("RR")
+        self.assertEqual(findPath(str(cube), [SOLVED_MASK], 5), ["R2", "F", "U'", "R'"])
+        self.assertIsNone(findPath(str(cube), [SOLVED_MASK], 3))
+
+    def test_moveSuccessors(self):
+        for last, moves in MOVE_SUCCESSORS.items():
+            if last == -1:
+                continue
+            lastMove = SEARCH_MOVES[last][0]
+            for index in moves:
+                move = SEARCH_MOVES[index][0]
+                # two turns of the same face are always one move or none
+                self.assertNotEqual(move[0], lastMove[0])
+
+    def test_matchesBruteForce(self):
+        random.seed(5)
+        masks = list(WHITE_CROSS_RECURSION_MASKS)
+        for _ in range(10):
+            cube = Cube()
+            cube.randomise()
+            state = str(cube)
+
+            expected = None
+            for depth in range(4):
+                for moves in itertools.product(POSSIBLE_ROTATIONS, repeat=depth):
+                    newState = state
+                    for move in moves:
+                        newState = rotate(newState, move)
+                    if any(checkMask(mask, newState) for mask in masks):
+                        expected = depth
+                        break
+                if expected is not None:
+                    break
+
+            path = findPath(state, masks, 3)
+            if expected is None:
+                self.assertIsNone(path)
+                continue
+
+            self.assertEqual(len(path), expected)
+            for move in path:
+                state = rotate(state, move)
+            self.assertTrue(any(checkMask(mask, state) for mask in masks))
+
+    def test_transpositionTable(self):
+        random.seed(7)
+        # two cross edges at once, which usually takes a few moves to reach
+        solvedMasks = sorted(mask for _, mask in WHITE_CROSS_SOLVED_MASKS)
+        masks = [combineMasks(solvedMasks[0], solvedMasks[1])]
+        table = TranspositionTable()
+        states = []
+        for _ in range(20):
+            cube = Cube()
+            cube.randomise()
+            states.append(str(cube))
+
+        for state in states:
+            self.assertEqual(findPath(state, masks, 5, table), findPath(state, masks, 5))
+        self.assertEqual(table.hits, 0)
+        self.assertGreater(len(table), 0)
+
+        # searching the same states again skips the dead ends found the first time
+        for state in states:
+            self.assertEqual(findPath(state, masks, 5, table), findPath(state, masks, 5))
+        self.assertGreater(table.hits, 0)
+        self.assertEqual(table.stats()["hits"], table.hits)
+
+        table.clear()
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.hits, 0)
+
+    def test_transpositionTableEviction(self):
+        table = TranspositionTable(maxMemory=3 * TRANSPOSITION_ENTRY_SIZE)
+        for i in range(5):
+            table.store((i,), 2)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.evictions, 2)
+
+        # the least recently used entries are evicted first
+        self.assertFalse(table.isDeadEnd((0,), 1))
+        self.assertTrue(table.isDeadEnd((2,), 2))
+        self.assertFalse(table.isDeadEnd((2,), 3))
+        table.store((5,), 1)
+        self.assertTrue(table.isDeadEnd((2,), 1))
+        self.assertFalse(table.isDeadEnd((3,), 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
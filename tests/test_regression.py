@@ -0,0 +1,116 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from rubiks_cube.constants import SCAN_COLOURS
+from rubiks_cube.regression import (
+    compareColourMethods,
+    compareResults,
+    loadResults,
+    makeFaceImages,
+    runRegressionBenchmark,
+    saveResults,
+    summariseRuns,
+)
+from rubiks_cube.scanner_utils import COLOUR_METHODS, extractColours, getCellColours
+
+
+def makeResults(total: float, moves: float = 130.0, failures: float = 0.0, workers: int = 1) -> dict:
+    return {
+        "version": 3,
+        "settings": {"solves": 1000, "workers": workers, "seed": 0},
+        "throughput": workers / total,
+        "metrics": {
+            "solve.total": {"value": total, "runs": [total] * 10, "count": 1000, "unit": "calibrations"},
+            "solve.optimised_moves": {"value": moves, "runs": [moves], "count": 1000, "unit": "moves"},
+            "solve.failures": {"value": failures, "runs": [failures], "count": 1000, "unit": "fraction"},
+        },
+    }
+
+
+class TestRegression(unittest.TestCase):
+    def regressed(self, rows: list[dict]) -> set[str]:
+        return {row["metric"] for row in rows if row["regressed"]}
+
+    def test_compareResults(self):
+        baseline = makeResults(0.004)
+        self.assertEqual(self.regressed(compareResults(makeResults(0.0045), baseline)), set())
+
+        # timings and throughput fail the check beyond the noise between runs
+        rows = compareResults(makeResults(0.0052), baseline)
+        self.assertEqual(self.regressed(rows), {"solve.total", "throughput"})
+        self.assertAlmostEqual(next(row for row in rows if row["metric"] == "solve.total")["change"], 0.3)
+        self.assertEqual(self.regressed(compareResults(makeResults(0.0052), baseline, {}, 0.5)), set())
+        rows = compareResults(makeResults(0.0052), baseline, {"throughput": 0.5})
+        self.assertEqual(self.regressed(rows), {"solve.total"})
+
+        # move counts and failed solves fail the check on any real change
+        moreMoves = makeResults(0.004, moves=140.0)
+        self.assertEqual(self.regressed(compareResults(moreMoves, baseline)), {"solve.optimised_moves"})
+        failures = makeResults(0.004, failures=0.001)
+        self.assertEqual(self.regressed(compareResults(failures, baseline)), {"solve.failures"})
+
+        # results run with a different number of workers can't be compared
+        with self.assertRaises(ValueError):
+            compareResults(makeResults(0.004, workers=2), baseline)
+
+    def test_unchangedTree(self):
+        # two runs of the same code on the same machine compare within the default tolerances
+        images = makeFaceImages(count=2)
+        first = runRegressionBenchmark(500, workers=1, images=images)
+        second = runRegressionBenchmark(500, workers=1, images=images)
+        self.assertEqual(self.regressed(compareResults(second, first)), set())
+
+    def test_summariseRuns(self):
+        # one slow run doesn't move the median of the runs' medians
+        runs = [np.array([0.010, 0.011, 0.009])] * 4 + [np.array([0.5, 0.6, 0.7])]
+        summary = summariseRuns("solve.total", runs)
+        self.assertAlmostEqual(summary["value"], 0.010)
+        self.assertEqual((summary["count"], summary["unit"], len(summary["runs"])), (15, "calibrations", 5))
+
+        moves = summariseRuns("solve.moves", [np.array([100.0, 120.0])])
+        self.assertEqual((moves["value"], moves["unit"]), (110.0, "moves"))
+        self.assertEqual(summariseRuns("solve.failures", [np.zeros(4)])["unit"], "fraction")
+
+    def test_saveAndLoad(self):
+        results = makeResults(0.004)
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "results.json"
+            saveResults(results, path)
+            self.assertEqual(loadResults(path), results)
+
+            saveResults({**results, "version": 0}, path)
+            with self.assertRaises(ValueError):
+                loadResults(path)
+
+    def test_faceImages(self):
+        images = makeFaceImages(seed=1, count=3)
+        self.assertTrue(all(np.array_equal(a[0], b[0]) for a, b in zip(images, makeFaceImages(seed=1, count=3))))
+        for image, names in images:
+            for method in COLOUR_METHODS:
+                self.assertEqual(extractColours(image, SCAN_COLOURS, method), names)
+        with self.assertRaises(ValueError):
+            extractColours(images[0][0], SCAN_COLOURS, "mean")
+
+    def test_cellColours(self):
+        image = np.zeros((90, 90, 3), dtype=np.uint8)
+        image[:, 30:60] = (0, 0, 255)
+        # glare on one side of a sticker doesn't move its median
+        image[:30, :10] = 255
+        colours = getCellColours(image)
+        self.assertEqual(colours.shape, (9, 3))
+        self.assertTrue(np.allclose(colours[1], (255, 0, 0), atol=2))
+        self.assertTrue(np.allclose(colours[0], (0, 0, 0), atol=2))
+        self.assertTrue(np.allclose(getCellColours(image, "trimmed")[4], (255, 0, 0), atol=2))
+
+    def test_compareColourMethods(self):
+        comparison = compareColourMethods(makeFaceImages(seed=2, count=2), repeats=1)
+        self.assertEqual(list(comparison), list(COLOUR_METHODS))
+        self.assertEqual(comparison["kmeans"]["agreement"], 1.0)
+        self.assertTrue(all(row["accuracy"] == 1.0 for row in comparison.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
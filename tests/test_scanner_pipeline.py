@@ -0,0 +1,89 @@
+import queue
+import time
+import unittest
+
+from rubiks_cube.scanner_pipeline import ScannerPipeline, StageStats, putLatest
+
+
+class FakeCapture:
+    """Stands in for a webcam, returning increasing frame numbers."""
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.count = 0
+        self.released = False
+
+    def read(self):
+        time.sleep(self.interval)
+        self.count += 1
+        return True, self.count
+
+    def release(self):
+        self.released = True
+
+
+def waitForResult(pipeline: ScannerPipeline, timeout: float = 2.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        result = pipeline.latest()
+        if result is not None:
+            return result
+        time.sleep(0.005)
+    return None
+
+
+class TestScannerPipeline(unittest.TestCase):
+    def test_putLatest(self):
+        items = queue.Queue(maxsize=1)
+        stats = StageStats("capture")
+        for item in range(3):
+            putLatest(items, item, stats)
+        self.assertEqual(items.get_nowait(), 2)
+        self.assertEqual(stats.dropped, 2)
+
+    def test_stageStats(self):
+        stats = StageStats("process")
+        for frame in range(5):
+            stats.record(0.02, now=frame * 0.1)
+        self.assertEqual(stats.frames, 5)
+        self.assertAlmostEqual(stats.fps, 10)
+        self.assertAlmostEqual(stats.latency, 0.02)
+        self.assertEqual(set(stats.asDict()), {"stage", "frames", "dropped", "fps", "latency"})
+
+    def test_pipeline(self):
+        capture = FakeCapture()
+        pipeline = ScannerPipeline(capture, lambda frame: -frame)
+        pipeline.start()
+        first = waitForResult(pipeline)
+        second = waitForResult(pipeline)
+        pipeline.stop()
+
+        self.assertFalse(pipeline.running)
+        self.assertTrue(capture.released)
+        self.assertLess(second, first)
+        stats = pipeline.stats()
+        self.assertEqual(list(stats), ["capture", "process", "display"])
+        self.assertEqual(stats["display"]["frames"], 2)
+        self.assertGreaterEqual(stats["capture"]["frames"], stats["process"]["frames"])
+
+    def test_dropsStaleFrames(self):
+        def process(frame):
+            time.sleep(0.02)
+            if frame % 2:
+                raise ValueError("bad frame")
+            return frame
+
+        capture = FakeCapture()
+        pipeline = ScannerPipeline(capture, process)
+        pipeline.start()
+        # a slow stage skips to the newest frame, and a failing frame doesn't stop it
+        results = [waitForResult(pipeline) for _ in range(3)]
+        pipeline.stop()
+
+        self.assertTrue(all(result is not None and result % 2 == 0 for result in results))
+        self.assertGreater(pipeline.captureStats.dropped, 0)
+        self.assertLess(pipeline.processStats.frames, capture.count)
+
+
+if __name__ == "__main__":
+    unittest.main()
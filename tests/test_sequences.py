@@ -0,0 +1,42 @@
+import unittest
+
+from rubiks_cube.cube import Cube
+from rubiks_cube.sequences import SEQUENCE_MOVES, compileSequence, sequenceMoves
+
+
+class TestSequences(unittest.TestCase):
+    def test_compileSequence(self):
+        codes = compileSequence("RUi F' D2 x")
+        self.assertEqual(sequenceMoves(codes), ["R", "U'", "F'", "D2"])
+        self.assertEqual([SEQUENCE_MOVES[code][1] for code in codes], ["R", "Ui", "Fi", "D2"])
+        self.assertIs(compileSequence("RUi F' D2 x"), codes)
+
+        # colour notation keeps the colour letters as labels, and numbers other than 2 repeat quarter turns
+        codes = compileSequence("BW'R3O2", True)
+        self.assertEqual(sequenceMoves(codes), ["R", "U'", "F", "F", "F", "B2"])
+        self.assertEqual([SEQUENCE_MOVES[code][1] for code in codes], ["B", "Wi", "R", "R", "R", "O2"])
+
+        self.assertEqual(compileSequence(""), ())
+
+    def test_executeCompiled(self):
+        cube1 = Cube()
+        cube2 = Cube()
+        cube1.executeSequence("RUR'U'F2")
+        cube2.executeSequence(compileSequence("RUR'U'F2"))
+        self.assertEqual(str(cube1), str(cube2))
+        self.assertEqual(cube1.movesMade, cube2.movesMade)
+
+    def test_executeSequenceRelative(self):
+        cube1 = Cube()
+        cube2 = Cube()
+        cube1.calculateFaces("B", "Y")
+        cube1.executeSequenceRelative("RU'F2")
+        # with blue in front and yellow on top, R is the red face, U is yellow and F is blue
+        cube2.executeSequence("RY'B2", True)
+        self.assertEqual(str(cube1), str(cube2))
+        self.assertEqual(cube1.movesMade, ["R", "Yi", "B2"])
+        self.assertEqual(cube1.movesMade, cube2.movesMade)
+
+
+if __name__ == "__main__":
+    unittest.main()
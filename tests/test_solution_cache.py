@@ -0,0 +1,112 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from rubiks_cube.cube import Cube
+from rubiks_cube.solution_cache import SolutionCache, getSolutionCache, setSolutionCache
+from rubiks_cube.symmetry import NUM_SYMMETRIES, transformState
+
+
+class TestSolutionCache(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(18)
+        self.cubes = []
+        for _ in range(4):
+            cube = Cube()
+            cube.randomise(rng)
+            self.cubes.append(cube)
+        self.method = SolutionCache.methodKey("beginner")
+
+    def tearDown(self):
+        setSolutionCache(None)
+
+    def solution(self, cube: Cube) -> list[str]:
+        solver = Cube(str(cube))
+        solver.solve()
+        return solver.movesMade
+
+    def checkSolves(self, state: bytes, moves: list[str]) -> None:
+        cube = Cube(state.decode("ascii"))
+        cube.executeSequence("".join(moves))
+        self.assertTrue(cube.isSolved)
+
+    def test_symmetricLookup(self):
+        cache = SolutionCache()
+        cube = self.cubes[0]
+        self.assertIsNone(cache.lookup(cube.state, self.method))
+        cache.store(cube.state, self.method, self.solution(cube))
+
+        # any symmetric equivalent of the state uses the same entry
+        for symmetry in range(NUM_SYMMETRIES):
+            state = transformState(cube.state, symmetry)
+            self.checkSolves(state, cache.lookup(state, self.method))
+
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.lookup(cube.state, SolutionCache.methodKey("two_phase", 22)))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (NUM_SYMMETRIES, 2))
+
+    def test_eviction(self):
+        cache = SolutionCache(maxEntries=2)
+        for cube in self.cubes[:3]:
+            cache.store(cube.state, self.method, self.solution(cube))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.lookup(self.cubes[0].state, self.method))
+        self.assertIsNotNone(cache.lookup(self.cubes[2].state, self.method))
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "solutions.sqlite"
+            cache = SolutionCache(path=path, maxDiskEntries=3)
+            for cube in self.cubes:
+                cache.store(cube.state, self.method, self.solution(cube))
+            self.assertEqual(cache.stats()["disk_entries"], 3)
+            cache.close()
+
+            # a new cache finds the solutions stored by the last one, except the oldest
+            cache = SolutionCache(path=path)
+            self.assertEqual(len(cache), 0)
+            self.assertIsNone(cache.lookup(self.cubes[0].state, self.method))
+            for cube in self.cubes[1:]:
+                self.checkSolves(cube.state, cache.lookup(cube.state, self.method))
+            self.assertEqual(cache.stats()["disk_hits"], 3)
+            self.assertEqual(len(cache), 3)
+
+            cache.clear()
+            self.assertEqual(cache.stats()["disk_entries"], 0)
+            cache.close()
+
+    def test_solve(self):
+        self.assertIsNone(getSolutionCache())
+        cache = SolutionCache()
+        setSolutionCache(cache)
+
+        cube = Cube(str(self.cubes[0]))
+        cube.solve()
+        self.assertTrue(cube.isSolved)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+        cube = Cube(transformState(self.cubes[0].state, 30).decode("ascii"))
+        with cube.collectSpans() as spans:
+            cube.solve()
+        self.assertTrue(cube.isSolved)
+        self.assertEqual([span.stage for span in spans], ["solution_cache"])
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_analyseSolves(self):
+        cache = SolutionCache()
+        setSolutionCache(cache)
+        cube = Cube()
+        # the same scrambles twice, which would be found in the cache the second time
+        for _ in range(2):
+            random.seed(18)
+            results = cube.analyseSolves(2, displayAllTimes=False, displayStats=False)
+            self.assertGreater(results["avg_cross_time"], 0)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import random
+import unittest
+
+from rubiks_cube.coords import CubieCube
+from rubiks_cube.cube import Cube
+from rubiks_cube.cube_state import SOLVED_STATE
+from rubiks_cube.symmetry import (
+    INVERSE_SYMMETRIES,
+    NUM_ROTATIONS,
+    NUM_SYMMETRIES,
+    SYMMETRY_PERMUTATIONS,
+    canonicalState,
+    conjugateMoves,
+    transformState,
+)
+
+
+class TestSymmetry(unittest.TestCase):
+    def setUp(self):
+        self.cube = Cube()
+        self.cube.randomise(random.Random(17))
+
+    def test_symmetries(self):
+        self.assertEqual(NUM_SYMMETRIES, 48)
+        self.assertEqual(len(set(SYMMETRY_PERMUTATIONS)), 48)
+        self.assertEqual(SYMMETRY_PERMUTATIONS[0], tuple(range(54)))
+
+        for symmetry in range(NUM_SYMMETRIES):
+            self.assertEqual(transformState(SOLVED_STATE, symmetry), SOLVED_STATE)
+            transformed = transformState(self.cube.state, symmetry)
+            self.assertTrue(CubieCube.fromString(transformed.decode("ascii")).isValid())
+            self.assertEqual(transformState(transformed, INVERSE_SYMMETRIES[symmetry]), self.cube.state)
+
+    def test_conjugateMoves(self):
+        sequence = ["R", "Ui", "F'", "D2", "L", "B"]
+        for symmetry in range(NUM_SYMMETRIES):
+            cube1 = Cube(str(self.cube))
+            cube1.executeSequence("".join(sequence))
+            cube2 = Cube(transformState(self.cube.state, symmetry).decode("ascii"))
+            cube2.executeSequence("".join(conjugateMoves(sequence, symmetry)))
+            self.assertEqual(transformState(cube1.state, symmetry), cube2.state)
+
+        self.assertEqual(conjugateMoves(["R", "Ri", "R'", "R2"], 0), ["R", "Ri", "R'", "R2"])
+        # reflections reverse the direction of every turn
+        self.assertTrue(all(move.endswith("i") for move in conjugateMoves(["R", "U", "F"], NUM_ROTATIONS)))
+
+    def test_canonicalState(self):
+        canonical, symmetry = canonicalState(self.cube.state)
+        self.assertEqual(transformState(self.cube.state, symmetry), canonical)
+        self.assertEqual(canonicalState(str(self.cube)), (canonical, symmetry))
+        self.assertLessEqual(canonical, self.cube.state)
+
+        # every symmetric equivalent has the same representative
+        for other in range(NUM_SYMMETRIES):
+            self.assertEqual(canonicalState(transformState(self.cube.state, other))[0], canonical)
+
+        rotated, rotation = canonicalState(self.cube.state, rotationsOnly=True)
+        self.assertLess(rotation, NUM_ROTATIONS)
+        self.assertGreaterEqual(rotated, canonical)
+
+    def test_solveThroughSymmetry(self):
+        canonical, symmetry = canonicalState(self.cube.state)
+        solver = Cube(canonical.decode("ascii"))
+        solver.solve()
+        self.cube.executeSequence("".join(conjugateMoves(solver.movesMade, INVERSE_SYMMETRIES[symmetry])))
+        self.assertTrue(self.cube.isSolved)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from rubiks_cube.table_cache import TableFormatError, loadOrBuildTable, loadTable, saveTable
+
+
+class TestTableCache(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tempDir.name) / "test.table"
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_roundTrip(self):
+        table = np.arange(60, dtype=np.uint16).reshape(3, 20)
+        saveTable(self.path, table, 3)
+
+        loaded = loadTable(self.path, 3)
+        self.assertEqual(loaded.dtype, table.dtype)
+        self.assertTrue(np.array_equal(loaded, table))
+        self.assertFalse(loaded.flags.writeable)
+
+    def test_versionMismatch(self):
+        saveTable(self.path, np.zeros(10, dtype=np.int8), 1)
+        with self.assertRaises(TableFormatError):
+            loadTable(self.path, 2)
+
+    def test_corruption(self):
+        saveTable(self.path, np.zeros(10, dtype=np.int8), 1)
+        data = bytearray(self.path.read_bytes())
+        data[-1] = 1
+        self.path.write_bytes(bytes(data))
+
+        with self.assertRaises(TableFormatError):
+            loadTable(self.path, 1)
+
+    def test_loadOrBuild(self):
+        calls = []
+
+        def builder():
+            calls.append(1)
+            return np.arange(5, dtype=np.int8)
+
+        first = loadOrBuildTable(self.path, 1, builder)
+        second = loadOrBuildTable(self.path, 1, builder)
+        self.assertTrue(np.array_equal(first, second))
+        self.assertEqual(len(calls), 1)
+
+        loadOrBuildTable(self.path, 2, builder)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()